@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_user_moderation_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='количество оценок'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, verbose_name='сумма оценок'),
+        ),
+    ]
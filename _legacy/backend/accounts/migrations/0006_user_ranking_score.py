@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_user_rating_sum_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='ranking_decayed_sum',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='ranking_decayed_weight',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='ranking_score',
+            field=models.FloatField(db_index=True, default=0.0, verbose_name='рейтинг в выдаче'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='ranking_updated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_user_ranking_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='rating_1_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='оценок 1'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='rating_2_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='оценок 2'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='rating_3_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='оценок 3'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='rating_4_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='оценок 4'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='rating_5_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='оценок 5'),
+        ),
+    ]
@@ -71,6 +71,20 @@ class User(AbstractUser):
         ],
         help_text="Средний рейтинг пользователя (от 0.00 до 5.00)"
     )
+    # Сумма и количество оценок: рейтинг пересчитывается инкрементально (см. marketplace.Review)
+    rating_sum = models.PositiveIntegerField('сумма оценок', default=0)
+    rating_count = models.PositiveIntegerField('количество оценок', default=0)
+    # Гистограмма оценок: сколько отзывов на 1..5 звёзд, обновляется вместе с суммой
+    rating_1_count = models.PositiveIntegerField('оценок 1', default=0)
+    rating_2_count = models.PositiveIntegerField('оценок 2', default=0)
+    rating_3_count = models.PositiveIntegerField('оценок 3', default=0)
+    rating_4_count = models.PositiveIntegerField('оценок 4', default=0)
+    rating_5_count = models.PositiveIntegerField('оценок 5', default=0)
+    # Ранжирование (см. marketplace.ranking): итоговый счёт и затухшие суммы на момент ranking_updated_at
+    ranking_score = models.FloatField('рейтинг в выдаче', default=0.0, db_index=True)
+    ranking_decayed_sum = models.FloatField(default=0.0)
+    ranking_decayed_weight = models.FloatField(default=0.0)
+    ranking_updated_at = models.DateTimeField(null=True, blank=True)
     
     # Аватар
     avatar = models.ImageField(
@@ -122,3 +136,17 @@ class User(AbstractUser):
         if self.is_specialist:
             roles.append('Специалист')
         return ', '.join(roles) if roles else 'Нет ролей'
+    
+    @property
+    def rating_histogram(self) -> dict:
+        """Количество отзывов по звёздам от 5 до 1, без обращения к таблице отзывов."""
+        return {stars: getattr(self, f'rating_{stars}_count') for stars in range(5, 0, -1)}
+    
+    @property
+    def rating_summary(self) -> dict:
+        """Сводка рейтинга для профиля и API: средний балл, число отзывов и гистограмма."""
+        return {
+            'average': float(self.rating),
+            'total': self.rating_count,
+            'histogram': {str(stars): count for stars, count in self.rating_histogram.items()},
+        }
@@ -11,7 +11,6 @@ import os
 from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
 from channels.auth import AuthMiddlewareStack
-import chat.routing
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.dev')
 
@@ -19,8 +18,13 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.dev')
 # is populated before importing code that may import ORM models.
 django_asgi_app = get_asgi_application()
 
+import chat.routing
+from marketplace.chat_buffer import lifespan_app
+
 application = ProtocolTypeRouter({
     "http": django_asgi_app,
+    # Flushes the chat write-behind buffer on graceful shutdown
+    "lifespan": lifespan_app,
     "websocket": AuthMiddlewareStack(
         URLRouter(
             chat.routing.websocket_urlpatterns
@@ -138,6 +138,24 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Write-behind буфер сообщений чата (marketplace.chat_buffer)
+CHAT_BUFFER_FLUSH_INTERVAL = 0.5  # секунды
+CHAT_BUFFER_MAX_BATCH = 500
+CHAT_BUFFER_MAX_RETRIES = 10  # неудачных сохранений пачки подряд, затем запись по одному
+
+# Кэш участников переписок (marketplace.chat_access)
+CHAT_PARTICIPANTS_CACHE_TTL = 3600  # секунды, общий кэш
+CHAT_PARTICIPANTS_LOCAL_TTL = 30  # секунды, память процесса
+
+# Присутствие и набор текста в чате (marketplace.chat_presence), без записи в БД
+CHAT_PRESENCE_TTL = 30  # секунды; клиент шлёт heartbeat чаще
+CHAT_TYPING_TTL = 5  # секунды
+
+# Ранжирование специалистов (marketplace.ranking)
+RANKING_PRIOR_MEAN = 3.5  # априорная оценка
+RANKING_PRIOR_WEIGHT = 5  # вес априорной оценки, в отзывах
+RANKING_HALF_LIFE_DAYS = 180  # за это время вес отзыва падает вдвое
+
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
@@ -4,9 +4,10 @@
 from django.contrib import admin
 from .models import (
     Category, Subcategory, ClientProfile, SpecialistProfile, 
-    Task, Offer, Review, Deal, PortfolioItem, Escrow, AIRequest, TimeSlot,
+    Task, Offer, Review, ReviewModerationQueue, Deal, PortfolioItem, Escrow, AIRequest, TimeSlot,
     Dispute
 )
+from .moderation import moderate_reviews, pending_reviews
 
 
 @admin.register(Category)
@@ -195,8 +196,23 @@ class OfferAdmin(admin.ModelAdmin):
     )
 
 
+class ReviewModerationActions:
+    """Массовая модерация отзывов одним UPDATE с отложенным пересчётом рейтингов."""
+    actions = ['approve_reviews', 'reject_reviews']
+
+    @admin.action(description='Одобрить выбранные отзывы')
+    def approve_reviews(self, request, queryset):
+        updated = moderate_reviews(queryset, Review.ModerationStatus.APPROVED)
+        self.message_user(request, f'Одобрено отзывов: {updated}')
+
+    @admin.action(description='Отклонить выбранные отзывы')
+    def reject_reviews(self, request, queryset):
+        updated = moderate_reviews(queryset, Review.ModerationStatus.REJECTED)
+        self.message_user(request, f'Отклонено отзывов: {updated}')
+
+
 @admin.register(Review)
-class ReviewAdmin(admin.ModelAdmin):
+class ReviewAdmin(ReviewModerationActions, admin.ModelAdmin):
     """Админ-интерфейс для модели Review."""
     list_display = [
         'specialist',
@@ -213,9 +229,9 @@ class ReviewAdmin(admin.ModelAdmin):
         'task__title',
         'text'
     ]
+    list_select_related = ['specialist', 'client', 'task']
     readonly_fields = ['created_at', 'updated_at']
     date_hierarchy = 'created_at'
-    actions = ['approve_reviews', 'reject_reviews']
     
     fieldsets = (
         ('Участники', {
@@ -229,15 +245,23 @@ class ReviewAdmin(admin.ModelAdmin):
         }),
     )
 
-    @admin.action(description='Одобрить выбранные отзывы')
-    def approve_reviews(self, request, queryset):
-        queryset.update(moderation_status=Review.ModerationStatus.APPROVED)
-        self.message_user(request, f'Одобрено отзывов: {queryset.count()}')
 
-    @admin.action(description='Отклонить выбранные отзывы')
-    def reject_reviews(self, request, queryset):
-        queryset.update(moderation_status=Review.ModerationStatus.REJECTED)
-        self.message_user(request, f'Отклонено отзывов: {queryset.count()}')
+@admin.register(ReviewModerationQueue)
+class ReviewModerationQueueAdmin(ReviewModerationActions, admin.ModelAdmin):
+    """Очередь модерации: только отзывы на модерации, от старых к новым."""
+    list_display = ['created_at', 'specialist', 'client', 'task', 'rating', 'text']
+    list_select_related = ['specialist', 'client', 'task']
+    ordering = ['created_at']
+    list_per_page = 50
+    # Без COUNT(*) по всей таблице отзывов на каждой странице
+    show_full_result_count = False
+    readonly_fields = ['specialist', 'client', 'task', 'rating', 'text', 'moderation_status', 'created_at']
+
+    def get_queryset(self, request):
+        return pending_reviews()
+
+    def has_add_permission(self, request):
+        return False
 
 
 @admin.register(Deal)
@@ -0,0 +1,56 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import AllowAny
+from django.shortcuts import get_object_or_404
+from django.contrib.auth import get_user_model
+from ..models import Review
+
+User = get_user_model()
+
+
+class ReviewFeedPagination(CursorPagination):
+    """
+    Keyset pagination over (created_at, id): each page is an index range scan,
+    no matter how deep the client scrolls, and new reviews do not shift pages.
+    """
+    page_size = 10
+    max_page_size = 50
+    page_size_query_param = 'page_size'
+    ordering = ('-created_at', '-id')
+
+
+def serialize_review(review):
+    return {
+        'id': review.id,
+        'client_name': review.client.username,
+        'rating': review.rating,
+        'text': review.text or '',
+        'created_at': review.created_at.isoformat(),
+        'task_id': review.task_id,
+        'task_title': review.task.title,
+    }
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def specialist_reviews(request, specialist_id):
+    """
+    Returns a page of a specialist's reviews together with the rating summary.
+    GET /api/specialist/{id}/reviews/?cursor=...&page_size=10
+
+    The summary (average, total, per-star histogram) is read from the specialist row,
+    which Review.save/delete keep current, so no aggregate runs over the reviews table.
+    """
+    specialist = get_object_or_404(User, id=specialist_id, is_specialist=True)
+
+    reviews = Review.objects.filter(specialist=specialist).exclude(
+        moderation_status=Review.ModerationStatus.REJECTED
+    ).select_related('client', 'task').only(
+        'id', 'rating', 'text', 'created_at', 'task_id', 'client__username', 'task__title'
+    )
+    paginator = ReviewFeedPagination()
+    page = paginator.paginate_queryset(reviews, request)
+
+    response = paginator.get_paginated_response([serialize_review(review) for review in page])
+    response.data['summary'] = specialist.rating_summary
+    return response
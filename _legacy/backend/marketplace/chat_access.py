@@ -0,0 +1,76 @@
+"""
+Cached participant sets for chat authorization.
+
+Conversation participants are looked up once (one values_list query) and kept
+in a short-lived per-process dict backed by the Django cache, so WebSocket
+connects and message sends check membership without touching the database.
+Entries are dropped when a conversation is saved or deleted (see signals).
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Conversation
+
+# conversation_id -> (expires_at, frozenset of user ids)
+_local = {}
+
+
+def _cache_key(conversation_id):
+    return f'chat:participants:{conversation_id}'
+
+
+def _local_ttl():
+    return getattr(settings, 'CHAT_PARTICIPANTS_LOCAL_TTL', 30)
+
+
+def cached_participant_ids(conversation_id):
+    """Return the participant set from process memory, or None on a miss."""
+    entry = _local.get(int(conversation_id))
+    if entry is None:
+        return None
+    expires_at, participant_ids = entry
+    if expires_at < time.monotonic():
+        _local.pop(int(conversation_id), None)
+        return None
+    return participant_ids
+
+
+def get_participant_ids(conversation_id):
+    """
+    Return the frozenset of participant user ids for a conversation.
+
+    An unknown conversation yields an empty set, which is cached as well so
+    repeated connects to a bad id do not hit the database.
+    """
+    conversation_id = int(conversation_id)
+    participant_ids = cached_participant_ids(conversation_id)
+    if participant_ids is not None:
+        return participant_ids
+
+    participant_ids = cache.get(_cache_key(conversation_id))
+    if participant_ids is None:
+        row = Conversation.objects.filter(id=conversation_id).values_list(
+            'participant1_id', 'participant2_id'
+        ).first()
+        participant_ids = frozenset(row) if row else frozenset()
+        cache.set(
+            _cache_key(conversation_id),
+            participant_ids,
+            getattr(settings, 'CHAT_PARTICIPANTS_CACHE_TTL', 3600),
+        )
+
+    _local[conversation_id] = (time.monotonic() + _local_ttl(), participant_ids)
+    return participant_ids
+
+
+def is_participant(conversation_id, user_id):
+    """Check whether the user belongs to the conversation."""
+    return user_id in get_participant_ids(conversation_id)
+
+
+def invalidate_participants(conversation_id):
+    """Forget the cached participant set after a membership change."""
+    _local.pop(int(conversation_id), None)
+    cache.delete(_cache_key(conversation_id))
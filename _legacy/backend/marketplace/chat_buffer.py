@@ -0,0 +1,180 @@
+"""
+Write-behind buffer for chat messages.
+
+ChatConsumer broadcasts a message immediately and defers the database write:
+buffered messages are saved with one bulk_create, and conversation
+updated_at is bumped with one UPDATE per flush.
+
+Persistence is at-most-once. A message is already delivered to the room (with
+message_id None) when it is buffered, and anything still buffered is lost if
+the worker dies before a flush (SIGKILL, OOM). On a graceful stop the ASGI
+lifespan shutdown (lifespan_app, mounted in config.asgi) flushes the buffer;
+the atexit hook is a last resort for servers without lifespan support.
+"""
+import asyncio
+import atexit
+import logging
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Conversation, Message
+
+logger = logging.getLogger(__name__)
+
+
+def persist_messages(batch):
+    """
+    Save a batch of messages in one transaction.
+
+    batch: list of dicts with conversation_id, sender_id and content.
+    """
+    with transaction.atomic():
+        Message.objects.bulk_create([
+            Message(
+                conversation_id=item['conversation_id'],
+                sender_id=item['sender_id'],
+                content=item['content'],
+            )
+            for item in batch
+        ])
+        conversation_ids = {item['conversation_id'] for item in batch}
+        Conversation.objects.filter(id__in=conversation_ids).update(updated_at=timezone.now())
+
+
+def persist_messages_one_by_one(batch):
+    """
+    Save messages one transaction each, logging and dropping the ones that fail
+    (deleted conversation or user, oversized content). Returns the number saved.
+    """
+    saved = 0
+    for item in batch:
+        try:
+            persist_messages([item])
+        except Exception:
+            logger.exception(
+                "Dropping chat message from user %s to conversation %s",
+                item['sender_id'], item['conversation_id'],
+            )
+        else:
+            saved += 1
+    return saved
+
+
+class MessageWriteBuffer:
+    """
+    Per-process message buffer.
+
+    A batch that fails to save is put back at the head of the buffer and retried
+    on the next flush. After max_retries failures in a row the batch is saved
+    row by row, so one bad message cannot hold back the rest. Whatever is left
+    at process exit is written synchronously (atexit).
+    """
+
+    def __init__(self, flush_interval=None, max_batch=None, max_retries=None):
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_retries = max_retries
+        self._pending = []
+        self._failures = 0
+        self._flush_task = None
+        self._lock = None
+
+    def get_flush_interval(self):
+        if self.flush_interval is not None:
+            return self.flush_interval
+        return getattr(settings, 'CHAT_BUFFER_FLUSH_INTERVAL', 0.5)
+
+    def get_max_batch(self):
+        if self.max_batch is not None:
+            return self.max_batch
+        return getattr(settings, 'CHAT_BUFFER_MAX_BATCH', 500)
+
+    def get_max_retries(self):
+        if self.max_retries is not None:
+            return self.max_retries
+        return getattr(settings, 'CHAT_BUFFER_MAX_RETRIES', 10)
+
+    def __len__(self):
+        return len(self._pending)
+
+    async def add(self, conversation_id, sender_id, content):
+        """Queue a message for writing."""
+        self._pending.append({
+            'conversation_id': conversation_id,
+            'sender_id': sender_id,
+            'content': content,
+        })
+        if len(self._pending) >= self.get_max_batch():
+            await self.flush()
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.ensure_future(self._delayed_flush())
+
+    async def _delayed_flush(self):
+        await asyncio.sleep(self.get_flush_interval())
+        await self.flush()
+
+    async def flush(self):
+        """Write everything buffered. Returns the number of messages saved."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            try:
+                await database_sync_to_async(persist_messages)(batch)
+            except Exception:
+                self._failures += 1
+                if self._failures < self.get_max_retries():
+                    logger.exception("Failed to save %s chat messages, retrying on next flush", len(batch))
+                    self._pending = batch + self._pending
+                    self._flush_task = asyncio.ensure_future(self._delayed_flush())
+                    return 0
+                logger.exception("Failed to save %s chat messages, saving them one by one", len(batch))
+                self._failures = 0
+                return await database_sync_to_async(persist_messages_one_by_one)(batch)
+            self._failures = 0
+            return len(batch)
+
+    def drain_sync(self):
+        """Synchronously write what is left when the process stops."""
+        batch, self._pending = self._pending, []
+        if not batch:
+            return 0
+        try:
+            persist_messages(batch)
+        except Exception:
+            logger.exception("Failed to save %s chat messages on shutdown, saving them one by one", len(batch))
+            return persist_messages_one_by_one(batch)
+        return len(batch)
+
+
+message_buffer = MessageWriteBuffer()
+
+
+@atexit.register
+def _drain_on_shutdown():
+    try:
+        message_buffer.drain_sync()
+    except Exception:
+        logger.exception("Failed to save buffered chat messages on shutdown")
+
+
+async def lifespan_app(scope, receive, send):
+    """
+    ASGI lifespan handler: writes out buffered messages when the server shuts down.
+    """
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            try:
+                await message_buffer.flush()
+            except Exception:
+                logger.exception("Failed to save buffered chat messages on shutdown")
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
@@ -0,0 +1,99 @@
+"""
+Ephemeral presence and typing state for chats.
+
+State lives in the Django cache as TTL keys (LocMem in development and tests,
+Redis in production) and changes are broadcast over the channel layer group of
+the conversation. Nothing is written to the database.
+
+Only transitions are broadcast: a heartbeat that merely extends an existing
+"online" key, or a keystroke inside the typing window, sends nothing.
+Open sockets are counted per user, so closing one of several tabs does not
+announce the user as offline.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+ONLINE = 'online'
+OFFLINE = 'offline'
+TYPING = 'typing'
+
+
+def _presence_key(conversation_id, user_id):
+    return f'chat:presence:{conversation_id}:{user_id}'
+
+
+def _typing_key(conversation_id, user_id):
+    return f'chat:typing:{conversation_id}:{user_id}'
+
+
+def _connections_key(conversation_id, user_id):
+    return f'chat:connections:{conversation_id}:{user_id}'
+
+
+def presence_ttl():
+    return getattr(settings, 'CHAT_PRESENCE_TTL', 30)
+
+
+def typing_ttl():
+    return getattr(settings, 'CHAT_TYPING_TTL', 5)
+
+
+async def connect(conversation_id, user_id):
+    """
+    Count a new socket of the user. Returns True if the user just came online.
+    """
+    key = _connections_key(conversation_id, user_id)
+    await cache.aadd(key, 0, presence_ttl())
+    await cache.aincr(key)
+    return await heartbeat(conversation_id, user_id)
+
+
+async def heartbeat(conversation_id, user_id):
+    """
+    Extend the user's presence. Returns True if the user just came online.
+    """
+    await cache.atouch(_connections_key(conversation_id, user_id), presence_ttl())
+    key = _presence_key(conversation_id, user_id)
+    if await cache.aadd(key, 1, presence_ttl()):
+        return True
+    await cache.atouch(key, presence_ttl())
+    return False
+
+
+async def disconnect(conversation_id, user_id):
+    """
+    Uncount a closed socket. Returns True if it was the user's last one;
+    presence and typing state are dropped then.
+    """
+    try:
+        remaining = await cache.adecr(_connections_key(conversation_id, user_id))
+    except ValueError:
+        # Counter expired with the presence key: treat as the last socket
+        remaining = 0
+    if remaining > 0:
+        return False
+    await cache.adelete_many([
+        _presence_key(conversation_id, user_id),
+        _typing_key(conversation_id, user_id),
+        _connections_key(conversation_id, user_id),
+    ])
+    return True
+
+
+async def start_typing(conversation_id, user_id):
+    """
+    Register a keystroke. Returns True only for the first one in the typing window.
+    """
+    return await cache.aadd(_typing_key(conversation_id, user_id), 1, typing_ttl())
+
+
+async def stop_typing(conversation_id, user_id):
+    """Clear the typing flag, e.g. once the message is sent."""
+    await cache.adelete(_typing_key(conversation_id, user_id))
+
+
+async def online_user_ids(conversation_id, user_ids):
+    """Return which of the given users currently have a live presence key."""
+    keys = {_presence_key(conversation_id, user_id): user_id for user_id in user_ids}
+    found = await cache.aget_many(list(keys))
+    return [keys[key] for key in found]
@@ -1,11 +1,16 @@
 """
 WebSocket consumers for real-time chat functionality.
 """
+import asyncio
 import json
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth import get_user_model
-from .models import Conversation, Message
+from django.utils import timezone
+from . import chat_presence
+from .chat_access import cached_participant_ids, get_participant_ids
+from .chat_buffer import message_buffer
+from .models import Conversation
 
 User = get_user_model()
 
@@ -37,13 +42,27 @@ class ChatConsumer(AsyncWebsocketConsumer):
             self.channel_name
         )
         
+        # Presence: announce ourselves before accepting, then tell the client who else is here
+        self.joined = True
+        self.online_user_ids = set()
+        if await chat_presence.connect(self.conversation_id, self.user.id):
+            await self.broadcast_presence(chat_presence.ONLINE)
         await self.accept()
+        participant_ids = cached_participant_ids(self.conversation_id) or set()
+        others = [user_id for user_id in participant_ids if user_id != self.user.id]
+        for user_id in await chat_presence.online_user_ids(self.conversation_id, others):
+            await self.send_presence(user_id, chat_presence.ONLINE)
+        self.presence_watcher = asyncio.ensure_future(self.watch_presence())
         
         # Mark messages as read
         await self.mark_messages_as_read()
     
     async def disconnect(self, close_code):
         """Leave conversation room."""
+        if getattr(self, 'joined', False):
+            self.presence_watcher.cancel()
+            if await chat_presence.disconnect(self.conversation_id, self.user.id):
+                await self.broadcast_presence(chat_presence.OFFLINE)
         await self.channel_layer.group_discard(
             self.room_group_name,
             self.channel_name
@@ -52,15 +71,29 @@ class ChatConsumer(AsyncWebsocketConsumer):
     async def receive(self, text_data):
         """Receive message from WebSocket."""
         data = json.loads(text_data)
+        event_type = data.get('type')
+        
+        # Presence events never touch the database
+        if event_type == 'heartbeat':
+            await self.heartbeat()
+            return
+        if event_type == 'typing':
+            if await chat_presence.start_typing(self.conversation_id, self.user.id):
+                await self.broadcast_presence(chat_presence.TYPING)
+            return
+        
         message_content = data.get('message', '').strip()
         
         if not message_content:
             return
         
-        # Save message to database
-        message = await self.save_message(message_content)
+        # Membership may have changed since connect; the cached set keeps this check off the database
+        if not await self.check_participant():
+            await self.close()
+            return
         
-        # Send message to room group
+        # Broadcast first; the write-behind buffer persists the message on its next flush,
+        # so the database id is not known yet
         await self.channel_layer.group_send(
             self.room_group_name,
             {
@@ -68,14 +101,17 @@ class ChatConsumer(AsyncWebsocketConsumer):
                 'message': message_content,
                 'sender_id': self.user.id,
                 'sender_username': self.user.username,
-                'message_id': message.id,
-                'created_at': message.created_at.isoformat(),
+                'message_id': None,
+                'created_at': timezone.now().isoformat(),
             }
         )
+        await self.save_message(message_content)
+        await chat_presence.stop_typing(self.conversation_id, self.user.id)
     
     async def chat_message(self, event):
         """Receive message from room group and send to WebSocket."""
         await self.send(text_data=json.dumps({
+            'type': 'message',
             'message': event['message'],
             'sender_id': event['sender_id'],
             'sender_username': event['sender_username'],
@@ -83,32 +119,63 @@ class ChatConsumer(AsyncWebsocketConsumer):
             'created_at': event['created_at'],
         }))
     
-    @database_sync_to_async
-    def check_participant(self):
-        """Check if user is a participant in this conversation."""
-        try:
-            conversation = Conversation.objects.get(id=self.conversation_id)
-            return self.user in [conversation.participant1, conversation.participant2]
-        except Conversation.DoesNotExist:
-            return False
+    async def chat_presence(self, event):
+        """Forward another participant's presence change to the WebSocket."""
+        if event['user_id'] != self.user.id:
+            await self.send_presence(event['user_id'], event['status'])
     
-    @database_sync_to_async
-    def save_message(self, content):
-        """Save message to database."""
-        conversation = Conversation.objects.get(id=self.conversation_id)
-        message = Message.objects.create(
-            conversation=conversation,
-            sender=self.user,
-            content=content
+    async def send_presence(self, user_id, status):
+        if status == chat_presence.OFFLINE:
+            self.online_user_ids.discard(user_id)
+        else:
+            self.online_user_ids.add(user_id)
+        await self.send(text_data=json.dumps({
+            'type': 'presence',
+            'user_id': user_id,
+            'status': status,
+        }))
+    
+    async def broadcast_presence(self, status):
+        await self.channel_layer.group_send(
+            self.room_group_name,
+            {
+                'type': 'chat_presence',
+                'user_id': self.user.id,
+                'status': status,
+            }
         )
-        # Update conversation's updated_at timestamp
-        conversation.save()
-        return message
+    
+    async def watch_presence(self):
+        """
+        Report participants whose presence key expired without a disconnect
+        (lost network, suspended tab): nobody broadcasts those, so each socket polls.
+        """
+        while True:
+            await asyncio.sleep(chat_presence.presence_ttl())
+            if not self.online_user_ids:
+                continue
+            online = await chat_presence.online_user_ids(self.conversation_id, self.online_user_ids)
+            for user_id in self.online_user_ids - set(online):
+                await self.send_presence(user_id, chat_presence.OFFLINE)
+    
+    async def heartbeat(self):
+        """Extend presence; only a fresh arrival is broadcast."""
+        if await chat_presence.heartbeat(self.conversation_id, self.user.id):
+            await self.broadcast_presence(chat_presence.ONLINE)
+    
+    async def check_participant(self):
+        """Check if user is a participant in this conversation (see chat_access)."""
+        participant_ids = cached_participant_ids(self.conversation_id)
+        if participant_ids is None:
+            participant_ids = await database_sync_to_async(get_participant_ids)(self.conversation_id)
+        return self.user.id in participant_ids
+    
+    async def save_message(self, content):
+        """Queue message for a batched write (see chat_buffer)."""
+        await message_buffer.add(int(self.conversation_id), self.user.id, content)
     
     @database_sync_to_async
     def mark_messages_as_read(self):
-        """Mark all messages in this conversation as read for the current user."""
-        Message.objects.filter(
-            conversation_id=self.conversation_id,
-            is_read=False
-        ).exclude(sender=self.user).update(is_read=True)
+        """Move the user's read watermark to the latest saved message (one-row UPDATE)."""
+        conversation = Conversation.objects.only('id', 'participant1_id').get(id=self.conversation_id)
+        conversation.mark_read(self.user)
@@ -0,0 +1,223 @@
+"""
+Django management command for load testing the chat WebSocket consumer.
+
+Opens many simulated clients against ChatConsumer inside one process (no
+network, no ASGI server), sends messages at a fixed rate and reports connect
+latency, fanout latency percentiles and database queries per message.
+"""
+import asyncio
+import json
+import math
+import time
+
+from channels.layers import channel_layers
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from marketplace.chat_buffer import message_buffer
+from marketplace.models import Conversation
+from marketplace.routing import websocket_urlpatterns
+
+User = get_user_model()
+
+USERNAME_PREFIX = 'loadtest_'
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class QueryCounter:
+    """Counts SQL statements on every database connection, including executor threads."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+    def _install(self, sender, connection, **kwargs):
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+    def start(self):
+        for connection in connections.all():
+            self._install(None, connection)
+        connection_created.connect(self._install)
+
+    def stop(self):
+        connection_created.disconnect(self._install)
+
+
+class Command(BaseCommand):
+    help = 'Load test ChatConsumer with simulated WebSocket clients'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=1000, help='Number of WebSocket clients (two per conversation)')
+        parser.add_argument('--rate', type=float, default=0.5, help='Messages per second sent by each client')
+        parser.add_argument('--duration', type=float, default=10.0, help='Length of the send phase, seconds')
+        parser.add_argument('--connect-concurrency', type=int, default=100, help='Connects in flight at once')
+        parser.add_argument(
+            '--redis', default='',
+            help='Use a Redis channel layer at this URL instead of the in-memory layer',
+        )
+        parser.add_argument('--keep', action='store_true', help='Keep the generated users and conversations')
+
+    def handle(self, *args, **options):
+        clients = max(2, options['clients'] - options['clients'] % 2)
+        self.configure_channel_layer(options['redis'])
+
+        self.stdout.write(f'Creating {clients} users in {clients // 2} conversations...')
+        pairs = self.create_fixtures(clients)
+        try:
+            report = asyncio.run(self.run(pairs, options))
+        finally:
+            if not options['keep']:
+                User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+
+        self.print_report(report)
+
+    def configure_channel_layer(self, redis_url):
+        if redis_url:
+            settings.CHANNEL_LAYERS = {
+                'default': {
+                    'BACKEND': 'channels_redis.core.RedisChannelLayer',
+                    'CONFIG': {'hosts': [redis_url]},
+                },
+            }
+        else:
+            settings.CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+        channel_layers.backends.clear()
+
+    def create_fixtures(self, clients):
+        User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+        User.objects.bulk_create([
+            User(username=f'{USERNAME_PREFIX}{i}', email=f'{USERNAME_PREFIX}{i}@example.com', is_client=True)
+            for i in range(clients)
+        ])
+        users = list(User.objects.filter(username__startswith=USERNAME_PREFIX).order_by('id'))
+        Conversation.objects.bulk_create([
+            Conversation(participant1=users[i], participant2=users[i + 1])
+            for i in range(0, len(users), 2)
+        ])
+        conversations = Conversation.objects.filter(
+            participant1__username__startswith=USERNAME_PREFIX
+        ).values_list('id', 'participant1_id')
+        by_first = {participant1_id: conversation_id for conversation_id, participant1_id in conversations}
+        return [(by_first[users[i].id], users[i], users[i + 1]) for i in range(0, len(users), 2)]
+
+    async def run(self, pairs, options):
+        application = URLRouter(websocket_urlpatterns)
+        semaphore = asyncio.Semaphore(options['connect_concurrency'])
+        connect_latencies = []
+        fanout_latencies = []
+        failed = 0
+        # Installed before connecting so the executor threads' connections are wrapped too
+        counter = QueryCounter()
+        counter.start()
+
+        async def open_client(conversation_id, user):
+            nonlocal failed
+            communicator = WebsocketCommunicator(application, f'/ws/chat/{conversation_id}/')
+            communicator.scope['user'] = user
+            async with semaphore:
+                started = time.perf_counter()
+                connected, _ = await communicator.connect(timeout=30)
+                connect_latencies.append(time.perf_counter() - started)
+            if not connected:
+                failed += 1
+                return None
+            return communicator
+
+        clients = await asyncio.gather(*[
+            open_client(conversation_id, user)
+            for conversation_id, first, second in pairs
+            for user in (first, second)
+        ])
+        clients = [client for client in clients if client is not None]
+
+        # Consumers mark messages read after accepting; let those queries drain first
+        queries_before = -1
+        while queries_before != counter.count:
+            queries_before = counter.count
+            await asyncio.sleep(0.2)
+        stop_at = time.perf_counter() + options['duration']
+        interval = 1 / options['rate'] if options['rate'] > 0 else None
+        sent = 0
+
+        async def sender(communicator):
+            nonlocal sent
+            if interval is None:
+                return
+            # Spread the first sends so clients do not fire in lockstep
+            await asyncio.sleep(interval * (id(communicator) % 1000) / 1000)
+            while time.perf_counter() < stop_at:
+                await communicator.send_to(text_data=json.dumps({'message': f'lt {time.perf_counter()}'}))
+                sent += 1
+                await asyncio.sleep(interval)
+
+        async def receiver(communicator):
+            while True:
+                # receive_from() cancels the consumer on timeout, so poll the output queue instead
+                if await communicator.receive_nothing(timeout=0.5, interval=0.005):
+                    if time.perf_counter() >= stop_at:
+                        return
+                    continue
+                event = json.loads(await communicator.receive_from())
+                message = event.get('message', '')
+                if message.startswith('lt '):
+                    fanout_latencies.append(time.perf_counter() - float(message[3:]))
+
+        send_started = time.perf_counter()
+        await asyncio.gather(*[sender(client) for client in clients], *[receiver(client) for client in clients])
+        elapsed = time.perf_counter() - send_started
+        await message_buffer.flush()
+        counter.stop()
+
+        await asyncio.gather(*[client.disconnect() for client in clients])
+
+        return {
+            'clients': len(clients),
+            'failed': failed,
+            'sent': sent,
+            'delivered': len(fanout_latencies),
+            'elapsed': elapsed,
+            'queries': counter.count - queries_before,
+            'connect': connect_latencies,
+            'fanout': fanout_latencies,
+        }
+
+    def print_report(self, report):
+        def ms(value):
+            return f'{value * 1000:.1f} ms'
+
+        self.stdout.write(self.style.SUCCESS('Chat load test finished'))
+        self.stdout.write(f"Clients connected: {report['clients']} (failed: {report['failed']})")
+        self.stdout.write(
+            f"Connect latency: p50 {ms(percentile(report['connect'], 50))}, "
+            f"p95 {ms(percentile(report['connect'], 95))}, "
+            f"p99 {ms(percentile(report['connect'], 99))}, "
+            f"max {ms(max(report['connect'], default=0))}"
+        )
+        self.stdout.write(
+            f"Messages sent: {report['sent']}, delivered: {report['delivered']} "
+            f"({report['sent'] / report['elapsed']:.0f} msg/s)"
+        )
+        self.stdout.write(
+            f"Fanout latency: p50 {ms(percentile(report['fanout'], 50))}, "
+            f"p95 {ms(percentile(report['fanout'], 95))}, "
+            f"p99 {ms(percentile(report['fanout'], 99))}"
+        )
+        per_message = report['queries'] / report['sent'] if report['sent'] else 0
+        self.stdout.write(f"DB queries during send phase: {report['queries']} ({per_message:.3f} per message)")
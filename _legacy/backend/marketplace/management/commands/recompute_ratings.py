@@ -0,0 +1,16 @@
+"""
+Django management command to recompute specialist ratings from reviews.
+"""
+from django.core.management.base import BaseCommand
+from marketplace.models import Review
+
+
+class Command(BaseCommand):
+    help = 'Recompute rating sums, counts and averages from the reviews table (repair only)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('specialist_ids', nargs='*', type=int, help='Limit to these specialists')
+
+    def handle(self, *args, **options):
+        total = Review.recompute_ratings(options['specialist_ids'] or None)
+        self.stdout.write(self.style.SUCCESS(f'Recomputed ratings for {total} users.'))
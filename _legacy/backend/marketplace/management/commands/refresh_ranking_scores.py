@@ -0,0 +1,16 @@
+"""
+Django management command to recompute specialist ranking scores.
+
+Runs nightly (the ranking-refresh service in docker-compose.prod.yml) so time decay
+is applied to specialists without new reviews.
+"""
+from django.core.management.base import BaseCommand
+from marketplace import ranking
+
+
+class Command(BaseCommand):
+    help = 'Recompute Bayesian, time-decayed ranking scores for all specialists'
+
+    def handle(self, *args, **options):
+        total = ranking.refresh_all()
+        self.stdout.write(self.style.SUCCESS(f'Refreshed ranking scores for {total} specialists.'))
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.18 on 2026-10-19 10:50
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Max, Min, Q
+
+
+def backfill_watermarks(apps, schema_editor):
+    """Переносит флаги is_read в водяные знаки: всё до первого непрочитанного считается прочитанным."""
+    Conversation = apps.get_model('marketplace', 'Conversation')
+    Message = apps.get_model('marketplace', 'Message')
+
+    for conversation in Conversation.objects.only('id', 'participant1_id', 'participant2_id').iterator():
+        messages = Message.objects.filter(conversation_id=conversation.id)
+        stats = messages.aggregate(
+            last_id=Max('id'),
+            first_unread_for_1=Min('id', filter=Q(is_read=False) & ~Q(sender_id=conversation.participant1_id)),
+            first_unread_for_2=Min('id', filter=Q(is_read=False) & ~Q(sender_id=conversation.participant2_id)),
+        )
+        if stats['last_id'] is None:
+            continue
+        Conversation.objects.filter(id=conversation.id).update(
+            participant1_last_read_id=(stats['first_unread_for_1'] or stats['last_id'] + 1) - 1,
+            participant2_last_read_id=(stats['first_unread_for_2'] or stats['last_id'] + 1) - 1,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0018_task_is_urgent'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='participant1_last_read_id',
+            field=models.PositiveBigIntegerField(default=0, verbose_name='прочитано участником 1 до'),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='participant2_last_read_id',
+            field=models.PositiveBigIntegerField(default=0, verbose_name='прочитано участником 2 до'),
+        ),
+        migrations.RunPython(backfill_watermarks, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='message',
+            name='is_read',
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['conversation', 'id'], name='messages_convers_c96a9f_idx'),
+        ),
+    ]
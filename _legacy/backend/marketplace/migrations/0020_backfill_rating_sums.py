@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:06
+
+from django.db import migrations
+from django.db.models import Count, Sum
+
+
+def backfill_rating_sums(apps, schema_editor):
+    """Заполняет сумму и количество оценок по существующим отзывам."""
+    User = apps.get_model('accounts', 'User')
+    Review = apps.get_model('marketplace', 'Review')
+
+    users = []
+    for row in Review.objects.values('specialist_id').annotate(total=Sum('rating'), count=Count('id')):
+        users.append(User(pk=row['specialist_id'], rating_sum=row['total'], rating_count=row['count']))
+    User.objects.bulk_update(users, ['rating_sum', 'rating_count'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0019_message_read_watermark'),
+        ('accounts', '0005_user_rating_sum_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rating_sums, migrations.RunPython.noop),
+    ]
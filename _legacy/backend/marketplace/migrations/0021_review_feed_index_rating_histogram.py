@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:11
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_rating_histogram(apps, schema_editor):
+    """Заполняет гистограмму оценок по существующим отзывам."""
+    User = apps.get_model('accounts', 'User')
+    Review = apps.get_model('marketplace', 'Review')
+
+    star_fields = [f'rating_{stars}_count' for stars in range(1, 6)]
+    users = []
+    for row in Review.objects.values('specialist_id').annotate(**{
+        f'rating_{stars}_count': Count('id', filter=Q(rating=stars)) for stars in range(1, 6)
+    }):
+        users.append(User(pk=row.pop('specialist_id'), **row))
+    User.objects.bulk_update(users, star_fields, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0020_backfill_rating_sums'),
+        ('accounts', '0007_user_rating_histogram'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['specialist', '-created_at', '-id'], name='reviews_specialist_feed_idx'),
+        ),
+        migrations.RunPython(backfill_rating_histogram, migrations.RunPython.noop),
+    ]
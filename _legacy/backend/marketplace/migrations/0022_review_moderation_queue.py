@@ -0,0 +1,72 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:15
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def exclude_rejected_from_ratings(apps, schema_editor):
+    """Пересчитывает суммы и гистограммы специалистов, у которых есть отклонённые отзывы."""
+    User = apps.get_model('accounts', 'User')
+    Review = apps.get_model('marketplace', 'Review')
+
+    specialist_ids = set(
+        Review.objects.filter(moderation_status='rejected').values_list('specialist_id', flat=True)
+    )
+    if not specialist_ids:
+        return
+
+    star_fields = [f'rating_{stars}_count' for stars in range(1, 6)]
+    empty = dict.fromkeys(['rating_sum', 'rating_count', *star_fields], 0)
+    stats = {
+        row.pop('specialist_id'): row
+        for row in Review.objects.filter(specialist_id__in=specialist_ids)
+        .exclude(moderation_status='rejected')
+        .values('specialist_id')
+        .annotate(
+            rating_sum=Sum('rating'),
+            rating_count=Count('id'),
+            **{f'rating_{stars}_count': Count('id', filter=Q(rating=stars)) for stars in range(1, 6)},
+        )
+    }
+    users = []
+    for specialist_id in specialist_ids:
+        row = stats.get(specialist_id, empty)
+        count = row['rating_count']
+        users.append(User(
+            pk=specialist_id,
+            rating=round(row['rating_sum'] / count, 2) if count else 0,
+            **row,
+        ))
+    User.objects.bulk_update(users, ['rating_sum', 'rating_count', 'rating', *star_fields], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0021_review_feed_index_rating_histogram'),
+        ('accounts', '0007_user_rating_histogram'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReviewModerationQueue',
+            fields=[
+            ],
+            options={
+                'verbose_name': 'отзыв на модерации',
+                'verbose_name_plural': 'очередь модерации отзывов',
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('marketplace.review',),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['moderation_status', 'created_at'], name='reviews_moderation_queue_idx'),
+        ),
+        # Счёт в выдаче догонит ночной refresh_ranking_scores
+        migrations.RunPython(exclude_rejected_from_ratings, migrations.RunPython.noop),
+    ]
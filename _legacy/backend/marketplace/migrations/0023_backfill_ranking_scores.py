@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:02
+
+from django.db import migrations
+
+
+def backfill_ranking_scores(apps, schema_editor):
+    """
+    Заполняет ranking_score, добавленный со значением 0: без этого списки специалистов,
+    отсортированные по -ranking_score, теряют порядок до первого ночного пересчёта.
+    """
+    from marketplace import ranking
+
+    ranking.refresh_all(
+        user_model=apps.get_model('accounts', 'User'),
+        review_model=apps.get_model('marketplace', 'Review'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_user_rating_histogram'),
+        ('marketplace', '0022_review_moderation_queue'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_ranking_scores, migrations.RunPython.noop),
+    ]
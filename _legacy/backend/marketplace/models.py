@@ -3,11 +3,13 @@
 
 Содержит модели: Category, SpecialistProfile, Task, Offer, Review, Deal.
 """
+from decimal import Decimal
 from django.db import models
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.utils.text import slugify
-from django.db.models import Avg
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Cast, Coalesce, Greatest, Round
 
 
 class Category(models.Model):
@@ -692,39 +694,101 @@ class Review(models.Model):
         indexes = [
             models.Index(fields=['specialist', 'rating']),
             models.Index(fields=['task']),
+            # Лента отзывов специалиста с keyset-пагинацией (api/reviews.py)
+            models.Index(fields=['specialist', '-created_at', '-id'], name='reviews_specialist_feed_idx'),
+            # Очередь модерации (moderation.py)
+            models.Index(fields=['moderation_status', 'created_at'], name='reviews_moderation_queue_idx'),
         ]
     
     def __str__(self) -> str:
         return f"Отзыв от {self.client.username} для {self.specialist.username} - {self.rating}/5"
     
-    def save(self, *args, **kwargs):
-        """Пересчитывает рейтинг специалиста при сохранении отзыва."""
-        super().save(*args, **kwargs)
-        self._update_specialist_rating()
-    
-    def delete(self, *args, **kwargs):
-        """Пересчитывает рейтинг специалиста при удалении отзыва."""
-        specialist = self.specialist
-        super().delete(*args, **kwargs)
-        self._update_specialist_rating_for_user(specialist)
+    @staticmethod
+    def rating_contribution(specialist_id, rating, moderation_status):
+        """
+        Вклад отзыва в рейтинг: (specialist_id, rating), либо None для отклонённого отзыва.
+        Отзывы на модерации учитываются сразу, отклонение убирает их из рейтинга.
+        """
+        if moderation_status == Review.ModerationStatus.REJECTED:
+            return None
+        return specialist_id, rating
     
-    def _update_specialist_rating(self):
-        """Пересчитывает средний рейтинг специалиста."""
-        self._update_specialist_rating_for_user(self.specialist)
+    @staticmethod
+    def apply_rating_delta(specialist_id, rating, direction):
+        """
+        Добавляет (direction=1) или убирает (direction=-1) одну оценку специалиста.
+        
+        Сумма, количество и счётчик гистограммы сдвигаются одним UPDATE через F(),
+        средний рейтинг считается в том же запросе.
+        """
+        from django.contrib.auth import get_user_model
+        
+        new_sum = F('rating_sum') + rating * direction
+        new_count = F('rating_count') + direction
+        star_field = f'rating_{rating}_count'
+        get_user_model().objects.filter(pk=specialist_id).update(
+            rating_sum=new_sum,
+            rating_count=new_count,
+            **{star_field: F(star_field) + direction},
+            rating=Round(
+                Cast(new_sum, models.FloatField()) / Greatest(new_count, 1),
+                2,
+                output_field=models.DecimalField(max_digits=3, decimal_places=2),
+            ),
+        )
     
     @staticmethod
-    def _update_specialist_rating_for_user(specialist):
-        """Пересчитывает средний рейтинг для указанного специалиста."""
-        avg_rating = Review.objects.filter(specialist=specialist).aggregate(
-            avg_rating=Avg('rating')
-        )['avg_rating']
+    def recompute_ratings(specialist_ids=None):
+        """
+        Полный пересчёт суммы, количества, гистограммы и рейтинга по таблице отзывов.
+        Используется только для восстановления данных. Возвращает число обновлённых пользователей.
+        """
+        from django.contrib.auth import get_user_model
+        User = get_user_model()
         
-        if avg_rating is not None:
-            specialist.rating = round(avg_rating, 2)
-        else:
-            specialist.rating = 0.00
+        reviews = Review.objects.exclude(moderation_status=Review.ModerationStatus.REJECTED)
+        users = User.objects.filter(Q(is_specialist=True) | Q(rating_count__gt=0))
+        if specialist_ids is not None:
+            reviews = reviews.filter(specialist_id__in=specialist_ids)
+            users = User.objects.filter(pk__in=specialist_ids)
         
-        specialist.save(update_fields=['rating'])
+        star_fields = [f'rating_{stars}_count' for stars in range(1, 6)]
+        stats = {
+            row.pop('specialist_id'): row
+            for row in reviews.values('specialist_id').annotate(
+                rating_sum=Sum('rating'),
+                rating_count=Count('id'),
+                **{
+                    f'rating_{stars}_count': Count('id', filter=Q(rating=stars))
+                    for stars in range(1, 6)
+                },
+            )
+        }
+        user_ids = set(users.values_list('id', flat=True)) | set(stats)
+        
+        empty = dict.fromkeys(['rating_sum', 'rating_count', *star_fields], 0)
+        updated = []
+        for user_id in user_ids:
+            row = stats.get(user_id, empty)
+            count = row['rating_count']
+            updated.append(User(
+                pk=user_id,
+                rating=round(Decimal(row['rating_sum']) / count, 2) if count else Decimal('0.00'),
+                **row,
+            ))
+        User.objects.bulk_update(
+            updated, ['rating_sum', 'rating_count', 'rating', *star_fields], batch_size=500
+        )
+        return len(updated)
+
+
+class ReviewModerationQueue(Review):
+    """Отзывы, ожидающие модерации: отдельный раздел админки поверх той же таблицы."""
+    
+    class Meta:
+        proxy = True
+        verbose_name = 'отзыв на модерации'
+        verbose_name_plural = 'очередь модерации отзывов'
 
 
 class Deal(models.Model):
@@ -1205,6 +1269,9 @@ class Conversation(models.Model):
         related_name='conversations_as_participant2',
         verbose_name='участник 2'
     )
+    # Водяные знаки прочтения: id последнего прочитанного сообщения для каждого участника
+    participant1_last_read_id = models.PositiveBigIntegerField('прочитано участником 1 до', default=0)
+    participant2_last_read_id = models.PositiveBigIntegerField('прочитано участником 2 до', default=0)
     created_at = models.DateTimeField('дата создания', auto_now_add=True)
     updated_at = models.DateTimeField('дата обновления', auto_now=True)
     
@@ -1230,9 +1297,34 @@ class Conversation(models.Model):
         """Возвращает последнее сообщение в переписке."""
         return self.messages.order_by('-created_at').first()
     
+    def last_read_field(self, user):
+        """Возвращает имя поля с водяным знаком прочтения для участника."""
+        user_id = getattr(user, 'pk', user)
+        if user_id == self.participant1_id:
+            return 'participant1_last_read_id'
+        return 'participant2_last_read_id'
+    
     def get_unread_count(self, user):
         """Возвращает количество непрочитанных сообщений для пользователя."""
-        return self.messages.filter(is_read=False).exclude(sender=user).count()
+        last_read_id = getattr(self, self.last_read_field(user))
+        return self.messages.filter(id__gt=last_read_id).exclude(sender=user).count()
+    
+    def mark_read(self, user, up_to_id=None):
+        """
+        Сдвигает водяной знак прочтения участника одним UPDATE.
+        
+        Без up_to_id отмечает прочитанным всё, что уже сохранено в переписке.
+        Водяной знак только растёт.
+        """
+        field = self.last_read_field(user)
+        if up_to_id is None:
+            up_to_id = Coalesce(
+                Subquery(
+                    Message.objects.filter(conversation=OuterRef('pk')).order_by('-id').values('id')[:1]
+                ),
+                Value(0),
+            )
+        Conversation.objects.filter(pk=self.pk).update(**{field: Greatest(F(field), up_to_id)})
 
 
 class Message(models.Model):
@@ -1252,7 +1344,6 @@ class Message(models.Model):
         verbose_name='отправитель'
     )
     content = models.TextField('содержание')
-    is_read = models.BooleanField('прочитано', default=False)
     created_at = models.DateTimeField('дата создания', auto_now_add=True)
     
     class Meta:
@@ -1262,6 +1353,7 @@ class Message(models.Model):
         ordering = ['created_at']
         indexes = [
             models.Index(fields=['conversation', 'created_at']),
+            models.Index(fields=['conversation', 'id']),
             models.Index(fields=['sender', 'created_at']),
         ]
     
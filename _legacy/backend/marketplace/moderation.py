@@ -0,0 +1,57 @@
+"""
+Очередь модерации отзывов.
+
+Очередь — отзывы в статусе «на модерации» от старых к новым, выборка идёт
+по индексу (moderation_status, created_at). Массовое одобрение и отклонение
+выполняются одним UPDATE в обход Review.save(), поэтому рейтинг затронутых
+специалистов пересчитывается отдельно: один раз после коммита транзакции,
+пачками по batch_size специалистов, а не по отзыву за раз.
+"""
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import ranking
+from .models import Review
+
+RECOMPUTE_BATCH_SIZE = 500
+
+
+def pending_reviews():
+    """Отзывы, ожидающие модерации, в порядке поступления."""
+    return Review.objects.filter(
+        moderation_status=Review.ModerationStatus.PENDING
+    ).order_by('created_at', 'id')
+
+
+def moderate_reviews(reviews, status):
+    """
+    Переводит отзывы в статус status одним UPDATE.
+
+    reviews — queryset или список id. Возвращает число отзывов, у которых статус изменился.
+    Рейтинг меняется только при переходе в «отклонено» или из него (см. Review.rating_contribution),
+    поэтому пересчитываются лишь специалисты таких отзывов.
+    """
+    if hasattr(reviews, 'values_list'):
+        reviews = reviews.values_list('pk', flat=True)
+    review_ids = list(reviews)
+    rejected = Review.ModerationStatus.REJECTED
+
+    with transaction.atomic():
+        changed = Review.objects.filter(pk__in=review_ids).exclude(moderation_status=status)
+        crossing = ~Q(moderation_status=rejected) if status == rejected else Q(moderation_status=rejected)
+        specialist_ids = set(changed.filter(crossing).values_list('specialist_id', flat=True))
+        updated = changed.update(moderation_status=status, updated_at=timezone.now())
+        if specialist_ids:
+            transaction.on_commit(lambda: recompute_specialists(specialist_ids))
+    return updated
+
+
+def recompute_specialists(specialist_ids, batch_size=RECOMPUTE_BATCH_SIZE):
+    """Пересчитывает рейтинг и счёт в выдаче по таблице отзывов, пачками специалистов."""
+    specialist_ids = sorted(specialist_ids)
+    for start in range(0, len(specialist_ids), batch_size):
+        batch = specialist_ids[start:start + batch_size]
+        with transaction.atomic():
+            Review.recompute_ratings(batch)
+            ranking.refresh_all(specialist_ids=batch)
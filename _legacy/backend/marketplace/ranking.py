@@ -0,0 +1,131 @@
+"""
+Ранжирование специалистов: байесовское среднее с затуханием веса отзывов.
+
+score = (C * m + Σ wᵢ·rᵢ) / (C + Σ wᵢ), где wᵢ = 0.5 ** (возраст отзыва / период полураспада).
+
+Априорное среднее m с весом C не даёт одному отзыву на 5 звёзд обогнать сотню
+оценок 4.8, а затухание постепенно снижает влияние старых отзывов.
+Затухшие суммы хранятся у пользователя вместе с моментом последнего пересчёта,
+поэтому событие отзыва обновляет счёт за O(1); ночной пересчёт
+(manage.py refresh_ranking_scores) считает всё заново и доводит затухание до текущего момента.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+SECONDS_PER_DAY = 86400
+
+
+def prior_mean():
+    return getattr(settings, 'RANKING_PRIOR_MEAN', 3.5)
+
+
+def prior_weight():
+    return getattr(settings, 'RANKING_PRIOR_WEIGHT', 5)
+
+
+def half_life_seconds():
+    return getattr(settings, 'RANKING_HALF_LIFE_DAYS', 180) * SECONDS_PER_DAY
+
+
+def decay_factor(since, now):
+    """Во сколько раз уменьшается вес за время от since до now."""
+    if since is None:
+        return 1.0
+    elapsed = max((now - since).total_seconds(), 0)
+    return 0.5 ** (elapsed / half_life_seconds())
+
+
+def ranking_score(decayed_sum, decayed_weight):
+    """Байесовское среднее; без отзывов специалист остаётся внизу списка."""
+    if decayed_weight <= 0:
+        return 0.0
+    return round(
+        (prior_weight() * prior_mean() + decayed_sum) / (prior_weight() + decayed_weight),
+        4,
+    )
+
+
+def apply_review_change(specialist_id, created_at, old_rating=None, new_rating=None):
+    """
+    Инкрементально обновляет счёт специалиста при событии отзыва.
+
+    old_rating — оценка, которую нужно убрать (изменение или удаление),
+    new_rating — оценка, которую нужно добавить (создание или изменение).
+    """
+    User = get_user_model()
+    now = timezone.now()
+
+    with transaction.atomic():
+        user = User.objects.select_for_update().only(
+            'id', 'ranking_decayed_sum', 'ranking_decayed_weight', 'ranking_updated_at'
+        ).filter(pk=specialist_id).first()
+        if user is None:
+            return
+
+        factor = decay_factor(user.ranking_updated_at, now)
+        decayed_sum = user.ranking_decayed_sum * factor
+        decayed_weight = user.ranking_decayed_weight * factor
+
+        review_weight = decay_factor(created_at, now)
+        if old_rating is not None:
+            decayed_sum -= review_weight * old_rating
+            decayed_weight -= review_weight
+        if new_rating is not None:
+            decayed_sum += review_weight * new_rating
+            decayed_weight += review_weight
+
+        # Погрешность float не должна уводить суммы ниже нуля
+        decayed_sum = max(decayed_sum, 0.0)
+        decayed_weight = max(decayed_weight, 0.0)
+
+        User.objects.filter(pk=specialist_id).update(
+            ranking_decayed_sum=decayed_sum,
+            ranking_decayed_weight=decayed_weight,
+            ranking_updated_at=now,
+            ranking_score=ranking_score(decayed_sum, decayed_weight),
+        )
+
+
+def refresh_all(batch_size=500, specialist_ids=None, user_model=None, review_model=None):
+    """
+    Полный пересчёт счёта по таблице отзывов (ночная задача, миграция и восстановление).
+    specialist_ids ограничивает пересчёт указанными специалистами;
+    user_model и review_model — исторические модели, когда вызывается из миграции.
+    Возвращает число обновлённых специалистов.
+    """
+    from .models import Review
+
+    User = user_model or get_user_model()
+    now = timezone.now()
+    reviews = (review_model or Review).objects.exclude(moderation_status=Review.ModerationStatus.REJECTED)
+    if specialist_ids is not None:
+        reviews = reviews.filter(specialist_id__in=specialist_ids)
+
+    totals = {}
+    for specialist_id, rating, created_at in reviews.values_list(
+        'specialist_id', 'rating', 'created_at'
+    ).iterator(chunk_size=2000):
+        weight = decay_factor(created_at, now)
+        decayed_sum, decayed_weight = totals.get(specialist_id, (0.0, 0.0))
+        totals[specialist_id] = (decayed_sum + weight * rating, decayed_weight + weight)
+
+    if specialist_ids is None:
+        specialist_ids = set(User.objects.filter(is_specialist=True).values_list('id', flat=True)) | set(totals)
+    users = []
+    for specialist_id in specialist_ids:
+        decayed_sum, decayed_weight = totals.get(specialist_id, (0.0, 0.0))
+        users.append(User(
+            pk=specialist_id,
+            ranking_decayed_sum=decayed_sum,
+            ranking_decayed_weight=decayed_weight,
+            ranking_updated_at=now,
+            ranking_score=ranking_score(decayed_sum, decayed_weight),
+        ))
+    User.objects.bulk_update(
+        users,
+        ['ranking_decayed_sum', 'ranking_decayed_weight', 'ranking_updated_at', 'ranking_score'],
+        batch_size=batch_size,
+    )
+    return len(users)
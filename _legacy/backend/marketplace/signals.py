@@ -0,0 +1,64 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import ranking
+from .chat_access import invalidate_participants
+from .models import Conversation, Review
+
+
+@receiver(post_save, sender=Conversation)
+@receiver(post_delete, sender=Conversation)
+def reset_conversation_participants(sender, instance, using, **kwargs):
+    """
+    Сбрасывает кэш участников переписки при её изменении или удалении.
+
+    Сброс — после коммита: иначе параллельный запрос успеет снова
+    закэшировать состояние до коммита на весь TTL общего кэша.
+    """
+    conversation_id = instance.pk
+    transaction.on_commit(lambda: invalidate_participants(conversation_id), using=using)
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_contribution(sender, instance, raw=False, **kwargs):
+    """
+    Запоминает вклад отзыва в рейтинг до изменения (см. apply_review_contribution).
+    """
+    previous = None
+    if not raw and not instance._state.adding:
+        previous = Review.objects.filter(pk=instance.pk).values_list(
+            'specialist_id', 'rating', 'moderation_status'
+        ).first()
+    instance._previous_contribution = Review.rating_contribution(*previous) if previous else None
+
+
+@receiver(post_save, sender=Review)
+def apply_review_contribution(sender, instance, raw=False, **kwargs):
+    """
+    Инкрементально обновляет рейтинг и счёт в выдаче специалиста при сохранении отзыва.
+    """
+    if raw:
+        return
+    old = getattr(instance, '_previous_contribution', None)
+    new = Review.rating_contribution(instance.specialist_id, instance.rating, instance.moderation_status)
+    if old != new:
+        if old is not None:
+            Review.apply_rating_delta(old[0], old[1], -1)
+            ranking.apply_review_change(old[0], instance.created_at, old_rating=old[1])
+        if new is not None:
+            Review.apply_rating_delta(new[0], new[1], 1)
+            ranking.apply_review_change(new[0], instance.created_at, new_rating=new[1])
+    instance._previous_contribution = new
+
+
+@receiver(post_delete, sender=Review)
+def withdraw_review_contribution(sender, instance, **kwargs):
+    """
+    Вычитает удалённый отзыв из рейтинга. Срабатывает и для удаления через queryset,
+    и для каскадного удаления вместе со сделкой или пользователем — в обход Review.delete().
+    QuerySet.update() сигналов не шлёт: после него нужен Review.recompute_ratings.
+    """
+    if Review.rating_contribution(instance.specialist_id, instance.rating, instance.moderation_status):
+        Review.apply_rating_delta(instance.specialist_id, instance.rating, -1)
+        ranking.apply_review_change(instance.specialist_id, instance.created_at, old_rating=instance.rating)
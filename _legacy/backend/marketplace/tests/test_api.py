@@ -1,8 +1,9 @@
 from django.test import TestCase
+from django.urls import reverse
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
-from marketplace.models import Category, Task, Offer, Deal
+from marketplace.models import Category, Task, Offer, Deal, Review
 from decimal import Decimal
 
 User = get_user_model()
@@ -196,3 +197,56 @@ class AuthenticationTest(TestCase):
         
         # Should be allowed (IsAuthenticatedOrReadOnly)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class SpecialistReviewFeedTest(TestCase):
+    """Test the cursor-paginated review feed and the stored rating summary."""
+    
+    def setUp(self):
+        self.api = APIClient()
+        self.specialist = User.objects.create_user(
+            username='feedspec', email='feedspec@test.com', is_specialist=True
+        )
+        category = Category.objects.create(name='Feed', slug='feed')
+        for i, rating in enumerate([5, 4, 5, 3, 5]):
+            client = User.objects.create_user(username=f'feed{i}', email=f'feed{i}@test.com', is_client=True)
+            task = Task.objects.create(
+                client=client, category=category, title=f'Task {i}', description='d',
+                budget_min=1000, budget_max=2000, city='Tashkent'
+            )
+            Review.objects.create(specialist=self.specialist, client=client, task=task, rating=rating)
+        self.url = reverse('marketplace:specialist_reviews', args=[self.specialist.id])
+    
+    def test_walks_all_pages_newest_first(self):
+        """Test that following next links returns every review once, newest first."""
+        seen = []
+        url = f'{self.url}?page_size=2'
+        while url:
+            response = self.api.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(review['id'] for review in response.data['results'])
+            url = response.data['next']
+        
+        expected = list(
+            Review.objects.filter(specialist=self.specialist).order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(seen, expected)
+    
+    def test_summary_comes_from_specialist_row(self):
+        """Test that the page carries the histogram without aggregating reviews."""
+        # specialist, page of reviews
+        with self.assertNumQueries(2):
+            response = self.api.get(self.url)
+        self.assertEqual(response.data['summary'], {
+            'average': 4.4,
+            'total': 5,
+            'histogram': {'5': 3, '4': 1, '3': 1, '2': 0, '1': 0},
+        })
+    
+    def test_profile_page_uses_stored_stats(self):
+        """Test that the profile renders the rating breakdown from stored counters."""
+        response = self.client.get(reverse('marketplace:specialist_detail', args=[self.specialist.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.context['rating_stats'], {'5': 3, '4': 1, '3': 1, '2': 0, '1': 0})
+        self.assertEqual(response.context['reviews_total'], 5)
+        self.assertNotIn('reviews_feed_url', response.context)
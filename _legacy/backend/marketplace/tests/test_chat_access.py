@@ -0,0 +1,104 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from marketplace import chat_access
+from marketplace.models import Conversation, Message
+
+User = get_user_model()
+
+
+class ParticipantCacheTest(TestCase):
+    """Test cached participant lookups for chat authorization."""
+
+    def setUp(self):
+        cache.clear()
+        chat_access._local.clear()
+        self.alice = User.objects.create_user(username='alice', email='alice@test.com', is_client=True)
+        self.bob = User.objects.create_user(username='bob', email='bob@test.com', is_specialist=True)
+        self.carol = User.objects.create_user(username='carol', email='carol@test.com', is_specialist=True)
+        self.conversation = Conversation.objects.create(participant1=self.alice, participant2=self.bob)
+
+    def test_lookup_hits_database_once(self):
+        """Test that only the first check queries the database."""
+        with self.assertNumQueries(1):
+            self.assertTrue(chat_access.is_participant(self.conversation.id, self.alice.id))
+        with self.assertNumQueries(0):
+            self.assertTrue(chat_access.is_participant(self.conversation.id, self.bob.id))
+            self.assertFalse(chat_access.is_participant(self.conversation.id, self.carol.id))
+
+    def test_shared_cache_used_after_local_miss(self):
+        """Test that another process (empty local dict) reads from the shared cache."""
+        chat_access.get_participant_ids(self.conversation.id)
+        chat_access._local.clear()
+
+        with self.assertNumQueries(0):
+            self.assertTrue(chat_access.is_participant(self.conversation.id, self.bob.id))
+
+    def test_membership_change_invalidates(self):
+        """Test that saving a conversation drops the cached participant set."""
+        self.assertFalse(chat_access.is_participant(self.conversation.id, self.carol.id))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.conversation.participant2 = self.carol
+            self.conversation.save()
+            # Not before commit: a concurrent reader would re-cache the old participants
+            self.assertFalse(chat_access.is_participant(self.conversation.id, self.carol.id))
+
+        self.assertTrue(chat_access.is_participant(self.conversation.id, self.carol.id))
+        self.assertFalse(chat_access.is_participant(self.conversation.id, self.bob.id))
+
+    def test_deleted_conversation_denies_access(self):
+        """Test that deleting a conversation revokes access."""
+        conversation_id = self.conversation.id
+        self.assertTrue(chat_access.is_participant(conversation_id, self.alice.id))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.conversation.delete()
+
+        self.assertFalse(chat_access.is_participant(conversation_id, self.alice.id))
+
+
+class ConversationListViewTest(TestCase):
+    """Test that the conversation list does not query per conversation."""
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', email='alice@test.com', password='pass12345', is_client=True)
+        self.client.force_login(self.alice)
+
+    def _add_conversation(self, index, messages=3):
+        other = User.objects.create_user(username=f'spec{index}', email=f'spec{index}@test.com', is_specialist=True)
+        conversation = Conversation.objects.create(participant1=self.alice, participant2=other)
+        for i in range(messages):
+            Message.objects.create(conversation=conversation, sender=other, content=f'msg {i}')
+        return conversation
+
+    def _query_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('marketplace:conversation_list'))
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response
+
+    def test_query_count_independent_of_history(self):
+        """Test that more conversations and messages do not add queries."""
+        self._add_conversation(0)
+        baseline, _ = self._query_count()
+
+        for index in range(1, 6):
+            self._add_conversation(index, messages=10)
+        self.assertEqual(self._query_count()[0], baseline)
+
+    def test_annotations(self):
+        """Test last message and unread count come from the annotated query."""
+        conversation = self._add_conversation(0)
+        conversation.mark_read(self.alice)
+        Message.objects.create(conversation=conversation, sender=conversation.participant2, content='latest')
+
+        _, response = self._query_count()
+        item = response.context['conversations_with_data'][0]
+        self.assertEqual(item['unread_count'], 1)
+        self.assertEqual(item['last_message']['content'], 'latest')
+        self.assertEqual(item['other_participant'], conversation.participant2)
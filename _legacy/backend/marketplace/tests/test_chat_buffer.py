@@ -0,0 +1,102 @@
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from marketplace import chat_buffer
+from marketplace.chat_buffer import MessageWriteBuffer, lifespan_app
+from marketplace.models import Conversation, Message
+
+User = get_user_model()
+
+
+class MessageWriteBufferTest(TestCase):
+    """Test batched persistence of chat messages."""
+
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', email='alice@test.com', is_client=True)
+        self.bob = User.objects.create_user(username='bob', email='bob@test.com', is_specialist=True)
+        self.conversation = Conversation.objects.create(participant1=self.alice, participant2=self.bob)
+        self.buffer = MessageWriteBuffer(flush_interval=60, max_batch=100)
+
+    def test_flush_writes_batch_with_fixed_queries(self):
+        """Test that a flush is one INSERT and one UPDATE regardless of batch size."""
+        before = self.conversation.updated_at
+        for i in range(10):
+            async_to_sync(self.buffer.add)(self.conversation.id, self.alice.id, f'msg {i}')
+        self.assertEqual(Message.objects.count(), 0)
+
+        # INSERT + UPDATE, wrapped in a savepoint inside the test transaction
+        with self.assertNumQueries(4):
+            saved = async_to_sync(self.buffer.flush)()
+
+        self.assertEqual(saved, 10)
+        self.assertEqual(Message.objects.filter(conversation=self.conversation).count(), 10)
+        self.conversation.refresh_from_db()
+        self.assertGreater(self.conversation.updated_at, before)
+
+    def test_failed_flush_keeps_messages(self):
+        """Test that messages survive a failed write (at-least-once)."""
+        async_to_sync(self.buffer.add)(self.conversation.id, self.alice.id, 'hello')
+
+        with mock.patch('marketplace.chat_buffer.persist_messages', side_effect=RuntimeError('db down')):
+            self.assertEqual(async_to_sync(self.buffer.flush)(), 0)
+        self.assertEqual(len(self.buffer), 1)
+
+        self.assertEqual(async_to_sync(self.buffer.flush)(), 1)
+        self.assertTrue(Message.objects.filter(content='hello').exists())
+
+    def test_drain_on_shutdown(self):
+        """Test that drain_sync writes whatever is still buffered."""
+        async_to_sync(self.buffer.add)(self.conversation.id, self.bob.id, 'bye')
+
+        self.assertEqual(self.buffer.drain_sync(), 1)
+        self.assertEqual(len(self.buffer), 0)
+        self.assertTrue(Message.objects.filter(content='bye', sender=self.bob).exists())
+
+    def test_bad_message_dropped_after_retries(self):
+        """Test that a permanently failing message does not block the rest of the buffer."""
+        buffer = MessageWriteBuffer(flush_interval=60, max_batch=100, max_retries=2)
+        async_to_sync(buffer.add)(self.conversation.id, self.alice.id, 'before')
+        async_to_sync(buffer.add)(self.conversation.id + 1000, self.alice.id, 'orphan')
+
+        # The orphan breaks the whole INSERT until the retry budget runs out
+        with mock.patch('marketplace.chat_buffer.persist_messages', side_effect=RuntimeError('fk violation')):
+            self.assertEqual(async_to_sync(buffer.flush)(), 0)
+        async_to_sync(buffer.add)(self.conversation.id, self.bob.id, 'after')
+
+        real_persist = chat_buffer.persist_messages
+
+        def fail_on_orphan(batch):
+            if any(item['content'] == 'orphan' for item in batch):
+                raise RuntimeError('fk violation')
+            real_persist(batch)
+
+        with mock.patch('marketplace.chat_buffer.persist_messages', side_effect=fail_on_orphan):
+            self.assertEqual(async_to_sync(buffer.flush)(), 2)
+
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(
+            set(Message.objects.values_list('content', flat=True)), {'before', 'after'}
+        )
+
+    def test_lifespan_shutdown_flushes(self):
+        """Test that ASGI lifespan shutdown writes out the shared buffer."""
+        incoming = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+        sent = []
+
+        async def receive():
+            return incoming.pop(0)
+
+        async def send(message):
+            sent.append(message['type'])
+
+        async def run():
+            await chat_buffer.message_buffer.add(self.conversation.id, self.alice.id, 'last words')
+            await lifespan_app({'type': 'lifespan'}, receive, send)
+
+        async_to_sync(run)()
+        self.assertEqual(sent, ['lifespan.startup.complete', 'lifespan.shutdown.complete'])
+        self.assertEqual(len(chat_buffer.message_buffer), 0)
+        self.assertTrue(Message.objects.filter(content='last words').exists())
@@ -0,0 +1,126 @@
+from asgiref.sync import async_to_sync
+from channels.layers import channel_layers
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TransactionTestCase, override_settings
+
+from marketplace import chat_access
+from marketplace.chat_buffer import message_buffer
+from marketplace.models import Conversation
+from marketplace.routing import websocket_urlpatterns
+
+User = get_user_model()
+
+IN_MEMORY_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+@override_settings(CHANNEL_LAYERS=IN_MEMORY_LAYERS)
+class ChatPresenceTest(TransactionTestCase):
+    """Test presence and typing events over the channel layer."""
+
+    def setUp(self):
+        cache.clear()
+        chat_access._local.clear()
+        channel_layers.backends.clear()
+        self.alice = User.objects.create_user(username='alice', email='alice@test.com', is_client=True)
+        self.bob = User.objects.create_user(username='bob', email='bob@test.com', is_specialist=True)
+        self.conversation = Conversation.objects.create(participant1=self.alice, participant2=self.bob)
+        self.application = URLRouter(websocket_urlpatterns)
+
+    def communicator(self, user):
+        communicator = WebsocketCommunicator(self.application, f'/ws/chat/{self.conversation.id}/')
+        communicator.scope['user'] = user
+        return communicator
+
+    def test_presence_and_typing(self):
+        async_to_sync(self._presence_and_typing)()
+
+    async def _presence_and_typing(self):
+        alice = self.communicator(self.alice)
+        connected, _ = await alice.connect()
+        self.assertTrue(connected)
+
+        bob = self.communicator(self.bob)
+        await bob.connect()
+        # Bob learns Alice is already online, Alice learns Bob arrived
+        self.assertEqual(
+            await bob.receive_json_from(),
+            {'type': 'presence', 'user_id': self.alice.id, 'status': 'online'},
+        )
+        self.assertEqual(
+            await alice.receive_json_from(),
+            {'type': 'presence', 'user_id': self.bob.id, 'status': 'online'},
+        )
+
+        # Repeated keystrokes and heartbeats inside the TTL window are coalesced
+        for _ in range(5):
+            await bob.send_json_to({'type': 'typing'})
+            await bob.send_json_to({'type': 'heartbeat'})
+        self.assertEqual(
+            await alice.receive_json_from(),
+            {'type': 'presence', 'user_id': self.bob.id, 'status': 'typing'},
+        )
+        self.assertTrue(await alice.receive_nothing())
+
+        await bob.disconnect()
+        self.assertEqual(
+            await alice.receive_json_from(),
+            {'type': 'presence', 'user_id': self.bob.id, 'status': 'offline'},
+        )
+        await alice.disconnect()
+
+    def test_second_tab_keeps_user_online(self):
+        async_to_sync(self._second_tab_keeps_user_online)()
+
+    async def _second_tab_keeps_user_online(self):
+        alice = self.communicator(self.alice)
+        await alice.connect()
+        bob_tabs = [self.communicator(self.bob), self.communicator(self.bob)]
+        for tab in bob_tabs:
+            await tab.connect()
+            await tab.receive_json_from()
+        # Only the first tab is an arrival
+        self.assertEqual(
+            await alice.receive_json_from(),
+            {'type': 'presence', 'user_id': self.bob.id, 'status': 'online'},
+        )
+        self.assertTrue(await alice.receive_nothing())
+
+        await bob_tabs[0].disconnect()
+        self.assertTrue(await alice.receive_nothing())
+
+        # Messages are tagged so clients can tell them from presence frames
+        await bob_tabs[1].send_json_to({'message': 'hi'})
+        message = await alice.receive_json_from()
+        self.assertEqual((message['type'], message['message']), ('message', 'hi'))
+        await message_buffer.flush()
+
+        await bob_tabs[1].disconnect()
+        self.assertEqual(
+            await alice.receive_json_from(),
+            {'type': 'presence', 'user_id': self.bob.id, 'status': 'offline'},
+        )
+        await alice.disconnect()
+
+    @override_settings(CHAT_PRESENCE_TTL=1)
+    def test_expired_presence_reported_offline(self):
+        async_to_sync(self._expired_presence_reported_offline)()
+
+    async def _expired_presence_reported_offline(self):
+        alice = self.communicator(self.alice)
+        await alice.connect()
+        bob = self.communicator(self.bob)
+        await bob.connect()
+        self.assertEqual((await alice.receive_json_from())['status'], 'online')
+
+        # Bob's socket stays open but stops heartbeating
+        while True:
+            await alice.send_json_to({'type': 'heartbeat'})
+            frame = await alice.receive_json_from(timeout=1.5)
+            if frame['user_id'] == self.bob.id:
+                break
+        self.assertEqual(frame, {'type': 'presence', 'user_id': self.bob.id, 'status': 'offline'})
+        await bob.disconnect()
+        await alice.disconnect()
@@ -1,7 +1,12 @@
+from datetime import timedelta
+from importlib import import_module
+from django.apps import apps as django_apps
 from django.test import TestCase
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 from decimal import Decimal
-from marketplace.models import Category, Task, Offer, Deal, Review, Dispute
+from marketplace.models import Category, Task, Offer, Deal, Review, Dispute, Conversation, Message
+from marketplace import moderation, ranking
 from payments.models import Wallet
 
 User = get_user_model()
@@ -257,3 +262,252 @@ class DisputeModelTest(TestCase):
         
         self.assertEqual(dispute.status, Dispute.Status.RESOLVED)
         self.assertEqual(dispute.resolution, Dispute.Resolution.REFUND_CLIENT)
+
+
+class ConversationReadWatermarkTest(TestCase):
+    """Test read receipts stored as per-participant watermarks."""
+    
+    def setUp(self):
+        self.alice = User.objects.create_user(username='alice', email='alice@test.com', is_client=True)
+        self.bob = User.objects.create_user(username='bob', email='bob@test.com', is_specialist=True)
+        self.conversation = Conversation.objects.create(participant1=self.alice, participant2=self.bob)
+        for i in range(3):
+            Message.objects.create(conversation=self.conversation, sender=self.alice, content=f'hi {i}')
+    
+    def test_unread_count_excludes_own_messages(self):
+        """Test that unread counts only include the other participant's messages."""
+        self.assertEqual(self.conversation.get_unread_count(self.bob), 3)
+        self.assertEqual(self.conversation.get_unread_count(self.alice), 0)
+    
+    def test_mark_read_is_single_update(self):
+        """Test that marking read touches one row regardless of history size."""
+        with self.assertNumQueries(1):
+            self.conversation.mark_read(self.bob)
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.get_unread_count(self.bob), 0)
+        
+        Message.objects.create(conversation=self.conversation, sender=self.alice, content='new')
+        self.assertEqual(self.conversation.get_unread_count(self.bob), 1)
+    
+    def test_watermark_never_moves_back(self):
+        """Test that an older message id does not rewind the watermark."""
+        self.conversation.mark_read(self.bob)
+        first_id = self.conversation.messages.order_by('id').first().id
+        self.conversation.mark_read(self.bob, up_to_id=first_id)
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.get_unread_count(self.bob), 0)
+
+
+class ReviewFixturesMixin:
+    """Specialist with several clients, each with a task to review."""
+    
+    review_slots = 3
+    
+    def setUp(self):
+        self.specialist = User.objects.create_user(username='spec', email='spec@test.com', is_specialist=True)
+        self.category = Category.objects.create(name='Ratings', slug='ratings')
+        self.clients = []
+        self.tasks = []
+        for i in range(self.review_slots):
+            client = User.objects.create_user(username=f'rc{i}', email=f'rc{i}@test.com', is_client=True)
+            self.clients.append(client)
+            self.tasks.append(Task.objects.create(
+                client=client, category=self.category, title=f'Task {i}', description='d',
+                budget_min=1000, budget_max=2000, city='Tashkent'
+            ))
+    
+    def _review(self, i, rating):
+        return Review.objects.create(
+            specialist=self.specialist, client=self.clients[i], task=self.tasks[i], rating=rating
+        )
+
+
+class ReviewRatingTest(ReviewFixturesMixin, TestCase):
+    """Test incremental specialist rating maintenance."""
+    
+    def test_insert_update_delete(self):
+        """Test that each write adjusts the sum and count without re-aggregating."""
+        first = self._review(0, 5)
+        self._review(1, 4)
+        self.specialist.refresh_from_db()
+        self.assertEqual((self.specialist.rating_sum, self.specialist.rating_count), (9, 2))
+        self.assertEqual(self.specialist.rating, Decimal('4.50'))
+        
+        first.rating = 2
+        first.save()
+        self.specialist.refresh_from_db()
+        self.assertEqual(self.specialist.rating, Decimal('3.00'))
+        
+        first.delete()
+        self.specialist.refresh_from_db()
+        self.assertEqual((self.specialist.rating_sum, self.specialist.rating_count), (4, 1))
+        self.assertEqual(self.specialist.rating, Decimal('4.00'))
+    
+    def test_histogram_follows_writes(self):
+        """Test that per-star counters move with create, rating change and delete."""
+        first = self._review(0, 5)
+        self._review(1, 5)
+        self._review(2, 3)
+        self.specialist.refresh_from_db()
+        self.assertEqual(self.specialist.rating_histogram, {5: 2, 4: 0, 3: 1, 2: 0, 1: 0})
+        
+        first.rating = 1
+        first.save()
+        first.delete()
+        self.specialist.refresh_from_db()
+        self.assertEqual(self.specialist.rating_histogram, {5: 1, 4: 0, 3: 1, 2: 0, 1: 0})
+        self.assertEqual(
+            self.specialist.rating_summary,
+            {'average': 4.0, 'total': 2, 'histogram': {'5': 1, '4': 0, '3': 1, '2': 0, '1': 0}},
+        )
+    
+    def test_save_does_not_aggregate(self):
+        """Test that a new review costs a fixed number of queries."""
+        self._review(0, 5)
+        # INSERT, rating UPDATE, ranking savepoint + SELECT FOR UPDATE + UPDATE + release
+        with self.assertNumQueries(6):
+            self._review(1, 3)
+    
+    def test_cascade_and_queryset_deletes_adjust_rating(self):
+        """Test that deletes bypassing Review.delete() still move the counters."""
+        self._review(0, 5)
+        self._review(1, 4)
+        self._review(2, 1)
+        
+        self.tasks[0].delete()  # cascades to the review
+        Review.objects.filter(client=self.clients[2]).delete()
+        self.specialist.refresh_from_db()
+        self.assertEqual((self.specialist.rating_sum, self.specialist.rating_count), (4, 1))
+        self.assertEqual(self.specialist.rating_histogram, {5: 0, 4: 1, 3: 0, 2: 0, 1: 0})
+    
+    def test_recompute_repairs_drift(self):
+        """Test that the repair command restores sums from the reviews table."""
+        self._review(0, 5)
+        self._review(1, 2)
+        User.objects.filter(pk=self.specialist.pk).update(
+            rating_sum=0, rating_count=0, rating=0, rating_5_count=0, rating_1_count=3
+        )
+        
+        Review.recompute_ratings()
+        self.specialist.refresh_from_db()
+        self.assertEqual((self.specialist.rating_sum, self.specialist.rating_count), (7, 2))
+        self.assertEqual(self.specialist.rating, Decimal('3.50'))
+        self.assertEqual(self.specialist.rating_histogram, {5: 1, 4: 0, 3: 0, 2: 1, 1: 0})
+
+
+class RankingScoreTest(ReviewFixturesMixin, TestCase):
+    """Test the Bayesian, time-decayed ranking score."""
+    
+    review_slots = 10
+    
+    def test_many_good_reviews_beat_one_perfect(self):
+        """Test that a single 5-star review does not outrank a long record averaging 4.6."""
+        for i, rating in enumerate([5, 5, 5, 5, 5, 5, 4, 4, 4, 4]):
+            self._review(i, rating)
+        newcomer = User.objects.create_user(username='new', email='new@test.com', is_specialist=True)
+        Review.objects.create(specialist=newcomer, client=self.clients[0], task=self.tasks[0], rating=5)
+        
+        self.specialist.refresh_from_db()
+        newcomer.refresh_from_db()
+        self.assertGreater(self.specialist.ranking_score, newcomer.ranking_score)
+        self.assertEqual(
+            list(User.objects.filter(is_specialist=True).order_by('-ranking_score')[:2]),
+            [self.specialist, newcomer],
+        )
+    
+    def test_incremental_matches_batch(self):
+        """Test that incremental updates agree with the nightly recompute."""
+        review = self._review(0, 5)
+        self._review(1, 2)
+        review.rating = 3
+        review.save()
+        self.specialist.refresh_from_db()
+        incremental = self.specialist.ranking_score
+        
+        ranking.refresh_all()
+        self.specialist.refresh_from_db()
+        self.assertAlmostEqual(self.specialist.ranking_score, incremental, places=3)
+    
+    def test_migration_backfills_scores(self):
+        """Test that the backfill migration fills ranking_score added with default 0."""
+        self._review(0, 5)
+        self._review(1, 4)
+        self.specialist.refresh_from_db()
+        expected = self.specialist.ranking_score
+        User.objects.filter(pk=self.specialist.pk).update(
+            ranking_score=0, ranking_decayed_sum=0, ranking_decayed_weight=0, ranking_updated_at=None
+        )
+        
+        migration = import_module('marketplace.migrations.0023_backfill_ranking_scores')
+        migration.backfill_ranking_scores(django_apps, None)
+        self.specialist.refresh_from_db()
+        self.assertAlmostEqual(self.specialist.ranking_score, expected, places=3)
+    
+    def test_old_reviews_weigh_less(self):
+        """Test that decay lets recent reviews dominate."""
+        old = self._review(0, 1)
+        Review.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=720))
+        self._review(1, 5)
+        ranking.refresh_all()
+        self.specialist.refresh_from_db()
+        self.assertGreater(self.specialist.ranking_score, ranking.ranking_score(6, 2))
+
+
+class ReviewModerationTest(ReviewFixturesMixin, TestCase):
+    """Test the review moderation queue and bulk status changes."""
+    
+    def test_queue_is_pending_oldest_first(self):
+        """Test that the queue holds only pending reviews in arrival order."""
+        first = self._review(0, 5)
+        second = self._review(1, 4)
+        approved = self._review(2, 3)
+        Review.objects.filter(pk=first.pk).update(created_at=timezone.now() - timedelta(days=1))
+        Review.objects.filter(pk=approved.pk).update(moderation_status=Review.ModerationStatus.APPROVED)
+        
+        self.assertEqual(list(moderation.pending_reviews()), [first, second])
+    
+    def test_bulk_reject_defers_recompute(self):
+        """Test that rejecting is one UPDATE and ratings follow once the transaction commits."""
+        reviews = [self._review(0, 5), self._review(1, 1), self._review(2, 3)]
+        ids = [reviews[0].pk, reviews[1].pk]
+        
+        with self.captureOnCommitCallbacks() as callbacks:
+            # savepoint, affected specialists, UPDATE, release
+            with self.assertNumQueries(4):
+                updated = moderation.moderate_reviews(ids, Review.ModerationStatus.REJECTED)
+        self.assertEqual(updated, 2)
+        self.specialist.refresh_from_db()
+        self.assertEqual(self.specialist.rating_count, 3)
+        
+        self.assertEqual(len(callbacks), 1)
+        callbacks[0]()
+        self.specialist.refresh_from_db()
+        self.assertEqual((self.specialist.rating_sum, self.specialist.rating_count), (3, 1))
+        self.assertEqual(self.specialist.rating_histogram, {5: 0, 4: 0, 3: 1, 2: 0, 1: 0})
+        self.assertAlmostEqual(self.specialist.ranking_score, ranking.ranking_score(3, 1), places=2)
+    
+    def test_approving_pending_skips_recompute(self):
+        """Test that approval of counted reviews schedules no rating work."""
+        review = self._review(0, 4)
+        with self.captureOnCommitCallbacks() as callbacks:
+            updated = moderation.moderate_reviews(Review.objects.all(), Review.ModerationStatus.APPROVED)
+        self.assertEqual(updated, 1)
+        self.assertEqual(callbacks, [])
+        review.refresh_from_db()
+        self.assertEqual(review.moderation_status, Review.ModerationStatus.APPROVED)
+    
+    def test_single_rejection_is_incremental(self):
+        """Test that rejecting through save() removes the review from the rating and restoring adds it back."""
+        review = self._review(0, 2)
+        self._review(1, 4)
+        review.moderation_status = Review.ModerationStatus.REJECTED
+        review.save()
+        self.specialist.refresh_from_db()
+        self.assertEqual((self.specialist.rating_sum, self.specialist.rating_count), (4, 1))
+        
+        review.moderation_status = Review.ModerationStatus.APPROVED
+        review.save()
+        review.delete()
+        self.specialist.refresh_from_db()
+        self.assertEqual((self.specialist.rating_sum, self.specialist.rating_count), (4, 1))
+        self.assertEqual(self.specialist.rating, Decimal('4.00'))
@@ -21,6 +21,7 @@ from .views import (
 from .api.search import search_suggestions
 from .api.booking import get_availability, create_booking
 from .api.portfolio import reorder_portfolio, bulk_upload_portfolio
+from .api.reviews import specialist_reviews
 
 app_name = 'marketplace'
 
@@ -65,6 +66,7 @@ urlpatterns = [
     path('api/specialist/<int:specialist_id>/', get_specialist_data, name='get_specialist_data'),
     path('api/search/suggestions/', search_suggestions, name='search_suggestions'),
     path('api/specialist/<int:specialist_id>/availability/', get_availability, name='get_availability'),
+    path('api/specialist/<int:specialist_id>/reviews/', specialist_reviews, name='specialist_reviews'),
     path('api/bookings/create/', create_booking, name='create_booking'),
     path('api/portfolio/reorder/', reorder_portfolio, name='reorder_portfolio'),
     path('api/portfolio/bulk-upload/', bulk_upload_portfolio, name='bulk_upload_portfolio'),
@@ -13,7 +13,7 @@ from django.views.decorators.http import require_POST
 from django.contrib import messages
 from django.shortcuts import redirect, get_object_or_404, render
 from django.http import JsonResponse
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from django.views import View
 from django.contrib.auth import get_user_model
 from rest_framework import status
@@ -23,6 +23,7 @@ from .forms import (
     TaskCreateForm, OfferCreateForm, ReviewCreateForm, PortfolioItemForm,
     TaskWizardStep1Form, TaskWizardStep2Form, TaskWizardStep3Form
 )
+from .api.reviews import ReviewFeedPagination
 
 User = get_user_model()
 
@@ -76,7 +77,7 @@ def home(request):
         'specialist_profile__categories',
         'portfolio_items',
         'reviews_received'
-    ).order_by('-rating')[:8]  # Увеличили до 8 для карусели
+    ).order_by('-ranking_score')[:8]  # Увеличили до 8 для карусели; счёт см. marketplace.ranking
     
     specialists_count = User.objects.filter(is_specialist=True).count()
     cities_count = 10  # Заглушка
@@ -783,13 +784,15 @@ def get_specialist_data(request, specialist_id):
             'image_url': item.image.url if item.image else None,
         } for item in portfolio_items]
         
-        # Получаем отзывы
-        reviews = Review.objects.filter(specialist=specialist).select_related('task', 'client').order_by('-created_at')[:10]
+        # Первая страница отзывов; остальные подгружаются через api/specialist/<id>/reviews/
+        reviews = Review.objects.filter(specialist=specialist).exclude(
+            moderation_status=Review.ModerationStatus.REJECTED
+        ).select_related('task', 'client').order_by('-created_at', '-id')[:10]
         reviews_data = [{
             'id': review.id,
             'client_name': review.client.username,
             'rating': review.rating,
-            'comment': review.comment,
+            'comment': review.text or '',
             'created_at': review.created_at.strftime('%d.%m.%Y'),
             'task_title': review.task.title if review.task else None,
         } for review in reviews]
@@ -800,7 +803,8 @@ def get_specialist_data(request, specialist_id):
             'username': specialist.username,
             'avatar_url': specialist.avatar.url if specialist.avatar else f'https://ui-avatars.com/api/?name={specialist.username}&background=random',
             'rating': float(specialist.rating) if specialist.rating else 0,
-            'reviews_count': reviews.count(),
+            'reviews_count': specialist.rating_count,
+            'rating_summary': specialist.rating_summary,
             'profession': profile.categories.first().name if profile.categories.exists() else 'Специалист',
             'description': profile.description or 'Описание отсутствует',
             'years_of_experience': profile.years_of_experience,
@@ -831,14 +835,12 @@ class SpecialistDetailView(DetailView):
         return User.objects.filter(is_specialist=True).select_related('specialist_profile').prefetch_related(
             'specialist_profile__categories',
             'portfolio_items',
-            'reviews_received__client',
-            'reviews_received__task'
         )
     
     def get_context_data(self, **kwargs):
         """Добавляет дополнительную информацию в контекст."""
         context = super().get_context_data(**kwargs)
-        specialist = self.get_object()
+        specialist = self.object
         
         # Получаем профиль
         try:
@@ -851,19 +853,20 @@ class SpecialistDetailView(DetailView):
         portfolio_items = specialist.portfolio_items.all().order_by('order', '-created_at')
         context['portfolio_items'] = portfolio_items
         
-        # Получаем отзывы
-        reviews = Review.objects.filter(specialist=specialist).select_related('task', 'client').order_by('-created_at')
+        # Первая страница отзывов; следующие страницы отдаёт api/specialist/<id>/reviews/
+        reviews = list(
+            Review.objects.filter(specialist=specialist)
+            .exclude(moderation_status=Review.ModerationStatus.REJECTED)
+            .select_related('task', 'client')
+            .order_by('-created_at', '-id')[:ReviewFeedPagination.page_size]
+        )
         context['reviews'] = reviews
+        context['reviews_total'] = specialist.rating_count
+        if specialist.rating_count > len(reviews):
+            context['reviews_feed_url'] = reverse('marketplace:specialist_reviews', args=[specialist.pk])
         
-        # Статистика оценок
-        rating_stats = {
-            '5': reviews.filter(rating=5).count(),
-            '4': reviews.filter(rating=4).count(),
-            '3': reviews.filter(rating=3).count(),
-            '2': reviews.filter(rating=2).count(),
-            '1': reviews.filter(rating=1).count(),
-        }
-        context['rating_stats'] = rating_stats
+        # Статистика оценок хранится у специалиста и обновляется при записи отзывов
+        context['rating_stats'] = specialist.rating_summary['histogram']
         
         # Получаем категории специалиста для отображения
         if 'profile' in context and context['profile']:
@@ -957,28 +960,55 @@ class UpdateBookingStatusView(LoginRequiredMixin, View):
 class ConversationListView(LoginRequiredMixin, ListView):
     """
     Список всех переписок пользователя.
+    
+    Последнее сообщение и число непрочитанных берутся подзапросами в том же
+    SQL-запросе, что и сами переписки, поэтому объём истории не влияет на
+    количество запросов и память.
     """
     model = Conversation
     template_name = 'marketplace/conversation_list.html'
     context_object_name = 'conversations'
+    paginate_by = 20
     
     def get_queryset(self):
         user = self.request.user
-        from django.db.models import Q
+        from django.db.models import Case, Count, IntegerField, OuterRef, Subquery, When
+        from django.db.models.functions import Coalesce
+        
+        last_message = Message.objects.filter(conversation=OuterRef('pk')).order_by('-id')
+        unread = Message.objects.filter(
+            conversation=OuterRef('pk'),
+            id__gt=OuterRef('my_last_read_id'),
+        ).exclude(sender=user).values('conversation').annotate(total=Count('id')).values('total')
+        
         return Conversation.objects.filter(
             Q(participant1=user) | Q(participant2=user)
-        ).select_related('participant1', 'participant2').prefetch_related('messages').order_by('-updated_at')
+        ).select_related('participant1', 'participant2').annotate(
+            my_last_read_id=Case(
+                When(participant1=user, then='participant1_last_read_id'),
+                default='participant2_last_read_id',
+            ),
+            last_message_content=Subquery(last_message.values('content')[:1]),
+            last_message_created_at=Subquery(last_message.values('created_at')[:1]),
+            unread_count=Coalesce(Subquery(unread, output_field=IntegerField()), 0),
+        ).order_by('-updated_at', '-id')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         # Add other participant and last message for each conversation
         conversations_with_data = []
         for conv in context['conversations']:
+            last_message = None
+            if conv.last_message_created_at is not None:
+                last_message = {
+                    'content': conv.last_message_content,
+                    'created_at': conv.last_message_created_at,
+                }
             conversations_with_data.append({
                 'conversation': conv,
                 'other_participant': conv.get_other_participant(self.request.user),
-                'last_message': conv.get_last_message(),
-                'unread_count': conv.get_unread_count(self.request.user),
+                'last_message': last_message,
+                'unread_count': conv.unread_count,
             })
         context['conversations_with_data'] = conversations_with_data
         return context
@@ -1044,7 +1074,9 @@ class SpecialistListView(ListView):
     paginate_by = 12
 
     def get_queryset(self):
-        queryset = User.objects.filter(is_specialist=True).select_related('specialist_profile')
+        queryset = User.objects.filter(is_specialist=True).select_related(
+            'specialist_profile'
+        ).order_by('-ranking_score', '-id')
         
         # Filter by search query
         query = self.request.GET.get('q')
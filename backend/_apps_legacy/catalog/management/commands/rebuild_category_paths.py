@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from apps.catalog.services import CategoryPathService
+
+class Command(BaseCommand):
+    help = 'Recompute materialized Category paths from parent links'
+
+    def handle(self, *args, **options):
+        total = CategoryPathService.rebuild_paths()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt paths for {total} categories.'))
@@ -1,4 +1,8 @@
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.db.models.functions import Concat, Substr
 from django.utils.translation import gettext_lazy as _
 
 class Category(models.Model):
@@ -11,6 +15,9 @@ class Category(models.Model):
     default_tariff = models.CharField(max_length=20, choices=TariffType.choices, default=TariffType.RESPONSE)
     icon = models.ImageField(upload_to='categories/', null=True, blank=True)
     is_active = models.BooleanField(default=True)
+    # Materialized path of ancestor ids including self, e.g. "3/17/42/"; maintained in save()
+    path = models.CharField(max_length=255, db_index=True, editable=False, default='')
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
 
     class Meta:
         verbose_name_plural = 'Categories'
@@ -18,9 +25,51 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        parent_path = self.parent.path if self.parent_id else ''
+        if self.path and parent_path.startswith(self.path):
+            raise ValueError("A category cannot be moved under itself or its subcategories")
+        super().save(*args, **kwargs)
+
+        new_path = f'{parent_path}{self.pk}/'
+        if new_path != self.path:
+            self._move_subtree(self.path, new_path)
+
+    def _move_subtree(self, old_path, new_path):
+        """
+        Rewrites the path of this node and, on a move, of all its descendants in one UPDATE.
+        """
+        new_depth = new_path.count('/') - 1
+        Category.objects.filter(pk=self.pk).update(path=new_path, depth=new_depth)
+        if old_path:
+            Category.objects.filter(path__startswith=old_path).exclude(pk=self.pk).update(
+                path=Concat(Value(new_path), Substr('path', len(old_path) + 1), output_field=models.CharField()),
+                depth=F('depth') + (new_depth - self.depth),
+            )
+        self.path, self.depth = new_path, new_depth
+
+    def get_ancestor_ids(self):
+        """Ids from the root down to the parent, read from the path without a query."""
+        return [int(part) for part in self.path.split('/')[:-2]]
+
+    def get_descendants(self, include_self=True):
+        qs = Category.objects.filter(path__startswith=self.path)
+        if not include_self:
+            qs = qs.exclude(pk=self.pk)
+        return qs
+
 class District(models.Model):
     name = models.CharField(max_length=255, unique=True)
     city = models.CharField(max_length=255, default='Tashkent')
     
     def __str__(self):
         return f"{self.name}, {self.city}"
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=District)
+@receiver(post_delete, sender=District)
+def invalidate_reference_caches(sender, **kwargs):
+    # Signals also fire for cascaded and admin bulk deletes, which skip Model.delete()
+    from .services import invalidate_catalog_caches
+    invalidate_catalog_caches()
@@ -0,0 +1,135 @@
+import gzip
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from .models import Category, District
+
+CATEGORY_TREE_CACHE_KEY = 'catalog:category_tree'
+REFERENCE_BUNDLE_CACHE_KEY = 'catalog:reference_bundle'
+
+def catalog_cache_ttl():
+    return getattr(settings, 'CATALOG_CACHE_TTL', 3600)
+
+def invalidate_catalog_caches():
+    """
+    Called from the Category/District post_save and post_delete signals; everything derived
+    from them is rebuilt on next read. QuerySet.update() and bulk_update() send no signals:
+    code using them must call this itself, and the cache TTL bounds what it misses.
+    """
+    cache.delete_many([CATEGORY_TREE_CACHE_KEY, REFERENCE_BUNDLE_CACHE_KEY])
+
+class CategoryTreeService:
+    """
+    Serves the active category tree from one query, cached as rendered JSON bytes.
+    Category writes drop the entry (invalidate_catalog_caches); CATALOG_CACHE_TTL is only a backstop.
+    """
+    @staticmethod
+    def build_tree():
+        """
+        Loads every active category in one query and links children in memory.
+        A child of an inactive category is unreachable and therefore hidden with it.
+        """
+        rows = Category.objects.filter(is_active=True).order_by('id').values(
+            'id', 'name', 'default_tariff', 'parent_id'
+        )
+        nodes = {}
+        for row in rows:
+            nodes[row['id']] = {
+                'id': row['id'],
+                'name': row['name'],
+                'default_tariff': row['default_tariff'],
+                'children': [],
+                'parent_id': row['parent_id'],
+            }
+
+        roots = []
+        for node in nodes.values():
+            parent_id = node.pop('parent_id')
+            if parent_id is None:
+                roots.append(node)
+            elif parent_id in nodes:
+                nodes[parent_id]['children'].append(node)
+        return roots
+
+    @staticmethod
+    def get_tree_bytes():
+        data = cache.get(CATEGORY_TREE_CACHE_KEY)
+        if data is None:
+            data = JSONRenderer().render(CategoryTreeService.build_tree())
+            cache.set(CATEGORY_TREE_CACHE_KEY, data, catalog_cache_ttl())
+        return data
+
+class ReferenceDataService:
+    """
+    Versioned bundle of rarely changing reference data (categories, districts, tariff types).
+    Rendered and gzipped once per change. The ETag is a digest of the content,
+    suffixed for the gzip representation so each encoding has its own strong validator.
+    """
+    @staticmethod
+    def build_data():
+        return {
+            'categories': CategoryTreeService.build_tree(),
+            'districts': list(District.objects.order_by('name').values('id', 'name', 'city')),
+            'tariff_types': [
+                {'value': value, 'label': str(label)} for value, label in Category.TariffType.choices
+            ],
+        }
+
+    @staticmethod
+    def get_bundle():
+        """
+        Returns {'version', 'etag', 'gzip_etag', 'body', 'gzip_body'}; a cache read unless the data changed.
+        """
+        bundle = cache.get(REFERENCE_BUNDLE_CACHE_KEY)
+        if bundle is None:
+            data = ReferenceDataService.build_data()
+            version = hashlib.sha256(JSONRenderer().render(data)).hexdigest()[:16]
+            body = JSONRenderer().render({'version': version, **data})
+            bundle = {
+                'version': version,
+                'etag': f'"{version}"',
+                'gzip_etag': f'"{version}-gzip"',
+                'body': body,
+                'gzip_body': gzip.compress(body, mtime=0),
+            }
+            cache.set(REFERENCE_BUNDLE_CACHE_KEY, bundle, catalog_cache_ttl())
+        return bundle
+
+class CategoryPathService:
+    """
+    Helpers around the materialized Category.path column.
+    """
+    @staticmethod
+    def subtree_path(category_id):
+        """
+        Path prefix shared by a category and all of its subcategories, or None if it does not exist.
+        """
+        return Category.objects.filter(pk=category_id).values_list('path', flat=True).first()
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild_paths():
+        """
+        Recomputes every path from parent links. Used for backfill and repair only.
+        """
+        parents = dict(Category.objects.values_list('id', 'parent_id'))
+        paths = {}
+
+        def path_of(category_id, seen=()):
+            if category_id not in paths:
+                parent_id = parents[category_id]
+                if parent_id in seen:
+                    raise ValueError(f"Category {category_id} is part of a parent cycle")
+                prefix = path_of(parent_id, seen + (category_id,)) if parent_id else ''
+                paths[category_id] = f'{prefix}{category_id}/'
+            return paths[category_id]
+
+        categories = []
+        for category_id in parents:
+            path = path_of(category_id)
+            categories.append(Category(id=category_id, path=path, depth=path.count('/') - 1))
+        Category.objects.bulk_update(categories, ['path', 'depth'], batch_size=500)
+        invalidate_catalog_caches()
+        return len(categories)
@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import CategoryListView, DistrictListView
+from .views import CategoryListView, DistrictListView, ReferenceDataView
 
 urlpatterns = [
     path('categories/', CategoryListView.as_view(), name='category-list'),
     path('districts/', DistrictListView.as_view(), name='district-list'),
+    path('bundle/', ReferenceDataView.as_view(), name='reference-bundle'),
 ]
@@ -1,13 +1,70 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
 from rest_framework import generics, permissions
+from rest_framework.views import APIView
 from .models import Category, District
 from .serializers import CategorySerializer, DistrictSerializer
+from .services import CategoryTreeService, ReferenceDataService
+
+def _accepts_gzip(accept_encoding):
+    """
+    True if gzip has a non-zero q-value in Accept-Encoding, explicitly or through '*'.
+    """
+    qualities = {}
+    for item in accept_encoding.split(','):
+        coding, *params = [part.strip() for part in item.split(';')]
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding:
+            qualities[coding.lower()] = q
+    return qualities.get('gzip', qualities.get('*', 0.0)) > 0
 
 class CategoryListView(generics.ListAPIView):
     queryset = Category.objects.filter(parent__isnull=True, is_active=True)
     serializer_class = CategorySerializer
     permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+
+    def list(self, request, *args, **kwargs):
+        # Pre-rendered tree bytes; same shape as CategorySerializer output
+        return HttpResponse(CategoryTreeService.get_tree_bytes(), content_type='application/json')
 
 class DistrictListView(generics.ListAPIView):
     queryset = District.objects.all().order_by('name')
     serializer_class = DistrictSerializer
     permission_classes = [permissions.AllowAny]
+
+class ReferenceDataView(APIView):
+    """
+    Categories, districts and tariff types in one versioned bundle.
+    Clients send If-None-Match; an unchanged bundle is a 304 served from cache alone.
+    Either encoding's ETag revalidates, since both name the same version.
+    """
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+
+    def get(self, request):
+        bundle = ReferenceDataService.get_bundle()
+        use_gzip = _accepts_gzip(request.headers.get('Accept-Encoding', ''))
+        etag = bundle['gzip_etag'] if use_gzip else bundle['etag']
+        client_etags = parse_etags(request.headers.get('If-None-Match', ''))
+        if {bundle['etag'], bundle['gzip_etag'], '*'} & set(client_etags):
+            response = HttpResponseNotModified()
+        elif use_gzip:
+            response = HttpResponse(bundle['gzip_body'], content_type='application/json')
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(bundle['body'], content_type='application/json')
+
+        response['ETag'] = etag
+        patch_cache_control(response, public=True, max_age=getattr(settings, 'REFERENCE_DATA_MAX_AGE', 300))
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
@@ -0,0 +1,65 @@
+import asyncio
+from channels.db import database_sync_to_async
+from django.conf import settings
+from .services import ChatService
+
+class MessageBatcher:
+    """
+    Per-process write batcher for WebSocket messages.
+    Messages arriving within one flush window (from any connection) are persisted
+    with a single bulk INSERT; each sender awaits its own persisted Message so the
+    broadcast carries a real id that clients can resume from.
+    """
+    def __init__(self, flush_interval=None, max_batch=None):
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._pending = []
+        self._flush_handle = None
+
+    def _interval(self):
+        if self.flush_interval is not None:
+            return self.flush_interval
+        return getattr(settings, 'CHAT_WS_FLUSH_INTERVAL', 0.02)
+
+    def _max_batch(self):
+        if self.max_batch is not None:
+            return self.max_batch
+        return getattr(settings, 'CHAT_WS_MAX_BATCH', 200)
+
+    async def submit(self, chat_id, sender_id, text, sender_is_specialist):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(({
+            'chat_id': chat_id,
+            'sender_id': sender_id,
+            'text': text,
+            'sender_is_specialist': sender_is_specialist,
+        }, future))
+
+        if len(self._pending) >= self._max_batch():
+            await self.flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self._interval(), lambda: asyncio.ensure_future(self.flush()))
+        return await future
+
+    async def flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        try:
+            messages = await database_sync_to_async(ChatService.post_messages)([item for item, _ in batch])
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for (_, future), message in zip(batch, messages):
+            if not future.done():
+                future.set_result(message)
+
+batcher = MessageBatcher()
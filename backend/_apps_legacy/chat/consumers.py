@@ -0,0 +1,81 @@
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from django.conf import settings
+from .batching import batcher
+from .serializers import MessageSerializer
+from .services import ChatService
+
+class ChatConsumer(AsyncJsonWebsocketConsumer):
+    """
+    Real-time transport for deal chats; one channel-layer group per chat.
+
+    Connect: ws/chats/<chat_id>/?token=<access>[&after=<message_id>]
+      `after` resumes from the last message id the client has seen.
+    Client -> server: {"type": "message", "text": "..."} | {"type": "read"}
+    Server -> client: {"type": "message", "message": {...}} | {"type": "resume_truncated"}
+    """
+
+    async def connect(self):
+        self.user = self.scope['user']
+        if not self.user.is_authenticated:
+            await self.close()
+            return
+
+        row = await database_sync_to_async(ChatService.find_participant_chat)(
+            self.user, self.scope['url_route']['kwargs']['chat_id']
+        )
+        if row is None:
+            await self.close()
+            return
+
+        self.chat_id, specialist_id = row
+        self.is_specialist = specialist_id == self.user.id
+        self.group_name = f'chat_{self.chat_id}'
+
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        await self.resume()
+
+    async def disconnect(self, close_code):
+        if hasattr(self, 'group_name'):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def resume(self):
+        after = self.query_param('after')
+        if not after or not after.isdigit():
+            return
+        limit = getattr(settings, 'CHAT_WS_RESUME_LIMIT', 200)
+        missed = await database_sync_to_async(self.serialized_messages_after)(int(after), limit + 1)
+        for payload in missed[:limit]:
+            await self.send_json({'type': 'message', 'message': payload})
+        if len(missed) > limit:
+            # Too far behind for the socket; client should page the REST history instead
+            await self.send_json({'type': 'resume_truncated'})
+
+    def serialized_messages_after(self, after_id, limit):
+        return MessageSerializer(ChatService.messages_after(self.chat_id, after_id, limit), many=True).data
+
+    def query_param(self, name):
+        for pair in self.scope.get('query_string', b'').decode().split('&'):
+            key, _, value = pair.partition('=')
+            if key == name:
+                return value
+        return None
+
+    async def receive_json(self, content, **kwargs):
+        message_type = content.get('type')
+        if message_type == 'message':
+            text = str(content.get('text', '')).strip()
+            if not text:
+                return
+            message = await batcher.submit(self.chat_id, self.user.id, text, self.is_specialist)
+            message.sender = self.user  # avoid a lazy fetch when serializing
+            await self.channel_layer.group_send(self.group_name, {
+                'type': 'chat.message',
+                'message': MessageSerializer(message).data,
+            })
+        elif message_type == 'read':
+            await database_sync_to_async(ChatService.mark_read)(self.chat_id, self.user, self.is_specialist)
+
+    async def chat_message(self, event):
+        await self.send_json({'type': 'message', 'message': event['message']})
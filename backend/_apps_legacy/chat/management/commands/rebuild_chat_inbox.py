@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from apps.chat.services import ChatService
+
+class Command(BaseCommand):
+    help = 'Recompute last message and unread counters for all chats'
+
+    def handle(self, *args, **options):
+        total = ChatService.rebuild_summaries()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt inbox summary for {total} chats.'))
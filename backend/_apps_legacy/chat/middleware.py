@@ -0,0 +1,25 @@
+from urllib.parse import parse_qs
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, AuthenticationFailed
+
+@database_sync_to_async
+def get_user_for_token(raw_token):
+    auth = JWTAuthentication()
+    try:
+        return auth.get_user(auth.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return AnonymousUser()
+
+class JWTAuthMiddleware(BaseMiddleware):
+    """
+    Authenticates WebSocket connections with the same SimpleJWT access token as the REST API,
+    passed as ?token=<access>. Browsers cannot set headers on WebSocket handshakes.
+    """
+    async def __call__(self, scope, receive, send):
+        params = parse_qs(scope.get('query_string', b'').decode())
+        token = params.get('token', [None])[0]
+        scope['user'] = await get_user_for_token(token) if token else AnonymousUser()
+        return await super().__call__(scope, receive, send)
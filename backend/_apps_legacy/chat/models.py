@@ -6,6 +6,12 @@ class Chat(models.Model):
     deal = models.OneToOneField(Deal, on_delete=models.CASCADE, related_name='chat')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Inbox summary, maintained by ChatService on message insert and read receipt
+    last_message = models.ForeignKey('Message', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    last_message_at = models.DateTimeField(null=True, blank=True)
+    client_unread_count = models.PositiveIntegerField(default=0)
+    specialist_unread_count = models.PositiveIntegerField(default=0)
+
 class Message(models.Model):
     chat = models.ForeignKey(Chat, on_delete=models.CASCADE, related_name='messages')
     sender = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
@@ -15,3 +21,7 @@ class Message(models.Model):
     
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # History is read newest-first from a cursor within one chat
+            models.Index(fields=['chat', 'created_at', 'id']),
+        ]
@@ -10,14 +10,20 @@ class MessageSerializer(serializers.ModelSerializer):
         read_only_fields = ('sender', 'is_read', 'created_at')
 
 class ChatSerializer(serializers.ModelSerializer):
-    last_message = serializers.SerializerMethodField()
+    """
+    Inbox row built from the denormalized summary on Chat.
+    Expects deal and last_message__sender to be select_related.
+    """
+    last_message = MessageSerializer(read_only=True)
+    unread_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Chat
-        fields = ('id', 'deal', 'last_message')
+        fields = ('id', 'deal', 'last_message', 'last_message_at', 'unread_count')
+        read_only_fields = ('deal', 'last_message_at')
     
-    def get_last_message(self, obj):
-        last = obj.messages.last()
-        if last:
-            return MessageSerializer(last).data
-        return None
+    def get_unread_count(self, obj):
+        user = self.context['request'].user
+        if obj.deal.specialist_id == user.id:
+            return obj.specialist_unread_count
+        return obj.client_unread_count
@@ -0,0 +1,102 @@
+from collections import defaultdict
+from django.db import transaction
+from django.db.models import F, Subquery, OuterRef, Count, Q
+from .models import Chat, Message
+
+class ChatService:
+    @staticmethod
+    def participant_chats(user):
+        return Chat.objects.filter(Q(deal__specialist=user) | Q(deal__request__client=user))
+
+    @staticmethod
+    def find_participant_chat(user, chat_id):
+        """
+        (chat_id, specialist_id) if the user takes part in the chat, else None. One query.
+        """
+        return ChatService.participant_chats(user).filter(pk=chat_id).values_list('id', 'deal__specialist_id').first()
+
+    @staticmethod
+    @transaction.atomic
+    def post_message(chat_id, sender, text: str, sender_is_specialist: bool) -> Message:
+        """
+        Inserts a message and updates the chat's inbox summary in the same transaction.
+        """
+        message = Message.objects.create(chat_id=chat_id, sender=sender, text=text)
+        unread_field = 'client_unread_count' if sender_is_specialist else 'specialist_unread_count'
+        Chat.objects.filter(pk=chat_id).update(
+            last_message=message,
+            last_message_at=message.created_at,
+            **{unread_field: F(unread_field) + 1}
+        )
+        return message
+
+    @staticmethod
+    @transaction.atomic
+    def post_messages(items):
+        """
+        Batch variant of post_message for the WebSocket path.
+        items: dicts with chat_id, sender_id, text, sender_is_specialist.
+        One INSERT for all messages and one summary UPDATE per chat.
+        """
+        messages = Message.objects.bulk_create([
+            Message(chat_id=item['chat_id'], sender_id=item['sender_id'], text=item['text'])
+            for item in items
+        ])
+
+        per_chat = defaultdict(lambda: {'last': None, 'client_unread': 0, 'specialist_unread': 0})
+        for item, message in zip(items, messages):
+            summary = per_chat[item['chat_id']]
+            summary['last'] = message
+            if item['sender_is_specialist']:
+                summary['client_unread'] += 1
+            else:
+                summary['specialist_unread'] += 1
+
+        for chat_id, summary in per_chat.items():
+            Chat.objects.filter(pk=chat_id).update(
+                last_message=summary['last'],
+                last_message_at=summary['last'].created_at,
+                client_unread_count=F('client_unread_count') + summary['client_unread'],
+                specialist_unread_count=F('specialist_unread_count') + summary['specialist_unread'],
+            )
+        return messages
+
+    @staticmethod
+    @transaction.atomic
+    def mark_read(chat_id, reader, reader_is_specialist: bool):
+        """
+        Read receipt: clears the reader's counter and flags the other side's messages as read.
+        """
+        unread_field = 'specialist_unread_count' if reader_is_specialist else 'client_unread_count'
+        Chat.objects.filter(pk=chat_id).update(**{unread_field: 0})
+        Message.objects.filter(chat_id=chat_id, is_read=False).exclude(sender=reader).update(is_read=True)
+
+    @staticmethod
+    def messages_after(chat_id, after_id, limit):
+        return list(
+            Message.objects.filter(chat_id=chat_id, id__gt=after_id)
+            .select_related('sender').order_by('id')[:limit]
+        )
+
+    @staticmethod
+    def rebuild_summaries():
+        """
+        Recomputes last message and unread counters for every chat. Repair/backfill only.
+        """
+        latest = Message.objects.filter(chat=OuterRef('pk')).order_by('-created_at', '-id')
+        chats = Chat.objects.annotate(
+            latest_id=Subquery(latest.values('id')[:1]),
+            latest_at=Subquery(latest.values('created_at')[:1]),
+            unread_by_client=Count('messages', filter=Q(messages__is_read=False) & ~Q(messages__sender=F('deal__request__client'))),
+            unread_by_specialist=Count('messages', filter=Q(messages__is_read=False) & ~Q(messages__sender=F('deal__specialist'))),
+        )
+        updated = 0
+        for chat in chats.iterator():
+            Chat.objects.filter(pk=chat.pk).update(
+                last_message_id=chat.latest_id,
+                last_message_at=chat.latest_at,
+                client_unread_count=chat.unread_by_client,
+                specialist_unread_count=chat.unread_by_specialist,
+            )
+            updated += 1
+        return updated
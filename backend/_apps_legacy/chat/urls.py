@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import ChatListCreateView, MessageListCreateView
+from .views import ChatListCreateView, MessageListCreateView, ChatReadView
 
 urlpatterns = [
     path('', ChatListCreateView.as_view(), name='chat-list'),
     path('<int:chat_id>/messages/', MessageListCreateView.as_view(), name='message-list'),
+    path('<int:chat_id>/read/', ChatReadView.as_view(), name='chat-read'),
 ]
@@ -1,16 +1,35 @@
-from rest_framework import generics, permissions
+from rest_framework import generics, permissions, views
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+from django.db.models import F
+from django.http import Http404
 from django.shortcuts import get_object_or_404
 from .models import Chat, Message
 from .serializers import ChatSerializer, MessageSerializer
+from .services import ChatService
 from apps.deals.models import Deal
 
+def get_participant_chat(user, chat_id):
+    """
+    Returns (chat_id, specialist_id) in one query; 404 if missing or the user is not a participant.
+    """
+    row = ChatService.find_participant_chat(user, chat_id)
+    if row is None:
+        raise Http404
+    return row
+
 class ChatListCreateView(generics.ListCreateAPIView):
     serializer_class = ChatSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        user = self.request.user
-        return Chat.objects.filter(models.Q(deal__specialist=user) | models.Q(deal__request__client=user))
+        # One query for the whole inbox: summary columns live on Chat
+        return (
+            ChatService.participant_chats(self.request.user)
+            .select_related('deal', 'last_message__sender')
+            .order_by(F('last_message_at').desc(nulls_last=True), '-id')
+        )
     
     def perform_create(self, serializer):
         # Create chat for deal
@@ -18,23 +37,36 @@ class ChatListCreateView(generics.ListCreateAPIView):
         deal = get_object_or_404(Deal, pk=deal_id)
         # Check permissions
         if self.request.user not in [deal.specialist, deal.request.client]:
-             raise permissions.PermissionDenied("Not part of this deal")
+             raise PermissionDenied("Not part of this deal")
         serializer.save(deal=deal)
 
+class MessageHistoryPagination(CursorPagination):
+    # Newest first; "next" walks back into older history. Served by the (chat, created_at, id) index.
+    page_size = 50
+    ordering = ('-created_at', '-id')
+
 class MessageListCreateView(generics.ListCreateAPIView):
     serializer_class = MessageSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = MessageHistoryPagination
+
+    def get_chat_id(self):
+        return get_participant_chat(self.request.user, self.kwargs['chat_id'])[0]
 
     def get_queryset(self):
-        chat_id = self.kwargs['chat_id']
-        chat = get_object_or_404(Chat, pk=chat_id)
-        if self.request.user not in [chat.deal.specialist, chat.deal.request.client]:
-             return Message.objects.none()
-        return Message.objects.filter(chat=chat)
+        return Message.objects.filter(chat_id=self.get_chat_id()).select_related('sender')
 
     def perform_create(self, serializer):
-        chat_id = self.kwargs['chat_id']
-        chat = get_object_or_404(Chat, pk=chat_id)
-        if self.request.user not in [chat.deal.specialist, chat.deal.request.client]:
-             raise permissions.PermissionDenied("Not part of this chat")
-        serializer.save(chat=chat, sender=self.request.user)
+        chat_id, specialist_id = get_participant_chat(self.request.user, self.kwargs['chat_id'])
+        serializer.instance = ChatService.post_message(
+            chat_id, self.request.user, serializer.validated_data['text'],
+            sender_is_specialist=specialist_id == self.request.user.id
+        )
+
+class ChatReadView(views.APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, chat_id):
+        chat_id, specialist_id = get_participant_chat(request.user, chat_id)
+        ChatService.mark_read(chat_id, request.user, reader_is_specialist=specialist_id == request.user.id)
+        return Response({'status': 'read'})
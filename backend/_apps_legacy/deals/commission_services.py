@@ -1,14 +1,34 @@
-from django.contrib.auth.hashers import make_password, check_password
-from django.utils.crypto import get_random_string
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.crypto import get_random_string, salted_hmac, constant_time_compare
 from django.utils import timezone
 from django.db import transaction
+from django.db.models import Count, F, Q
 from .models import Deal
 from .payment_models import FirstPaymentConfirmation
 from apps.pricing.services import PricingEngine
 from apps.wallet.services import WalletService, Transaction
+from apps.responses.models import Response
 import uuid
 
+logger = logging.getLogger(__name__)
+
 class CommissionService:
+    CODE_SALT = 'apps.deals.CommissionService.code'
+
+    @staticmethod
+    def _code_digest(deal_id, raw_code: str) -> str:
+        # Keyed HMAC (SECRET_KEY) bound to the deal: cheap to verify, useless without the key.
+        # Brute force is bounded by the attempt counter and expiry, not by hashing cost.
+        return salted_hmac(CommissionService.CODE_SALT, f"{deal_id}:{raw_code}").hexdigest()
+
+    @staticmethod
+    def _attempts_key(deal_id) -> str:
+        return f"commission_code_attempts:{deal_id}"
+
     @staticmethod
     def generate_code(deal: Deal, user):
         """
@@ -24,18 +44,21 @@ class CommissionService:
 
         # Generate 6 digit code
         raw_code = get_random_string(length=6, allowed_chars='0123456789')
-        code_hash = make_password(raw_code)
+        code_hash = CommissionService._code_digest(deal.id, raw_code)
         
         confirmation, created = FirstPaymentConfirmation.objects.update_or_create(
             deal=deal,
             defaults={'code_hash': code_hash, 'generated_at': timezone.now()}
         )
+        # New code, fresh attempt budget
+        cache.delete(CommissionService._attempts_key(deal.id))
         return raw_code
 
     @staticmethod
     def confirm_payment(deal: Deal, client_user, code: str):
         """
-        Client inputs code. Atomic charge commission.
+        Client inputs code. Validates it and accepts the confirmation;
+        the commission charge is settled asynchronously.
         """
         if deal.request.client != client_user:
              raise PermissionError("Only client can confirm payment")
@@ -47,51 +70,119 @@ class CommissionService:
         if conf.confirmed_at:
              return True # Idempotent-ish
 
-        if not check_password(code, conf.code_hash):
+        ttl = timedelta(minutes=getattr(settings, 'COMMISSION_CODE_TTL_MINUTES', 30))
+        if timezone.now() - conf.generated_at > ttl:
+             raise ValueError("Code expired, generate a new one")
+
+        max_attempts = getattr(settings, 'COMMISSION_CODE_MAX_ATTEMPTS', 5)
+        attempts_key = CommissionService._attempts_key(deal.id)
+        # add() is a no-op when the counter exists, so concurrent first attempts cannot reset it
+        cache.add(attempts_key, 0, int(ttl.total_seconds()))
+        attempts = cache.incr(attempts_key)
+        if attempts > max_attempts:
+             raise ValueError("Too many attempts, generate a new code")
+
+        if not constant_time_compare(CommissionService._code_digest(deal.id, code), conf.code_hash):
              raise ValueError("Invalid code")
 
-        # Calculate Commission
-        # We need to know 'commission amount'. 
-        # Re-calculate or use stored? Re-calculate based on current rules? 
-        # Ideally should have been snapshot at Deal creation. 
-        # For MVP, calculate now using PricingEngine.
-        
-        from apps.responses.services import ResponseService
-        # Reuse logic? ResponseService uses PricingEngine.
-        # But we need tariff_type=COMMISSION logic.
-        
-        req = deal.request
-        responses_count = req.responses.count()
-        level = deal.specialist.specialist_profile.level
-        
-        price = PricingEngine.calculate_price(
-            category_id=req.category_id,
-            district_id=req.district_id,
-            tariff_type='COMMISSION',
-            budget=req.budget,
-            responses_count=responses_count,
-            specialist_level=level
-        )
-        
+        # Accept only: the commission is charged by the settlement worker (deals.tasks.settle_commissions)
         with transaction.atomic():
-            # 1. Charge Wallet
-            WalletService.process_transaction(
-                user_id=deal.specialist.id,
-                amount=-price,
-                transaction_type=Transaction.Type.CHARGE_COMMISSION,
-                description=f"Commission for Deal #{deal.id}",
-                idempotency_key=uuid.uuid4(),
-                metadata={'deal_id': deal.id},
-                allow_negative=True # Can go negative for commission? Maybe yes, debt.
-            )
-            
-            # 2. Mark confirmed
-            conf.confirmed_at = timezone.now()
-            conf.confirmed_by = client_user
-            conf.save()
-            
-            # 3. Mark Deal Completed?
-            deal.status = Deal.Status.COMPLETED
-            deal.save()
-            
+            accepted = FirstPaymentConfirmation.objects.filter(
+                pk=conf.pk, confirmed_at__isnull=True
+            ).update(confirmed_at=timezone.now(), confirmed_by=client_user)
+            if accepted:
+                from .tasks import settle_commissions
+                transaction.on_commit(settle_commissions.delay)
+
         return True
+
+    @staticmethod
+    def commission_idempotency_key(deal_id):
+        # Deterministic per deal, so a retried settlement never charges twice
+        return uuid.uuid5(uuid.NAMESPACE_OID, f"commission:deal:{deal_id}")
+
+    @staticmethod
+    def settlement_retry_delay(attempts):
+        """
+        Exponential backoff after the n-th failed settlement, capped at a day.
+        """
+        base = getattr(settings, 'COMMISSION_SETTLEMENT_RETRY_MINUTES', 5)
+        return timedelta(minutes=min(base * 2 ** (attempts - 1), 24 * 60))
+
+    @staticmethod
+    def settle_pending(batch_size=200):
+        """
+        Charges commissions for confirmed, unsettled deals.
+        Confirmations are claimed with SKIP LOCKED so parallel workers split the backlog.
+        Charges are grouped per specialist: one wallet lock and balance write per group.
+        A failing group is left unsettled and retried with backoff (settlement_retry_delay),
+        so it does not keep being claimed ahead of newer confirmations.
+        """
+        settled_count = 0
+        now = timezone.now()
+        with transaction.atomic():
+            pending = list(
+                FirstPaymentConfirmation.objects
+                .select_for_update(skip_locked=True, of=('self',))
+                .filter(confirmed_at__isnull=False, settled_at__isnull=True)
+                .filter(Q(next_settlement_at__isnull=True) | Q(next_settlement_at__lte=now))
+                .select_related('deal__request', 'deal__specialist__specialist_profile')
+                .order_by('confirmed_at')[:batch_size]
+            )
+            if not pending:
+                return 0
+
+            request_ids = [conf.deal.request_id for conf in pending]
+            responses_counts = dict(
+                Response.objects.filter(request_id__in=request_ids)
+                .values('request_id').annotate(n=Count('id')).values_list('request_id', 'n')
+            )
+
+            by_specialist = defaultdict(list)
+            for conf in pending:
+                by_specialist[conf.deal.specialist_id].append(conf)
+
+            for specialist_id, confs in by_specialist.items():
+                try:
+                    # Pricing runs inside the savepoint too: a bad request or rule fails only its group
+                    with transaction.atomic():
+                        entries = []
+                        for conf in confs:
+                            req = conf.deal.request
+                            profile = getattr(conf.deal.specialist, 'specialist_profile', None)
+                            price = PricingEngine.calculate_price(
+                                category_id=req.category_id,
+                                district_id=req.district_id,
+                                tariff_type='COMMISSION',
+                                budget=req.budget,
+                                responses_count=responses_counts.get(req.id, 0),
+                                specialist_level=profile.level if profile else 'NEW'
+                            )
+                            entries.append({
+                                'amount': -price,
+                                'transaction_type': Transaction.Type.CHARGE_COMMISSION,
+                                'description': f"Commission for Deal #{conf.deal_id}",
+                                'idempotency_key': CommissionService.commission_idempotency_key(conf.deal_id),
+                                'metadata': {'deal_id': conf.deal_id},
+                            })
+
+                        # Can go negative for commission (debt)
+                        WalletService.process_batch(specialist_id, entries, allow_negative=True)
+                        FirstPaymentConfirmation.objects.filter(
+                            pk__in=[conf.pk for conf in confs]
+                        ).update(settled_at=timezone.now())
+                        Deal.objects.filter(
+                            pk__in=[conf.deal_id for conf in confs]
+                        ).update(status=Deal.Status.COMPLETED)
+                    settled_count += len(confs)
+                except Exception:
+                    logger.exception("Commission settlement failed for specialist %s", specialist_id)
+                    for conf in confs:
+                        FirstPaymentConfirmation.objects.filter(pk=conf.pk).update(
+                            settlement_attempts=F('settlement_attempts') + 1,
+                            next_settlement_at=now + CommissionService.settlement_retry_delay(
+                                conf.settlement_attempts + 1
+                            ),
+                        )
+
+        return settled_count
@@ -27,6 +27,7 @@ class ConfirmPaymentView(APIView):
             
         try:
             CommissionService.confirm_payment(deal, request.user, code)
-            return Response({'status': 'confirmed'})
+            # Commission is charged asynchronously by the settlement worker
+            return Response({'status': 'confirmed', 'settlement': 'pending'})
         except Exception as e:
             return Response({'error': str(e)}, status=400)
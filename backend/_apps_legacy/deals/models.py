@@ -21,3 +21,6 @@ class Deal(models.Model):
 
     def __str__(self):
         return f"Deal {self.id}: {self.request} -> {self.specialist}"
+
+# Registers FirstPaymentConfirmation with the app so the reverse relation exists for queries
+from .payment_models import FirstPaymentConfirmation  # noqa: E402,F401
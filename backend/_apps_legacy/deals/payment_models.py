@@ -10,6 +10,11 @@ class FirstPaymentConfirmation(models.Model):
     generated_at = models.DateTimeField(auto_now_add=True)
     confirmed_at = models.DateTimeField(null=True, blank=True)
     confirmed_by = models.ForeignKey(get_user_model(), on_delete=models.SET_NULL, null=True, blank=True)
+    # Set by the settlement worker once the commission is charged
+    settled_at = models.DateTimeField(null=True, blank=True)
+    # Failed settlement runs back off so a broken group cannot keep the head of the queue
+    settlement_attempts = models.PositiveSmallIntegerField(default=0)
+    next_settlement_at = models.DateTimeField(null=True, blank=True)
     
     def __str__(self):
         return f"Confirmation for Deal {self.deal_id}"
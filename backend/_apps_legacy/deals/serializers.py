@@ -20,3 +20,43 @@ class DealSerializer(serializers.ModelSerializer):
         if obj.contacts_shared_at:
             return obj.request.client.phone
         return None
+
+class DealDashboardSerializer(serializers.ModelSerializer):
+    """
+    Flat read-only view of a deal for dashboards.
+    Expects the queryset from DealDashboardView (select_related + annotations); touches no lazy relations.
+    """
+    request_id = serializers.IntegerField(read_only=True)
+    category_name = serializers.CharField(source='request.category.name', read_only=True)
+    budget = serializers.DecimalField(source='request.budget', max_digits=12, decimal_places=0, read_only=True)
+    client_id = serializers.IntegerField(source='request.client_id', read_only=True)
+    client_email = serializers.CharField(source='request.client.email', read_only=True)
+    specialist_id = serializers.IntegerField(read_only=True)
+    specialist_email = serializers.CharField(source='specialist.email', read_only=True)
+    chat_id = serializers.IntegerField(read_only=True)
+    has_review = serializers.BooleanField(read_only=True)
+    payment_confirmed = serializers.SerializerMethodField()
+    specialist_phone = serializers.SerializerMethodField()
+    client_phone = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Deal
+        fields = (
+            'id', 'status', 'created_at', 'request_id', 'category_name', 'budget',
+            'client_id', 'client_email', 'client_phone',
+            'specialist_id', 'specialist_email', 'specialist_phone',
+            'chat_id', 'has_review', 'payment_confirmed', 'contacts_shared_at',
+        )
+
+    def get_payment_confirmed(self, obj):
+        return obj.payment_confirmed_at is not None
+
+    def get_specialist_phone(self, obj):
+        if obj.contacts_shared_at:
+            return obj.specialist.phone
+        return None
+
+    def get_client_phone(self, obj):
+        if obj.contacts_shared_at:
+            return obj.request.client.phone
+        return None
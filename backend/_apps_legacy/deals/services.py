@@ -1,23 +1,29 @@
 from django.utils import timezone
+from django.db import transaction, IntegrityError
 from .models import Deal
 from apps.requests.models import Request
+from apps.requests.services import OpenRequestProjection
 
 class DealService:
     @staticmethod
     def create_deal(request_id, specialist_user):
-        req = Request.objects.get(id=request_id)
-        # Check if already has deal
-        if hasattr(req, 'deal'):
-             raise ValueError("Request already has a deal")
-        
-        deal = Deal.objects.create(
-            request=req,
-            specialist=specialist_user
-        )
-        # Close request? Or keep it open until completion? 
-        # Usually deal creation closes the search.
-        req.status = Request.Status.CLOSED
-        req.save()
+        """
+        Locks the request row, inserts the deal and closes the request in one transaction.
+        Concurrent "choose specialist" calls serialize on the row lock; the loser sees
+        the request already closed. The one-to-one constraint on Deal.request is the backstop.
+        """
+        with transaction.atomic():
+            req = Request.objects.select_for_update().only('id', 'status').get(id=request_id)
+            if req.status != Request.Status.OPEN:
+                raise ValueError("Request is closed or already has a deal")
+
+            try:
+                deal = Deal.objects.create(request_id=req.id, specialist=specialist_user)
+            except IntegrityError:
+                raise ValueError("Request already has a deal")
+
+            Request.objects.filter(id=req.id).update(status=Request.Status.CLOSED, updated_at=timezone.now())
+            OpenRequestProjection.remove(req.id)
         return deal
 
     @staticmethod
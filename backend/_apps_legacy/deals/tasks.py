@@ -0,0 +1,12 @@
+from celery import shared_task
+from .commission_services import CommissionService
+
+@shared_task(autoretry_for=(Exception,), retry_backoff=True, max_retries=5)
+def settle_commissions(batch_size=200):
+    """
+    Charges commissions for confirmed deals off the request path.
+    Enqueued on every confirmation and also scheduled periodically as a safety net.
+    Safe to retry: wallet charges use a deterministic per-deal idempotency key.
+    """
+    settled = CommissionService.settle_pending(batch_size=batch_size)
+    return f"Settled {settled} commissions"
@@ -1,8 +1,9 @@
 from django.urls import path
-from .views import ChooseSpecialistView, ContactShareView
+from .views import ChooseSpecialistView, ContactShareView, DealDashboardView
 from .commission_views import GenerateCodeView, ConfirmPaymentView
 
 urlpatterns = [
+    path('dashboard/', DealDashboardView.as_view(), name='deal-dashboard'),
     path('choose/', ChooseSpecialistView.as_view(), name='deal-choose-specialist'),
     path('<int:pk>/contacts/', ContactShareView.as_view(), name='deal-contacts'),
     # Commission
@@ -1,9 +1,13 @@
 from rest_framework import generics, permissions, views, status
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response as DRFResponse
+from django_filters.rest_framework import DjangoFilterBackend
+from django.db.models import Exists, F, OuterRef, Q
 from django.shortcuts import get_object_or_404
 from .models import Deal
-from .serializers import DealSerializer
+from .serializers import DealSerializer, DealDashboardSerializer
 from .services import DealService
+from apps.reviews.models import Review
 
 class DealListCreateView(generics.ListCreateAPIView):
     serializer_class = DealSerializer
@@ -11,12 +15,41 @@ class DealListCreateView(generics.ListCreateAPIView):
 
     def get_queryset(self):
         user = self.request.user
-        return Deal.objects.filter(models.Q(specialist=user) | models.Q(request__client=user))
+        return Deal.objects.filter(Q(specialist=user) | Q(request__client=user)).select_related('request__client', 'specialist')
     
     def perform_create(self, serializer):
         # Allow creating deal directly? Usually done via 'Choose Specialist' action.
         pass
 
+class DealDashboardPagination(CursorPagination):
+    # Keyset pagination on the primary key: stable under inserts, no OFFSET scans
+    page_size = 50
+    ordering = '-id'
+
+class DealDashboardView(generics.ListAPIView):
+    """
+    All deals of the current user (either side) with request, parties, chat id,
+    review presence and payment confirmation state, in a single query per page.
+    """
+    serializer_class = DealDashboardSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = DealDashboardPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['status']
+
+    def get_queryset(self):
+        user = self.request.user
+        return (
+            Deal.objects
+            .filter(Q(specialist=user) | Q(request__client=user))
+            .select_related('request__category', 'request__client', 'specialist')
+            .annotate(
+                chat_id=F('chat__id'),
+                payment_confirmed_at=F('payment_confirmation__confirmed_at'),
+                has_review=Exists(Review.objects.filter(deal_id=OuterRef('pk'))),
+            )
+        )
+
 class ChooseSpecialistView(views.APIView):
     permission_classes = [permissions.IsAuthenticated]
 
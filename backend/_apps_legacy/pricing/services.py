@@ -1,7 +1,33 @@
 from decimal import Decimal
+from django.db.models import Q
+from apps.catalog.models import Category
 from .models import TariffRule
 
 class PricingEngine:
+    @staticmethod
+    def find_rule(category_id, district_id, tariff_type):
+        """
+        Most specific TariffRule for a category: its own rules first, then each ancestor's,
+        nearest first; within one category a district rule beats the all-districts default.
+        Category outranks district: a subcategory's default rule wins over a parent's
+        district rule, since the subcategory's pricing was set up for it on purpose.
+        Candidates for the whole ancestry come from one query keyed by Category.path.
+        """
+        path = Category.objects.filter(pk=category_id).values_list('path', flat=True).first()
+        lineage = [int(part) for part in path.split('/')[:-1]] if path else [category_id]
+
+        district_q = Q(district__isnull=True)
+        if district_id is not None:
+            district_q |= Q(district_id=district_id)
+        candidates = TariffRule.objects.filter(district_q, category_id__in=lineage, tariff_type=tariff_type)
+
+        depth = {cat_id: i for i, cat_id in enumerate(lineage)}
+        return max(
+            candidates,
+            key=lambda rule: (depth[rule.category_id], rule.district_id is not None),
+            default=None,
+        )
+
     @staticmethod
     def calculate_price(
         category_id, 
@@ -14,20 +40,8 @@ class PricingEngine:
         """
         Pure function to calculate price or commission amount.
         """
-        # 1. Find Rule (Specific District > Default District)
-        rule = TariffRule.objects.filter(
-            category_id=category_id, 
-            tariff_type=tariff_type,
-            district_id=district_id
-        ).first()
-        
-        if not rule:
-            # Fallback to no-district specific rule
-            rule = TariffRule.objects.filter(
-                category_id=category_id, 
-                tariff_type=tariff_type,
-                district_id__isnull=True
-            ).first()
+        # 1. Find Rule: nearest category up the ancestry, then Specific District > Default District
+        rule = PricingEngine.find_rule(category_id, district_id, tariff_type)
         
         if not rule:
             # Fallback default if absolutely no rule exists
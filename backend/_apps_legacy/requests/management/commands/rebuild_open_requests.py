@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from apps.requests.services import OpenRequestProjection
+
+class Command(BaseCommand):
+    help = 'Rebuild the OpenRequest feed projection from the Request table'
+
+    def handle(self, *args, **options):
+        total = OpenRequestProjection.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {total} open requests.'))
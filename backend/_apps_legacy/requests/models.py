@@ -19,3 +19,26 @@ class Request(models.Model):
 
     def __str__(self):
         return f"{self.category.name} - {self.budget}"
+
+class OpenRequest(models.Model):
+    """
+    Narrow projection of OPEN requests for the specialist feed.
+    Rows are maintained by OpenRequestProjection and removed once the request closes,
+    so the feed never scans closed history.
+    """
+    request = models.OneToOneField(Request, on_delete=models.CASCADE, primary_key=True, related_name='open_entry')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='+')
+    district = models.ForeignKey(District, on_delete=models.CASCADE, related_name='+')
+    budget = models.DecimalField(max_digits=12, decimal_places=0)
+    created_at = models.DateTimeField()
+    response_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['category', '-created_at']),
+            models.Index(fields=['district', '-created_at']),
+        ]
+
+    def __str__(self):
+        return f"Open request {self.request_id} ({self.response_count} responses)"
@@ -1,5 +1,7 @@
+from django.db import transaction
 from rest_framework import serializers
-from .models import Request
+from .models import Request, OpenRequest
+from .services import OpenRequestProjection
 
 class RequestSerializer(serializers.ModelSerializer):
     client_name = serializers.CharField(source='client.first_name', read_only=True)
@@ -20,4 +22,14 @@ class RequestSerializer(serializers.ModelSerializer):
         if user.role != 'CLIENT':
             raise serializers.ValidationError("Only clients can create requests")
         validated_data['client'] = user
-        return super().create(validated_data)
+        with transaction.atomic():
+            req = super().create(validated_data)
+            OpenRequestProjection.add(req)
+        return req
+
+class OpenRequestSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source='request_id', read_only=True)
+
+    class Meta:
+        model = OpenRequest
+        fields = ('id', 'category', 'district', 'budget', 'created_at', 'response_count')
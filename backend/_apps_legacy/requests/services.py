@@ -0,0 +1,124 @@
+from collections import Counter
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, Count, F, Value, When
+from .models import Request, OpenRequest
+
+# (key, inclusive upper bound in UZS); None means open-ended
+BUDGET_BUCKETS = [
+    ('UP_TO_100K', 100000),
+    ('UP_TO_500K', 500000),
+    ('UP_TO_1M', 1000000),
+    ('OVER_1M', None),
+]
+
+def budget_bucket_bounds(bucket):
+    """
+    Returns (exclusive lower, inclusive upper) budget bounds for a bucket key.
+    """
+    lower = None
+    for key, limit in BUDGET_BUCKETS:
+        if key == bucket:
+            return lower, limit
+        lower = limit
+    raise KeyError(bucket)
+
+class OpenRequestProjection:
+    """
+    Keeps the OpenRequest feed table in sync with Request/Response writes.
+    Callers invoke these inside the same transaction as the write they mirror.
+    """
+    @staticmethod
+    def add(req: Request, response_count: int = 0):
+        OpenRequest.objects.update_or_create(
+            request=req,
+            defaults={
+                'category_id': req.category_id,
+                'district_id': req.district_id,
+                'budget': req.budget,
+                'created_at': req.created_at,
+                'response_count': response_count,
+            }
+        )
+
+    @staticmethod
+    def remove(request_id):
+        OpenRequest.objects.filter(request_id=request_id).delete()
+
+    @staticmethod
+    def register_response(request_id):
+        OpenRequest.objects.filter(request_id=request_id).update(response_count=F('response_count') + 1)
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild():
+        """
+        Full resync from the Request table. Used for backfill and repair only.
+        """
+        OpenRequest.objects.all().delete()
+        open_requests = Request.objects.filter(status=Request.Status.OPEN).annotate(n_responses=Count('responses'))
+        OpenRequest.objects.bulk_create([
+            OpenRequest(
+                request_id=req.id,
+                category_id=req.category_id,
+                district_id=req.district_id,
+                budget=req.budget,
+                created_at=req.created_at,
+                response_count=req.n_responses,
+            )
+            for req in open_requests.iterator()
+        ], batch_size=1000)
+        return OpenRequest.objects.count()
+
+class FeedFacetService:
+    """
+    Facet counts (category, district, budget bucket) for the open request feed.
+    All three facets come from one grouped query over OpenRequest; each facet is
+    counted with the other two filters applied, so selecting a value in one facet
+    does not collapse its own options.
+    """
+    CACHE_PREFIX = 'feed_facets'
+
+    @staticmethod
+    def _bucket_expression():
+        whens = [
+            When(budget__lte=limit, then=Value(key))
+            for key, limit in BUDGET_BUCKETS if limit is not None
+        ]
+        return Case(*whens, default=Value(BUDGET_BUCKETS[-1][0]))
+
+    @staticmethod
+    def get_facets(category_id=None, district_id=None, budget_bucket=None):
+        cache_key = f"{FeedFacetService.CACHE_PREFIX}:{category_id or '*'}:{district_id or '*'}:{budget_bucket or '*'}"
+        facets = cache.get(cache_key)
+        if facets is not None:
+            return facets
+
+        rows = (
+            OpenRequest.objects
+            .annotate(budget_bucket=FeedFacetService._bucket_expression())
+            .values('category_id', 'district_id', 'budget_bucket')
+            .annotate(total=Count('request_id'))
+            .order_by()
+        )
+
+        categories, districts, buckets = Counter(), Counter(), Counter()
+        for row in rows:
+            category_ok = category_id is None or row['category_id'] == category_id
+            district_ok = district_id is None or row['district_id'] == district_id
+            bucket_ok = budget_bucket is None or row['budget_bucket'] == budget_bucket
+            if district_ok and bucket_ok:
+                categories[row['category_id']] += row['total']
+            if category_ok and bucket_ok:
+                districts[row['district_id']] += row['total']
+            if category_ok and district_ok:
+                buckets[row['budget_bucket']] += row['total']
+
+        facets = {
+            'category': [{'id': key, 'count': n} for key, n in categories.most_common()],
+            'district': [{'id': key, 'count': n} for key, n in districts.most_common()],
+            'budget': [{'bucket': key, 'count': buckets.get(key, 0)} for key, _ in BUDGET_BUCKETS],
+        }
+        cache.set(cache_key, facets, getattr(settings, 'FEED_FACETS_CACHE_TTL', 60))
+        return facets
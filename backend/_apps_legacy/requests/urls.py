@@ -1,7 +1,9 @@
 from django.urls import path
-from .views import RequestListCreateView, RequestDetailView
+from .views import RequestListCreateView, RequestDetailView, OpenRequestFeedView, FeedFacetsView
 
 urlpatterns = [
     path('', RequestListCreateView.as_view(), name='request-list'),
+    path('feed/', OpenRequestFeedView.as_view(), name='request-feed'),
+    path('feed/facets/', FeedFacetsView.as_view(), name='request-feed-facets'),
     path('<int:pk>/', RequestDetailView.as_view(), name='request-detail'),
 ]
@@ -1,7 +1,25 @@
 from rest_framework import generics, permissions, filters
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.db import transaction
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Request
-from .serializers import RequestSerializer
+from .models import Request, OpenRequest
+from .serializers import RequestSerializer, OpenRequestSerializer
+from apps.catalog.services import CategoryPathService
+from apps.users.authentication import ClaimsJWTAuthentication
+from .services import OpenRequestProjection, FeedFacetService, BUDGET_BUCKETS, budget_bucket_bounds
+
+def filter_category_subtree(qs, request):
+    """
+    ?category_tree=<id> narrows to that category and all its subcategories (one indexed prefix range).
+    """
+    category_id = request.query_params.get('category_tree')
+    if not category_id:
+        return qs
+    path = CategoryPathService.subtree_path(category_id) if category_id.isdigit() else None
+    if path is None:
+        return qs.none()
+    return qs.filter(category__path__startswith=path)
 
 class IsClientOrReadOnly(permissions.BasePermission):
     def has_permission(self, request, view):
@@ -20,13 +38,56 @@ class RequestListCreateView(generics.ListCreateAPIView):
     def get_queryset(self):
         user = self.request.user
         if user.role == 'CLIENT':
-            return Request.objects.filter(client=user)
+            qs = Request.objects.filter(client=user)
         elif user.role == 'SPECIALIST':
             # Specialists see open requests in their categories/districts (simplified for MVP: see all OPEN)
-            return Request.objects.filter(status='OPEN')
+            qs = Request.objects.filter(status='OPEN')
         elif user.role == 'ADMIN':
-            return Request.objects.all()
-        return Request.objects.none()
+            qs = Request.objects.all()
+        else:
+            return Request.objects.none()
+        return filter_category_subtree(qs, self.request)
+
+class OpenRequestFeedView(generics.ListAPIView):
+    """
+    Specialist feed served from the OpenRequest projection instead of the full Request table.
+    """
+    queryset = OpenRequest.objects.all()
+    serializer_class = OpenRequestSerializer
+    # Needs only an authenticated id: served from token claims, no user lookup
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['category', 'district']
+    ordering_fields = ['created_at', 'budget', 'response_count']
+
+    def get_queryset(self):
+        qs = filter_category_subtree(super().get_queryset(), self.request)
+        bucket = self.request.query_params.get('budget_bucket')
+        if bucket in dict(BUDGET_BUCKETS):
+            lower, upper = budget_bucket_bounds(bucket)
+            if lower is not None:
+                qs = qs.filter(budget__gt=lower)
+            if upper is not None:
+                qs = qs.filter(budget__lte=upper)
+        return qs
+
+class FeedFacetsView(APIView):
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        try:
+            category_id = int(request.query_params['category']) if request.query_params.get('category') else None
+            district_id = int(request.query_params['district']) if request.query_params.get('district') else None
+        except ValueError:
+            return Response({'error': 'category and district must be integers'}, status=400)
+
+        budget_bucket = request.query_params.get('budget_bucket') or None
+        if budget_bucket and budget_bucket not in dict(BUDGET_BUCKETS):
+            return Response({'error': 'Unknown budget_bucket'}, status=400)
+
+        return Response(FeedFacetService.get_facets(category_id, district_id, budget_bucket))
 
 class RequestDetailView(generics.RetrieveUpdateAPIView):
     queryset = Request.objects.all()
@@ -36,5 +97,7 @@ class RequestDetailView(generics.RetrieveUpdateAPIView):
     def perform_update(self, serializer):
         # Only allow closing
         if 'status' in serializer.validated_data and serializer.validated_data['status'] == 'CLOSED':
-            serializer.save()
+            with transaction.atomic():
+                req = serializer.save()
+                OpenRequestProjection.remove(req.id)
         # Full update logic to be refined
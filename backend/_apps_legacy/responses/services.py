@@ -4,6 +4,7 @@ from django.utils import timezone
 from apps.pricing.services import PricingEngine
 from apps.wallet.services import WalletService, IdempotencyError, InsufficientFunds
 from apps.wallet.models import Transaction, Wallet
+from apps.requests.services import OpenRequestProjection
 from .models import Response
 import uuid
 
@@ -76,7 +77,9 @@ class ResponseService:
                 }
             )
             
-            if not created:
+            if created:
+                OpenRequestProjection.register_response(request_obj.id)
+            else:
                 # If already existed, check if it's the same attempt. 
                 # For MVP, just return existing.
                 pass
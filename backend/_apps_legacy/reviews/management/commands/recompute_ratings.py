@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from apps.reviews.signals import recompute_specialist_ratings
+
+class Command(BaseCommand):
+    help = 'Recompute specialist rating sums, counts and averages from reviews (repair only)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('specialist_ids', nargs='*', type=int, help='Limit to these specialist user ids')
+
+    def handle(self, *args, **options):
+        total = recompute_specialist_ratings(options['specialist_ids'] or None)
+        self.stdout.write(self.style.SUCCESS(f'Recomputed ratings for {total} specialists.'))
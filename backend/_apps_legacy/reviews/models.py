@@ -14,3 +14,6 @@ class Review(models.Model):
 
     def __str__(self):
         return f"{self.rating}* by {self.client} for {self.specialist}"
+
+# Rating receivers live in signals.py; there is no AppConfig.ready() to import them from
+from . import signals  # noqa: E402,F401
@@ -1,9 +1,73 @@
 from django.db import models
-from django.db.models import Avg
-
-def update_specialist_rating(specialist):
-    avg = specialist.reviews_received.aggregate(Avg('rating'))['rating__avg']
-    if avg is not None:
-        profile = specialist.specialist_profile
-        profile.rating = round(avg, 2)
-        profile.save(update_fields=['rating'])
+from django.db.models import Count, F, Sum
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.db.models.functions import Cast, Greatest, Round
+from apps.users.models import SpecialistProfile
+
+def apply_rating_delta(specialist_id, sum_delta, count_delta):
+    """
+    Shifts the running rating sum/count of one specialist with a single F() UPDATE.
+    The average is computed (rounded to 2 places) in the same statement, so review writes stay O(1).
+    """
+    new_sum = F('rating_sum') + sum_delta
+    new_count = F('rating_count') + count_delta
+    SpecialistProfile.objects.filter(user_id=specialist_id).update(
+        rating_sum=new_sum,
+        rating_count=new_count,
+        rating=Round(Cast(new_sum, models.FloatField()) / Greatest(new_count, 1), 2),
+    )
+
+def recompute_specialist_ratings(specialist_ids=None):
+    """
+    Rebuilds sums, counts and averages from the Review table. Used for repair only.
+    """
+    from .models import Review
+
+    profiles = SpecialistProfile.objects.all()
+    reviews = Review.objects.all()
+    if specialist_ids is not None:
+        profiles = profiles.filter(user_id__in=specialist_ids)
+        reviews = reviews.filter(specialist_id__in=specialist_ids)
+
+    stats = {
+        row['specialist_id']: (row['total'], row['count'])
+        for row in reviews.values('specialist_id').annotate(total=Sum('rating'), count=Count('id'))
+    }
+    updated = []
+    for profile in profiles.only('id', 'user_id'):
+        total, count = stats.get(profile.user_id, (0, 0))
+        profile.rating_sum = total
+        profile.rating_count = count
+        profile.rating = round(total / count, 2) if count else 0.0
+        updated.append(profile)
+    SpecialistProfile.objects.bulk_update(updated, ['rating_sum', 'rating_count', 'rating'], batch_size=500)
+    return len(updated)
+
+@receiver(pre_save, sender='reviews.Review')
+def remember_previous_rating(sender, instance, raw=False, **kwargs):
+    instance._previous_rating = None
+    if not raw and not instance._state.adding:
+        instance._previous_rating = sender.objects.filter(pk=instance.pk).values_list(
+            'specialist_id', 'rating'
+        ).first()
+
+@receiver(post_save, sender='reviews.Review')
+def apply_saved_rating(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_rating', None)
+    if previous is None:
+        apply_rating_delta(instance.specialist_id, instance.rating, 1)
+    elif previous != (instance.specialist_id, instance.rating):
+        apply_rating_delta(previous[0], -previous[1], -1)
+        apply_rating_delta(instance.specialist_id, instance.rating, 1)
+    instance._previous_rating = (instance.specialist_id, instance.rating)
+
+@receiver(post_delete, sender='reviews.Review')
+def withdraw_deleted_rating(sender, instance, **kwargs):
+    """
+    Also runs for queryset and cascade deletes (deal or user removed), which skip Review.delete().
+    QuerySet.update() sends no signal: follow it with recompute_specialist_ratings.
+    """
+    apply_rating_delta(instance.specialist_id, -instance.rating, -1)
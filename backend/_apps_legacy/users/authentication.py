@@ -0,0 +1,150 @@
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from rest_framework import permissions
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+class UserCache:
+    """
+    Two-level cache of the user rows used to authenticate requests: a per-process dict with
+    a few seconds of TTL in front of the shared Django cache (Redis), in front of the database.
+    User post_save/post_delete invalidate both levels in this process and the shared level
+    everywhere once the transaction commits; other processes catch up within the local TTL.
+    QuerySet.update() sends no signals: rows changed that way stay stale for up to
+    AUTH_USER_CACHE_TTL unless the caller invalidates them.
+
+    Only field values are cached. Each request gets a fresh instance with `password` deferred,
+    so per-request state never leaks between requests and user.save() cannot write back
+    a cached password hash.
+
+    The local level holds at most AUTH_USER_LOCAL_MAX_ENTRIES users, least recently used evicted first.
+    """
+    _local = OrderedDict()
+    _local_lock = threading.Lock()
+
+    @staticmethod
+    def key(user_id):
+        return f'auth:user:{user_id}'
+
+    @staticmethod
+    def shared_ttl():
+        return getattr(settings, 'AUTH_USER_CACHE_TTL', 60)
+
+    @staticmethod
+    def local_ttl():
+        return getattr(settings, 'AUTH_USER_LOCAL_TTL', 5)
+
+    @staticmethod
+    def local_max_entries():
+        return getattr(settings, 'AUTH_USER_LOCAL_MAX_ENTRIES', 10000)
+
+    @staticmethod
+    def field_names():
+        return [f.attname for f in get_user_model()._meta.concrete_fields if f.attname != 'password']
+
+    @staticmethod
+    def get(user_id):
+        """
+        Returns a User instance for user_id, or None if there is no such user.
+        """
+        user_id = int(user_id)
+        entry = UserCache._local.get(user_id)
+        if entry and entry[0] > time.monotonic():
+            values = entry[1]
+            with UserCache._local_lock:
+                if user_id in UserCache._local:
+                    UserCache._local.move_to_end(user_id)
+        else:
+            values = cache.get(UserCache.key(user_id))
+            if values is None:
+                values = get_user_model().objects.filter(pk=user_id).values_list(*UserCache.field_names()).first()
+                if values is None:
+                    return None
+                cache.set(UserCache.key(user_id), values, UserCache.shared_ttl())
+            UserCache._remember(user_id, values)
+        return get_user_model().from_db('default', UserCache.field_names(), values)
+
+    @staticmethod
+    def _remember(user_id, values):
+        with UserCache._local_lock:
+            UserCache._local[user_id] = (time.monotonic() + UserCache.local_ttl(), values)
+            UserCache._local.move_to_end(user_id)
+            while len(UserCache._local) > UserCache.local_max_entries():
+                UserCache._local.popitem(last=False)
+
+    @staticmethod
+    def invalidate(user_id):
+        UserCache._local.pop(int(user_id), None)
+        cache.delete(UserCache.key(user_id))
+
+    @staticmethod
+    def clear_local():
+        UserCache._local.clear()
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    SimpleJWT authentication that hydrates request.user from UserCache
+    instead of reading the users table on every request.
+    """
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken("Token contained no recognizable user identification") from e
+
+        user = UserCache.get(user_id)
+        if user is None:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # Rare setting: the hash is not cached, so fall back to the full check
+            return super().get_user(validated_token)
+        return user
+
+class ClaimsUser(TokenUser):
+    """
+    Stateless user built from signed token claims (see RoleTokenObtainPairSerializer).
+    """
+    @cached_property
+    def id(self):
+        return int(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def role(self):
+        return self.token.get('role')
+
+class ClaimsJWTAuthentication(CachedJWTAuthentication):
+    """
+    For read-only views that need nothing beyond the user's id and role: safe methods get a
+    ClaimsUser straight from the token, with no cache or database lookup. Tokens issued before
+    the role claim existed, and unsafe methods, fall back to cached hydration.
+
+    Claims are as fresh as the token: a role change or deactivation shows up on read paths
+    only after the access token is refreshed.
+    """
+    def authenticate(self, request):
+        if request.method not in permissions.SAFE_METHODS:
+            return super().authenticate(request)
+
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        if 'role' not in validated_token:
+            return self.get_user(validated_token), validated_token
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken("Token contained no recognizable user identification")
+        return ClaimsUser(validated_token), validated_token
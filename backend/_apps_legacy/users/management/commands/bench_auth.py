@@ -0,0 +1,110 @@
+import time
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.runner import DiscoverRunner
+from django.test.utils import (
+    CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment,
+)
+from django.urls import Resolver404, resolve
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from apps.users.authentication import CachedJWTAuthentication, ClaimsJWTAuthentication, UserCache
+from apps.users.serializers import RoleTokenObtainPairSerializer
+
+User = get_user_model()
+
+AUTHENTICATORS = [
+    ('db (SimpleJWT)', JWTAuthentication),
+    ('cached', CachedJWTAuthentication),
+    ('claims', ClaimsJWTAuthentication),
+]
+DEFAULT_ENDPOINTS = [
+    '/api/auth/me/',
+    '/api/requests/',
+    '/api/wallet/me/',
+    '/api/deals/dashboard/',
+    '/api/chats/',
+    '/api/responses/my/',
+    '/api/verification/documents/',
+]
+MISSING = object()
+# Bench users land in this cache: the shared one would serve them under real users' ids
+BENCH_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+class Command(BaseCommand):
+    help = (
+        'Compare per-request cost of DB, cached and claims-based JWT authentication. '
+        'Runs against a throwaway test database and a local-memory cache; configured data is not touched.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000, help='Authentications per mode')
+        parser.add_argument('--endpoint-requests', type=int, default=20, help='Calls per endpoint and mode')
+        parser.add_argument('--endpoints', nargs='*', default=DEFAULT_ENDPOINTS, help='GET paths to compare')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        runner = DiscoverRunner(verbosity=0, interactive=False)
+        old_config = runner.setup_databases()
+        try:
+            with override_settings(CACHES=BENCH_CACHES):
+                user = User.objects.create_user(email='bench-auth@example.com', phone='bench-auth', role=User.Role.SPECIALIST)
+                token = str(RoleTokenObtainPairSerializer.get_token(user).access_token)
+                self.bench_authenticators(user.pk, token, options['requests'])
+                self.bench_endpoints(token, options['endpoints'], options['endpoint_requests'])
+        finally:
+            UserCache.clear_local()
+            runner.teardown_databases(old_config)
+            teardown_test_environment()
+
+    def reset_cache(self, user_id):
+        UserCache.invalidate(user_id)
+        UserCache.clear_local()
+
+    def bench_authenticators(self, user_id, token, n):
+        factory = APIRequestFactory()
+        requests = [factory.get('/', HTTP_AUTHORIZATION=f'Bearer {token}') for _ in range(n)]
+        self.stdout.write(f'Authentication only, {n} requests (first request starts with a cold cache):')
+        for label, auth_class in AUTHENTICATORS:
+            authenticator = auth_class()
+            self.reset_cache(user_id)
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                for request in requests:
+                    authenticator.authenticate(request)
+                elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f'  {label:<15} {len(queries) / n:6.3f} queries/request  {elapsed / n * 1e6:8.1f} us/request'
+            )
+
+    def bench_endpoints(self, token, endpoints, n):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        modes = AUTHENTICATORS[:2]
+        self.stdout.write(f'\nQueries per request by endpoint, {n} calls each ({" vs ".join(m[0] for m in modes)}):')
+        for path in endpoints:
+            try:
+                view_class = resolve(path).func.view_class
+            except Resolver404:
+                self.stdout.write(self.style.WARNING(f'  {path:<32} no such route'))
+                continue
+            # Most views inherit authentication_classes from DEFAULT_AUTHENTICATION_CLASSES:
+            # put back exactly what the class itself defined
+            own = view_class.__dict__.get('authentication_classes', MISSING)
+            counts = []
+            try:
+                for _, auth_class in modes:
+                    view_class.authentication_classes = [auth_class]
+                    with CaptureQueriesContext(connection) as queries:
+                        statuses = {client.get(path).status_code for _ in range(n)}
+                    counts.append(f'{len(queries) / n:6.2f}')
+            except Exception as e:
+                self.stdout.write(self.style.WARNING(f'  {path:<32} failed: {e}'))
+                continue
+            finally:
+                if own is MISSING:
+                    del view_class.authentication_classes
+                else:
+                    view_class.authentication_classes = own
+            self.stdout.write(f'  {path:<32} {"  ".join(counts)}   HTTP {sorted(statuses)}')
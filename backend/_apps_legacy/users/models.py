@@ -1,5 +1,7 @@
 from django.contrib.auth.models import AbstractUser, BaseUserManager
-from django.db import models
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
 
 class UserManager(BaseUserManager):
@@ -45,6 +47,14 @@ class User(AbstractUser):
     def __str__(self):
         return self.email
 
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, using, **kwargs):
+    # After commit: invalidating earlier lets a concurrent request re-cache the row being replaced
+    from .authentication import UserCache
+    pk = instance.pk
+    transaction.on_commit(lambda: UserCache.invalidate(pk), using=using)
+
 class ClientProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='client_profile')
     
@@ -61,6 +71,9 @@ class SpecialistProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='specialist_profile')
     level = models.CharField(max_length=20, choices=Level.choices, default=Level.NEW)
     rating = models.FloatField(default=0.0)
+    # Running totals behind `rating`; maintained by apps.reviews.signals.apply_rating_delta
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
     is_verified = models.BooleanField(default=False)
     # Balance will be handled in Wallet app, but good to have a conceptual link? No, keep separate.
     
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from .models import ClientProfile, SpecialistProfile
 
 User = get_user_model()
@@ -28,3 +29,15 @@ class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('id', 'email', 'phone', 'role')
+
+class RoleTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Adds signed role/is_staff claims so read paths can authorize without loading the user
+    (apps.users.authentication.ClaimsJWTAuthentication). Refreshed access tokens inherit them.
+    """
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token['role'] = user.role
+        token['is_staff'] = user.is_staff
+        return token
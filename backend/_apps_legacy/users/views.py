@@ -1,10 +1,14 @@
 from rest_framework import generics, permissions
-from .serializers import UserRegistrationSerializer, UserSerializer
+from rest_framework_simplejwt.views import TokenObtainPairView
+from .serializers import UserRegistrationSerializer, UserSerializer, RoleTokenObtainPairSerializer
 
 class RegisterView(generics.CreateAPIView):
     serializer_class = UserRegistrationSerializer
     permission_classes = [permissions.AllowAny]
 
+class LoginView(TokenObtainPairView):
+    serializer_class = RoleTokenObtainPairSerializer
+
 class MeView(generics.RetrieveAPIView):
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
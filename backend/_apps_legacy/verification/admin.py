@@ -1,15 +1,27 @@
 from django.contrib import admin
+from django.utils import timezone
 from .models import VerificationDocument
 
 @admin.register(VerificationDocument)
 class VerificationDocumentAdmin(admin.ModelAdmin):
-    list_display = ('specialist', 'document_type', 'status', 'uploaded_at')
+    list_display = ('specialist', 'document_type', 'status', 'claimed_by', 'uploaded_at')
     list_filter = ('status', 'document_type')
+    list_select_related = ('specialist', 'claimed_by')
     actions = ['approve_docs', 'reject_docs']
 
+    def _decide(self, request, queryset, status):
+        return queryset.update(
+            status=status,
+            reviewed_by=request.user,
+            reviewed_at=timezone.now(),
+            claimed_by=None,
+            claim_expires_at=None,
+        )
+
     def approve_docs(self, request, queryset):
-        queryset.update(status='APPROVED', reviewed_at=request.user)
+        self._decide(request, queryset, VerificationDocument.Status.APPROVED)
     approve_docs.short_description = "Approve selected documents"
     
     def reject_docs(self, request, queryset):
-        queryset.update(status='REJECTED', reviewed_at=request.user)
+        self._decide(request, queryset, VerificationDocument.Status.REJECTED)
+    reject_docs.short_description = "Reject selected documents"
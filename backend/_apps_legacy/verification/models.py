@@ -1,3 +1,6 @@
+import os
+import tempfile
+import uuid
 from django.db import models
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
@@ -17,6 +20,11 @@ class VerificationDocument(models.Model):
     specialist = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='verification_documents')
     document_type = models.CharField(max_length=20, choices=Type.choices)
     file = models.FileField(upload_to='verification_docs/')
+    # SHA-256 of the file; a specialist re-uploading the same bytes gets the existing document back
+    content_hash = models.CharField(max_length=64, blank=True)
+    thumbnail = models.ImageField(upload_to='verification_thumbs/', blank=True)
+    # Set once the background validation/thumbnail task has run
+    processed_at = models.DateTimeField(null=True, blank=True)
     status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
     rejection_reason = models.TextField(blank=True)
     
@@ -29,6 +37,57 @@ class VerificationDocument(models.Model):
         blank=True,
         related_name='reviewed_docs'
     )
+    # Review queue lease: the moderator holding the document and until when (see VerificationReviewService)
+    claimed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='claimed_docs'
+    )
+    claim_expires_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['specialist', 'content_hash']),
+            models.Index(fields=['status', 'uploaded_at']),
+        ]
+        constraints = [
+            # One live document per file and type; concurrent uploads of the same bytes insert once.
+            # Documents added without hashing (admin) keep an empty hash and are not deduplicated
+            models.UniqueConstraint(
+                fields=['specialist', 'document_type', 'content_hash'],
+                condition=~models.Q(status='REJECTED') & ~models.Q(content_hash=''),
+                name='uniq_live_verification_document',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.specialist} - {self.document_type} ({self.status})"
+
+class VerificationUpload(models.Model):
+    """
+    Resumable upload session. Chunks are written to a staging file in VERIFICATION_UPLOAD_DIR;
+    on completion the file is hashed, copied to storage and becomes a VerificationDocument.
+    Chunks of one upload may reach any app instance, so with more than one instance
+    the directory must be a volume they all share.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    specialist = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='verification_uploads')
+    document_type = models.CharField(max_length=20, choices=VerificationDocument.Type.choices)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    received = models.PositiveBigIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def staging_path(self):
+        directory = getattr(settings, 'VERIFICATION_UPLOAD_DIR', None) or os.path.join(
+            tempfile.gettempdir(), 'verification_uploads'
+        )
+        return os.path.join(directory, f"{self.id}.part")
+
+    def __str__(self):
+        return f"{self.specialist} - {self.filename} ({self.received}/{self.size})"
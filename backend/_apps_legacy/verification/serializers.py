@@ -1,15 +1,51 @@
 from rest_framework import serializers
-from .models import VerificationDocument
+from .models import VerificationDocument, VerificationUpload
+from .services import VerificationUploadService, UploadTooLarge
 
 class VerificationDocumentSerializer(serializers.ModelSerializer):
     class Meta:
         model = VerificationDocument
-        fields = ('id', 'document_type', 'file', 'status', 'rejection_reason', 'uploaded_at')
-        read_only_fields = ('status', 'rejection_reason', 'uploaded_at')
+        fields = ('id', 'document_type', 'file', 'thumbnail', 'status', 'rejection_reason', 'uploaded_at', 'processed_at')
+        read_only_fields = ('thumbnail', 'status', 'rejection_reason', 'uploaded_at', 'processed_at')
 
     def create(self, validated_data):
         user = self.context['request'].user
-        if user.role != 'SPECIALIST':
-            raise serializers.ValidationError("Only specialists can upload verification documents")
-        validated_data['specialist'] = user
-        return super().create(validated_data)
+        try:
+            document, _ = VerificationUploadService.ingest(user, validated_data['document_type'], validated_data['file'])
+        except (PermissionError, UploadTooLarge) as e:
+            raise serializers.ValidationError(str(e))
+        return document
+
+class VerificationUploadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = VerificationUpload
+        fields = ('id', 'document_type', 'filename', 'size', 'received', 'created_at')
+        read_only_fields = ('id', 'received', 'created_at')
+
+class ReviewQueueDocumentSerializer(serializers.ModelSerializer):
+    specialist_email = serializers.EmailField(source='specialist.email', read_only=True)
+
+    class Meta:
+        model = VerificationDocument
+        fields = ('id', 'specialist', 'specialist_email', 'document_type', 'file', 'thumbnail', 'uploaded_at', 'claim_expires_at')
+        read_only_fields = fields
+
+class ReviewClaimSerializer(serializers.Serializer):
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+class ReviewDecisionSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=[
+        VerificationDocument.Status.APPROVED, VerificationDocument.Status.REJECTED,
+    ])
+    rejection_reason = serializers.CharField(required=False, allow_blank=True, default='')
+
+    def validate(self, attrs):
+        if attrs['status'] == VerificationDocument.Status.REJECTED and not attrs['rejection_reason']:
+            raise serializers.ValidationError("Rejection reason is required")
+        if attrs['status'] == VerificationDocument.Status.APPROVED:
+            attrs['rejection_reason'] = ''
+        return attrs
+
+class ReviewDecideSerializer(serializers.Serializer):
+    decisions = ReviewDecisionSerializer(many=True, allow_empty=False)
@@ -0,0 +1,363 @@
+import hashlib
+import io
+import os
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image, UnidentifiedImageError
+from .models import VerificationDocument, VerificationUpload
+
+# Read/write granularity when streaming request bodies and files: memory stays bounded by this
+COPY_BLOCK_SIZE = 64 * 1024
+THUMBNAIL_SIZE = (320, 320)
+IMAGE_FORMATS = {'JPEG', 'PNG', 'WEBP'}
+
+
+class UploadTooLarge(ValueError):
+    pass
+
+
+class OffsetMismatch(ValueError):
+    def __init__(self, expected):
+        super().__init__(f"Expected upload offset {expected}")
+        self.expected = expected
+
+
+class UploadExpired(ValueError):
+    """
+    The staging file is gone (purged, or VERIFICATION_UPLOAD_DIR is not shared between instances).
+    The upload session is dropped with it; the client has to start over.
+    """
+    def __init__(self):
+        super().__init__("Upload data is no longer available, start a new upload")
+
+
+def max_upload_bytes():
+    return getattr(settings, 'VERIFICATION_UPLOAD_MAX_BYTES', 20 * 1024 * 1024)
+
+
+def max_chunk_bytes():
+    return getattr(settings, 'VERIFICATION_UPLOAD_CHUNK_BYTES', 5 * 1024 * 1024)
+
+
+def file_digest(chunks):
+    digest = hashlib.sha256()
+    for chunk in chunks:
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_blocks(fh):
+    return iter(lambda: fh.read(COPY_BLOCK_SIZE), b'')
+
+
+class VerificationUploadService:
+    """
+    Chunked, resumable uploads of verification documents.
+    Bytes are streamed to a staging file in fixed-size blocks, never buffered whole;
+    validation and thumbnails run in apps.verification.tasks.process_document.
+    """
+    @staticmethod
+    def _check_uploader(user):
+        if user.role != 'SPECIALIST':
+            raise PermissionError("Only specialists can upload verification documents")
+
+    @staticmethod
+    def start(user, document_type, filename, size):
+        VerificationUploadService._check_uploader(user)
+        if document_type not in VerificationDocument.Type.values:
+            raise ValueError("Unknown document type")
+        if size <= 0:
+            raise ValueError("Upload size must be positive")
+        if size > max_upload_bytes():
+            raise UploadTooLarge(f"File exceeds {max_upload_bytes()} bytes")
+
+        upload = VerificationUpload.objects.create(
+            specialist=user,
+            document_type=document_type,
+            filename=os.path.basename(filename)[:255] or 'document',
+            size=size,
+        )
+        os.makedirs(os.path.dirname(upload.staging_path), exist_ok=True)
+        open(upload.staging_path, 'wb').close()
+        return upload
+
+    @staticmethod
+    def append(upload_id, user, offset, stream, length):
+        """
+        Writes `length` bytes from `stream` at `offset`, which must equal the bytes received so far.
+        A client that lost a response asks for the current offset and resends from there.
+
+        No transaction or file lock is held while the body streams in; the offset advances with
+        a conditional UPDATE (... WHERE received = offset), so of two requests racing for one
+        offset only the first to finish counts. Bytes are written in place without truncating:
+        a retried chunk carries the same bytes, and stale tail bytes of an interrupted chunk
+        are overwritten by the next one.
+        """
+        if length > max_chunk_bytes():
+            raise UploadTooLarge(f"Chunk exceeds {max_chunk_bytes()} bytes")
+
+        upload = VerificationUpload.objects.get(pk=upload_id, specialist=user)
+        if offset != upload.received:
+            raise OffsetMismatch(upload.received)
+        if offset + length > upload.size:
+            raise UploadTooLarge("Chunk runs past the declared file size")
+
+        written = 0
+        with VerificationUploadService._open_staging(upload, 'r+b') as fh:
+            fh.seek(offset)
+            while written < length:
+                block = stream.read(min(COPY_BLOCK_SIZE, length - written))
+                if not block:
+                    break
+                fh.write(block)
+                written += len(block)
+            fh.flush()
+
+        advanced = VerificationUpload.objects.filter(pk=upload.pk, received=offset).update(
+            received=offset + written, updated_at=timezone.now()
+        )
+        if not advanced:
+            upload.refresh_from_db(fields=['received'])
+            raise OffsetMismatch(upload.received)
+        upload.received = offset + written
+        return upload
+
+    @staticmethod
+    def complete(upload_id, user):
+        """
+        Turns a fully received upload into a document.
+        Returns (document, created); re-uploading identical bytes returns the existing document.
+        """
+        upload = VerificationUpload.objects.get(pk=upload_id, specialist=user)
+        if upload.received != upload.size:
+            raise ValueError(f"Upload incomplete: {upload.received} of {upload.size} bytes")
+
+        with VerificationUploadService._open_staging(upload, 'rb') as fh:
+            document, created = VerificationUploadService._store(
+                user, upload.document_type, upload.filename, fh, file_digest(_read_blocks(fh)), upload=upload
+            )
+        _remove(upload.staging_path)
+        return document, created
+
+    @staticmethod
+    def ingest(user, document_type, uploaded_file):
+        """
+        Single-request path (multipart upload) with the same dedupe and background processing.
+        """
+        VerificationUploadService._check_uploader(user)
+        if uploaded_file.size > max_upload_bytes():
+            raise UploadTooLarge(f"File exceeds {max_upload_bytes()} bytes")
+        return VerificationUploadService._store(
+            user, document_type, uploaded_file.name, uploaded_file, file_digest(uploaded_file.chunks())
+        )
+
+    @staticmethod
+    def _open_staging(upload, mode):
+        try:
+            return open(upload.staging_path, mode)
+        except FileNotFoundError:
+            VerificationUpload.objects.filter(pk=upload.pk).delete()
+            raise UploadExpired()
+
+    @staticmethod
+    def _existing(user, document_type, content_hash):
+        return VerificationDocument.objects.filter(
+            specialist=user, document_type=document_type, content_hash=content_hash
+        ).exclude(status=VerificationDocument.Status.REJECTED).first()
+
+    @staticmethod
+    def _store(user, document_type, filename, fh, content_hash, upload=None):
+        """
+        Copies the file to storage before any transaction is opened; the transaction itself
+        only inserts the row (and drops `upload`). If an identical document wins the race,
+        the unique constraint rejects the insert, the copy is deleted and the winner returned.
+        """
+        existing = VerificationUploadService._existing(user, document_type, content_hash)
+        if existing is None:
+            fh.seek(0)
+            document = VerificationDocument(specialist=user, document_type=document_type, content_hash=content_hash)
+            # Storage copies from the open file in chunks
+            document.file.save(filename, File(fh), save=False)
+            try:
+                with transaction.atomic():
+                    document.save()
+                    if upload is not None:
+                        upload.delete()
+                    from .tasks import process_document
+                    transaction.on_commit(lambda: process_document.delay(document.id))
+                return document, True
+            except IntegrityError:
+                document.file.delete(save=False)
+                existing = VerificationUploadService._existing(user, document_type, content_hash)
+                if existing is None:
+                    raise
+
+        if upload is not None:
+            VerificationUpload.objects.filter(pk=upload.pk).delete()
+        return existing, False
+
+    @staticmethod
+    def purge_stale(hours=None):
+        """
+        Drops upload sessions nobody has touched for `hours` along with their staging files.
+        """
+        hours = hours or getattr(settings, 'VERIFICATION_UPLOAD_STALE_HOURS', 24)
+        stale = list(VerificationUpload.objects.filter(updated_at__lt=timezone.now() - timedelta(hours=hours)))
+        for upload in stale:
+            _remove(upload.staging_path)
+        VerificationUpload.objects.filter(pk__in=[upload.pk for upload in stale]).delete()
+        return len(stale)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class DocumentProcessingService:
+    """
+    Off-request checks of an uploaded document: file type validation and a preview thumbnail.
+    """
+    INVALID_REASON = "Unsupported or corrupted file"
+
+    @staticmethod
+    def process(document_id):
+        document = VerificationDocument.objects.filter(pk=document_id).first()
+        if document is None or document.processed_at:
+            return document
+
+        update_fields = ['processed_at']
+        with document.file.open('rb') as fh:
+            is_pdf = fh.read(5) == b'%PDF-'
+            fh.seek(0)
+            thumbnail = None if is_pdf else DocumentProcessingService._thumbnail(fh)
+
+        if thumbnail is not None:
+            document.thumbnail.save(f"{document.pk}.jpg", ContentFile(thumbnail), save=False)
+            update_fields.append('thumbnail')
+        elif not is_pdf and document.status == VerificationDocument.Status.PENDING:
+            document.status = VerificationDocument.Status.REJECTED
+            document.rejection_reason = DocumentProcessingService.INVALID_REASON
+            update_fields += ['status', 'rejection_reason']
+
+        document.processed_at = timezone.now()
+        document.save(update_fields=update_fields)
+        return document
+
+    @staticmethod
+    def _thumbnail(fh):
+        """
+        JPEG preview bytes, or None if the file is not a supported, intact image.
+        """
+        try:
+            with Image.open(fh) as image:
+                if image.format not in IMAGE_FORMATS:
+                    return None
+                image.verify()
+            fh.seek(0)
+            with Image.open(fh) as image:
+                # JPEG decodes at reduced scale directly, so large scans never expand fully in memory
+                image.draft('RGB', (THUMBNAIL_SIZE[0] * 2, THUMBNAIL_SIZE[1] * 2))
+                image = image.convert('RGB')
+                image.thumbnail(THUMBNAIL_SIZE)
+                buffer = io.BytesIO()
+                image.save(buffer, format='JPEG', quality=80)
+                return buffer.getvalue()
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError):
+            return None
+
+
+class VerificationReviewService:
+    """
+    Pending documents handed out to moderators as leased batches.
+    Claiming uses SELECT ... FOR UPDATE SKIP LOCKED, so concurrent moderators get disjoint
+    batches instead of waiting on each other; a lease that runs out returns its documents to the queue.
+    """
+    MODERATOR_ROLES = ('MODERATOR', 'ADMIN')
+
+    @staticmethod
+    def is_moderator(user):
+        return user.is_staff or user.role in VerificationReviewService.MODERATOR_ROLES
+
+    @staticmethod
+    def lease_duration():
+        return timedelta(minutes=getattr(settings, 'VERIFICATION_CLAIM_LEASE_MINUTES', 15))
+
+    @staticmethod
+    def claim_batch(moderator, limit=20):
+        """
+        Leases up to `limit` oldest pending documents to `moderator`: free ones, expired leases
+        and the moderator's own current claims (renewed). Returns them in queue order.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            ids = list(
+                VerificationDocument.objects
+                .select_for_update(skip_locked=True, of=('self',))
+                .filter(status=VerificationDocument.Status.PENDING)
+                .filter(
+                    Q(claimed_by__isnull=True) | Q(claim_expires_at__lt=now) | Q(claimed_by=moderator)
+                )
+                .order_by('uploaded_at', 'id')
+                .values_list('id', flat=True)[:limit]
+            )
+            if ids:
+                VerificationDocument.objects.filter(pk__in=ids).update(
+                    claimed_by=moderator, claim_expires_at=now + VerificationReviewService.lease_duration()
+                )
+        return list(
+            VerificationDocument.objects.filter(pk__in=ids)
+            .select_related('specialist')
+            .order_by('uploaded_at', 'id')
+        )
+
+    @staticmethod
+    def decide(moderator, decisions):
+        """
+        Applies [{'id', 'status', 'rejection_reason'}] for documents the moderator still holds.
+        Decisions sharing a status and reason are written with one UPDATE.
+        Returns (decided_ids, lost_ids); a lost document's lease expired or was never held.
+        """
+        now = timezone.now()
+        groups = defaultdict(list)
+        for decision in decisions:
+            groups[(decision['status'], decision.get('rejection_reason', ''))].append(decision['id'])
+
+        decided = []
+        with transaction.atomic():
+            held = VerificationDocument.objects.filter(
+                status=VerificationDocument.Status.PENDING,
+                claimed_by=moderator,
+                claim_expires_at__gte=now,
+            )
+            for (decision_status, reason), ids in groups.items():
+                group_ids = list(held.select_for_update().filter(pk__in=ids).values_list('id', flat=True))
+                VerificationDocument.objects.filter(pk__in=group_ids).update(
+                    status=decision_status,
+                    rejection_reason=reason,
+                    reviewed_by=moderator,
+                    reviewed_at=now,
+                    claimed_by=None,
+                    claim_expires_at=None,
+                )
+                decided += group_ids
+
+        decided_set = set(decided)
+        return decided, [decision['id'] for decision in decisions if decision['id'] not in decided_set]
+
+    @staticmethod
+    def release(moderator, ids):
+        """
+        Hands documents back to the queue without deciding them.
+        """
+        return VerificationDocument.objects.filter(
+            pk__in=ids, claimed_by=moderator, status=VerificationDocument.Status.PENDING
+        ).update(claimed_by=None, claim_expires_at=None)
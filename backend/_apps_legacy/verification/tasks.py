@@ -0,0 +1,18 @@
+from celery import shared_task
+from .services import DocumentProcessingService, VerificationUploadService
+
+@shared_task(autoretry_for=(OSError,), retry_backoff=True, max_retries=3)
+def process_document(document_id):
+    """
+    Validates an uploaded document and renders its thumbnail, off the upload request.
+    Idempotent: a document is processed once (processed_at).
+    """
+    document = DocumentProcessingService.process(document_id)
+    return f"Processed document {document_id}" if document else f"Document {document_id} not found"
+
+@shared_task
+def purge_stale_uploads():
+    """
+    Removes abandoned upload sessions and their staging files.
+    """
+    return f"Purged {VerificationUploadService.purge_stale()} stale uploads"
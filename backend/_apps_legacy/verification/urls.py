@@ -1,6 +1,14 @@
 from django.urls import path
-from .views import DocumentListCreateView
+from .views import (
+    DocumentListCreateView, UploadStartView, UploadChunkView, UploadCompleteView,
+    ReviewClaimView, ReviewDecideView,
+)
 
 urlpatterns = [
     path('documents/', DocumentListCreateView.as_view(), name='verification-documents'),
+    path('uploads/', UploadStartView.as_view(), name='verification-upload-start'),
+    path('uploads/<uuid:pk>/', UploadChunkView.as_view(), name='verification-upload-chunk'),
+    path('uploads/<uuid:pk>/complete/', UploadCompleteView.as_view(), name='verification-upload-complete'),
+    path('review/claim/', ReviewClaimView.as_view(), name='verification-review-claim'),
+    path('review/decide/', ReviewDecideView.as_view(), name='verification-review-decide'),
 ]
@@ -1,6 +1,19 @@
-from rest_framework import generics, permissions
-from .models import VerificationDocument
-from .serializers import VerificationDocumentSerializer
+from django.shortcuts import get_object_or_404
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from .models import VerificationDocument, VerificationUpload
+from .serializers import (
+    VerificationDocumentSerializer, VerificationUploadSerializer,
+    ReviewQueueDocumentSerializer, ReviewClaimSerializer, ReviewDecideSerializer,
+)
+from .services import (
+    VerificationUploadService, VerificationReviewService, UploadTooLarge, OffsetMismatch, UploadExpired,
+)
+
+class IsModerator(permissions.BasePermission):
+    def has_permission(self, request, view):
+        return request.user.is_authenticated and VerificationReviewService.is_moderator(request.user)
 
 class DocumentListCreateView(generics.ListCreateAPIView):
     serializer_class = VerificationDocumentSerializer
@@ -8,3 +21,101 @@ class DocumentListCreateView(generics.ListCreateAPIView):
 
     def get_queryset(self):
         return VerificationDocument.objects.filter(specialist=self.request.user)
+
+class UploadStartView(APIView):
+    """
+    POST {document_type, filename, size} opens a resumable upload session.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = VerificationUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            upload = VerificationUploadService.start(request.user, **serializer.validated_data)
+        except PermissionError as e:
+            return Response({'error': str(e)}, status=status.HTTP_403_FORBIDDEN)
+        except UploadTooLarge as e:
+            return Response({'error': str(e)}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(VerificationUploadSerializer(upload).data, status=status.HTTP_201_CREATED)
+
+class UploadChunkView(APIView):
+    """
+    GET reports how many bytes were received (where to resume).
+    PUT appends the raw request body at the `Upload-Offset` header position.
+    The body is read from the request stream block by block; it is never parsed or buffered.
+    404 once the staging data is gone: the session is dropped and the client starts a new upload.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        upload = get_object_or_404(VerificationUpload, pk=pk, specialist=request.user)
+        return Response(VerificationUploadSerializer(upload).data)
+
+    def put(self, request, pk):
+        get_object_or_404(VerificationUpload.objects.only('pk'), pk=pk, specialist=request.user)
+        try:
+            offset = int(request.headers['Upload-Offset'])
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except (KeyError, ValueError):
+            return Response({'error': 'Upload-Offset and Content-Length headers required'}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            upload = VerificationUploadService.append(pk, request.user, offset, request.stream, length)
+        except OffsetMismatch as e:
+            return Response({'error': str(e), 'received': e.expected}, status=status.HTTP_409_CONFLICT)
+        except UploadExpired as e:
+            return Response({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
+        except UploadTooLarge as e:
+            return Response({'error': str(e)}, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        return Response(VerificationUploadSerializer(upload).data)
+
+class UploadCompleteView(APIView):
+    """
+    POST once every byte is received. Returns the document right away;
+    validation and the thumbnail follow in the background (processed_at).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, pk):
+        get_object_or_404(VerificationUpload.objects.only('pk'), pk=pk, specialist=request.user)
+        try:
+            document, created = VerificationUploadService.complete(pk, request.user)
+        except UploadExpired as e:
+            return Response({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            VerificationDocumentSerializer(document, context={'request': request}).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+class ReviewClaimView(APIView):
+    """
+    POST {limit} leases the next batch of pending documents to the calling moderator.
+    Parallel moderators receive disjoint batches.
+    """
+    permission_classes = [IsModerator]
+
+    def post(self, request):
+        serializer = ReviewClaimSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        documents = VerificationReviewService.claim_batch(request.user, serializer.validated_data['limit'])
+        return Response({
+            'results': ReviewQueueDocumentSerializer(documents, many=True, context={'request': request}).data,
+        })
+
+class ReviewDecideView(APIView):
+    """
+    POST {decisions: [{id, status, rejection_reason}]} records decisions on claimed documents.
+    Documents whose lease was lost are reported back and left untouched.
+    """
+    permission_classes = [IsModerator]
+
+    def post(self, request):
+        serializer = ReviewDecideSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        decided, lost = VerificationReviewService.decide(request.user, serializer.validated_data['decisions'])
+        return Response({'decided': decided, 'lost': lost})
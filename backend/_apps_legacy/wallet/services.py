@@ -50,3 +50,38 @@ class WalletService:
             metadata=metadata or {}
         )
         return txn
+
+    @staticmethod
+    @transaction.atomic
+    def process_batch(user_id, entries, allow_negative=False):
+        """
+        Applies several transactions to one wallet under a single lock and balance write.
+        entries: dicts with amount, transaction_type, description, idempotency_key, metadata.
+        Entries whose idempotency_key was already applied are skipped, so a retried batch is safe.
+        """
+        keys = [entry['idempotency_key'] for entry in entries]
+        applied = set(Transaction.objects.filter(idempotency_key__in=keys).values_list('idempotency_key', flat=True))
+        fresh = [entry for entry in entries if entry['idempotency_key'] not in applied]
+        if not fresh:
+            return []
+
+        wallet, created = Wallet.objects.select_for_update().get_or_create(specialist_id=user_id)
+
+        total = sum((entry['amount'] for entry in fresh), Decimal('0'))
+        if not allow_negative and (wallet.balance + total) < 0:
+            raise InsufficientFunds(f"Insufficient funds. Current: {wallet.balance}, Needed: {abs(total)}")
+
+        wallet.balance += total
+        wallet.save()
+
+        return Transaction.objects.bulk_create([
+            Transaction(
+                wallet=wallet,
+                amount=entry['amount'],
+                transaction_type=entry['transaction_type'],
+                description=entry.get('description', ''),
+                idempotency_key=entry['idempotency_key'],
+                metadata=entry.get('metadata') or {}
+            )
+            for entry in fresh
+        ])
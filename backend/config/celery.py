@@ -12,4 +12,12 @@ app.conf.beat_schedule = {
         'task': 'apps.responses.tasks.process_refunds_for_unviewed_responses',
         'schedule': 900.0, # 15 minutes
     },
+    'settle-commissions-every-minute': {
+        'task': 'apps.deals.tasks.settle_commissions',
+        'schedule': 60.0,
+    },
+    'purge-stale-verification-uploads-hourly': {
+        'task': 'apps.verification.tasks.purge_stale_uploads',
+        'schedule': 3600.0,
+    },
 }
@@ -9,6 +9,7 @@ DEBUG = os.environ.get('DEBUG', 'True') == 'True'
 ALLOWED_HOSTS = os.environ.get('ALLOWED_HOSTS', '*').split(',')
 
 INSTALLED_APPS = [
+    'daphne',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -20,6 +21,7 @@ INSTALLED_APPS = [
     'rest_framework_simplejwt',
     'drf_spectacular',
     'django_filters',
+    'channels',
     # Local
     'apps.accounts',
     'apps.directory',
@@ -61,6 +63,17 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'config.wsgi.application'
+ASGI_APPLICATION = 'config.asgi.application'
+
+# Channels (WebSocket chat)
+CHANNEL_LAYERS = {
+    'default': {
+        'BACKEND': 'channels_redis.core.RedisChannelLayer',
+        'CONFIG': {
+            'hosts': [os.environ.get('CHANNEL_LAYER_URL', 'redis://redis:6379/2')],
+        },
+    },
+}
 
 import dj_database_url
 DATABASES = {
@@ -87,15 +100,35 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # SimpleJWT with request.user hydrated from a cache instead of a users query per request
+        'apps.users.authentication.CachedJWTAuthentication',
     ),
 }
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
+    'TOKEN_OBTAIN_SERIALIZER': 'apps.users.serializers.RoleTokenObtainPairSerializer',
 }
 
+# Shared Redis cache when CACHE_URL is set (docker-compose, production); per-process LocMem otherwise
+if os.environ.get('CACHE_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['CACHE_URL'],
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
+AUTH_USER_CACHE_TTL = 60 # seconds a user row is served from the shared cache
+AUTH_USER_LOCAL_TTL = 5 # seconds a worker reuses a user row without asking the shared cache
+AUTH_USER_LOCAL_MAX_ENTRIES = 10000 # users kept per worker; least recently used are evicted
+
 # Celery
 CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', 'redis://redis:6379/1')
 CELERY_RESULT_BACKEND = os.environ.get('CELERY_BROKER_URL', 'redis://redis:6379/1')
@@ -104,3 +137,17 @@ CELERY_TASK_SERIALIZER = 'json'
 
 # Service Settings (to be expanded)
 REFUND_TTL_HOURS = 24
+FEED_FACETS_CACHE_TTL = 60 # seconds
+CATALOG_CACHE_TTL = 3600 # seconds; backstop for catalog cache writes that bypass signals
+REFERENCE_DATA_MAX_AGE = 300 # seconds clients may reuse the catalog bundle before revalidating
+COMMISSION_CODE_TTL_MINUTES = 30
+COMMISSION_CODE_MAX_ATTEMPTS = 5
+COMMISSION_SETTLEMENT_RETRY_MINUTES = 5 # first backoff after a failed settlement; doubles per failure, capped at a day
+CHAT_WS_FLUSH_INTERVAL = 0.02 # seconds a message may wait for a batched INSERT
+CHAT_WS_MAX_BATCH = 200
+VERIFICATION_UPLOAD_MAX_BYTES = 20 * 1024 * 1024
+VERIFICATION_UPLOAD_CHUNK_BYTES = 5 * 1024 * 1024 # largest body accepted by one chunk request
+VERIFICATION_UPLOAD_STALE_HOURS = 24
+VERIFICATION_CLAIM_LEASE_MINUTES = 15 # how long a moderator holds claimed documents before they return to the queue
+VERIFICATION_UPLOAD_DIR = os.environ.get('VERIFICATION_UPLOAD_DIR', '') # staging for partial uploads, shared by all app instances; system temp dir if empty (single host only)
+CHAT_WS_RESUME_LIMIT = 200
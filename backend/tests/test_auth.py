@@ -0,0 +1,114 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+from apps.users.authentication import CachedJWTAuthentication, ClaimsJWTAuthentication, ClaimsUser, UserCache
+from apps.users.serializers import RoleTokenObtainPairSerializer
+
+User = get_user_model()
+
+@pytest.fixture
+def specialist(db):
+    cache.clear()
+    UserCache.clear_local()
+    return User.objects.create_user(email='s@t.com', phone='1', password='pw12345!', role='SPECIALIST')
+
+def bearer(user):
+    return f'Bearer {RoleTokenObtainPairSerializer.get_token(user).access_token}'
+
+def get_request(user, method='get'):
+    return getattr(APIRequestFactory(), method)('/', HTTP_AUTHORIZATION=bearer(user))
+
+@pytest.mark.django_db
+class TestCachedJWTAuthentication:
+    def test_user_row_read_once(self, specialist, django_assert_num_queries):
+        auth = CachedJWTAuthentication()
+        with django_assert_num_queries(1):
+            auth.authenticate(get_request(specialist))
+        UserCache.clear_local()
+        with django_assert_num_queries(0):
+            user, _ = auth.authenticate(get_request(specialist))
+            user_again, _ = auth.authenticate(get_request(specialist))
+        assert user.pk == specialist.pk and user.role == 'SPECIALIST'
+        # Fresh instance per request
+        assert user is not user_again
+
+    def test_save_invalidates_on_commit(self, specialist, django_capture_on_commit_callbacks):
+        auth = CachedJWTAuthentication()
+        auth.authenticate(get_request(specialist))
+        with django_capture_on_commit_callbacks(execute=True):
+            specialist.role = 'MODERATOR'
+            specialist.save()
+            # Until commit the cached row is kept, so a concurrent request cannot re-cache the old one
+            assert auth.authenticate(get_request(specialist))[0].role == 'SPECIALIST'
+        assert auth.authenticate(get_request(specialist))[0].role == 'MODERATOR'
+
+        with django_capture_on_commit_callbacks(execute=True):
+            specialist.is_active = False
+            specialist.save()
+        with pytest.raises(AuthenticationFailed):
+            auth.authenticate(get_request(specialist))
+
+    def test_queryset_delete_invalidates(self, specialist, django_capture_on_commit_callbacks):
+        auth = CachedJWTAuthentication()
+        request = get_request(specialist)
+        auth.authenticate(request)
+        with django_capture_on_commit_callbacks(execute=True):
+            User.objects.filter(pk=specialist.pk).delete()
+        with pytest.raises(AuthenticationFailed):
+            auth.authenticate(request)
+
+    def test_deleted_user_rejected(self, specialist):
+        request = get_request(specialist)
+        specialist.delete()
+        with pytest.raises(AuthenticationFailed):
+            CachedJWTAuthentication().authenticate(request)
+
+    def test_saving_cached_user_keeps_password(self, specialist):
+        user, _ = CachedJWTAuthentication().authenticate(get_request(specialist))
+        user.phone = '2'
+        user.save()
+        specialist.refresh_from_db()
+        assert specialist.phone == '2'
+        assert specialist.check_password('pw12345!')
+
+    def test_local_cache_is_bounded(self, specialist, settings):
+        settings.AUTH_USER_LOCAL_MAX_ENTRIES = 2
+        others = [
+            User.objects.create_user(email=f'u{i}@t.com', phone=f'u{i}', role='CLIENT') for i in range(2)
+        ]
+        UserCache.get(specialist.pk)
+        UserCache.get(others[0].pk)
+        UserCache.get(specialist.pk)
+        UserCache.get(others[1].pk)
+        # The least recently used entry made room
+        assert list(UserCache._local) == [specialist.pk, others[1].pk]
+
+@pytest.mark.django_db
+class TestClaimsJWTAuthentication:
+    def test_reads_trust_claims(self, specialist, django_assert_num_queries):
+        with django_assert_num_queries(0):
+            user, _ = ClaimsJWTAuthentication().authenticate(get_request(specialist))
+        assert isinstance(user, ClaimsUser)
+        assert (user.id, user.role) == (specialist.pk, 'SPECIALIST')
+
+    def test_writes_and_legacy_tokens_hydrate(self, specialist):
+        user, _ = ClaimsJWTAuthentication().authenticate(get_request(specialist, 'post'))
+        assert isinstance(user, User)
+
+        legacy = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(specialist)}')
+        assert isinstance(ClaimsJWTAuthentication().authenticate(legacy)[0], User)
+
+    def test_feed_does_not_touch_users(self, specialist, django_assert_max_num_queries):
+        api = APIClient()
+        api.credentials(HTTP_AUTHORIZATION=bearer(specialist))
+        with django_assert_max_num_queries(2) as captured:
+            response = api.get('/api/requests/feed/')
+        assert response.status_code == 200
+        assert not any('"users_user"' in query['sql'] for query in captured.captured_queries)
+
+    def test_login_issues_role_claim(self, specialist):
+        response = APIClient().post('/api/auth/login/', {'email': 's@t.com', 'password': 'pw12345!'}, format='json')
+        assert AccessToken(response.json()['access'])['role'] == 'SPECIALIST'
@@ -0,0 +1,146 @@
+import gzip
+import json
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APIClient
+from apps.catalog.models import Category, District
+from apps.catalog.services import CategoryPathService
+from apps.requests.models import Request
+from apps.requests.services import OpenRequestProjection
+
+User = get_user_model()
+
+@pytest.fixture
+def category_tree(db):
+    cache.clear()
+    repair = Category.objects.create(name='Repair')
+    plumbing = Category.objects.create(name='Plumbing', parent=repair)
+    Category.objects.create(name='Pipes', parent=plumbing)
+    Category.objects.create(name='Hidden', parent=repair, is_active=False)
+    Category.objects.create(name='Tutor', default_tariff=Category.TariffType.COMMISSION)
+    return repair
+
+@pytest.mark.django_db
+class TestCategoryTree:
+    def test_tree_built_in_one_query_then_cached(self, category_tree, django_assert_num_queries):
+        api = APIClient()
+        with django_assert_num_queries(1):
+            response = api.get('/api/catalog/categories/')
+        tree = response.json()
+        assert [c['name'] for c in tree] == ['Repair', 'Tutor']
+        assert [c['name'] for c in tree[0]['children']] == ['Plumbing']
+        assert tree[0]['children'][0]['children'][0]['name'] == 'Pipes'
+
+        with django_assert_num_queries(0):
+            assert api.get('/api/catalog/categories/').json() == tree
+
+    def test_save_and_delete_invalidate(self, category_tree):
+        api = APIClient()
+        api.get('/api/catalog/categories/')
+
+        Category.objects.create(name='Electrician', parent=category_tree)
+        children = api.get('/api/catalog/categories/').json()[0]['children']
+        assert [c['name'] for c in children] == ['Plumbing', 'Electrician']
+
+        category_tree.delete()
+        assert [c['name'] for c in api.get('/api/catalog/categories/').json()] == ['Tutor']
+
+    def test_queryset_delete_invalidates(self, category_tree):
+        # Admin "delete selected" deletes through the queryset, never calling Category.delete()
+        api = APIClient()
+        api.get('/api/catalog/categories/')
+        Category.objects.filter(name='Tutor').delete()
+        assert [c['name'] for c in api.get('/api/catalog/categories/').json()] == ['Repair']
+
+@pytest.mark.django_db
+class TestCategoryPath:
+    def test_paths_follow_parents(self, category_tree):
+        plumbing = Category.objects.get(name='Plumbing')
+        pipes = Category.objects.get(name='Pipes')
+        assert pipes.path == f'{category_tree.id}/{plumbing.id}/{pipes.id}/'
+        assert pipes.depth == 2
+        assert pipes.get_ancestor_ids() == [category_tree.id, plumbing.id]
+        assert set(category_tree.get_descendants().values_list('name', flat=True)) == {
+            'Repair', 'Plumbing', 'Pipes', 'Hidden'
+        }
+
+    def test_move_rewrites_subtree(self, category_tree):
+        tutor = Category.objects.get(name='Tutor')
+        plumbing = Category.objects.get(name='Plumbing')
+        plumbing.parent = tutor
+        plumbing.save()
+
+        pipes = Category.objects.get(name='Pipes')
+        assert pipes.path == f'{tutor.id}/{plumbing.id}/{pipes.id}/'
+        assert pipes.depth == 2
+        assert not category_tree.get_descendants().filter(name='Pipes').exists()
+
+    def test_cannot_move_under_own_subtree(self, category_tree):
+        category_tree.parent = Category.objects.get(name='Pipes')
+        with pytest.raises(ValueError):
+            category_tree.save()
+
+    def test_rebuild_paths(self, category_tree):
+        Category.objects.update(path='', depth=0)
+        assert CategoryPathService.rebuild_paths() == 5
+        assert Category.objects.get(name='Pipes').depth == 2
+
+@pytest.mark.django_db
+def test_feed_filters_by_category_subtree(category_tree):
+    client = User.objects.create_user(email='c@t.com', phone='1', role='CLIENT')
+    specialist = User.objects.create_user(email='s@t.com', phone='2', role='SPECIALIST')
+    district = District.objects.create(name='Chilanzar')
+    for name in ('Pipes', 'Plumbing', 'Tutor'):
+        req = Request.objects.create(
+            client=client, category=Category.objects.get(name=name), district=district,
+            budget=100000, description=name
+        )
+        OpenRequestProjection.add(req)
+
+    api = APIClient()
+    api.force_authenticate(specialist)
+    response = api.get('/api/requests/feed/', {'category_tree': category_tree.id})
+    assert response.status_code == 200
+    assert sorted(item['category'] for item in response.data) == sorted(
+        Category.objects.filter(name__in=('Pipes', 'Plumbing')).values_list('id', flat=True)
+    )
+
+@pytest.mark.django_db
+class TestReferenceBundle:
+    def test_unchanged_client_gets_304_without_queries(self, category_tree, django_assert_num_queries):
+        District.objects.create(name='Mirabad')
+        api = APIClient()
+        first = api.get('/api/catalog/bundle/')
+        assert first.status_code == 200
+        assert first['Cache-Control'] == 'public, max-age=300'
+        body = first.json()
+        assert body['districts'][0]['name'] == 'Mirabad'
+        assert {t['value'] for t in body['tariff_types']} == {'COMMISSION', 'RESPONSE'}
+
+        with django_assert_num_queries(0):
+            second = api.get('/api/catalog/bundle/', HTTP_IF_NONE_MATCH=first['ETag'])
+        assert second.status_code == 304
+        assert second['ETag'] == first['ETag']
+
+    def test_gzip_and_new_etag_after_change(self, category_tree):
+        api = APIClient()
+        first = api.get('/api/catalog/bundle/', HTTP_ACCEPT_ENCODING='gzip')
+        assert first['Content-Encoding'] == 'gzip'
+        version = json.loads(gzip.decompress(first.content))['version']
+        assert first['ETag'] == f'"{version}-gzip"'
+
+        identity = api.get('/api/catalog/bundle/', HTTP_ACCEPT_ENCODING='gzip;q=0, identity')
+        assert 'Content-Encoding' not in identity
+        assert identity['ETag'] == f'"{version}"'
+        # Either representation's ETag revalidates
+        assert api.get('/api/catalog/bundle/', HTTP_IF_NONE_MATCH=first['ETag']).status_code == 304
+
+        District.objects.create(name='Sergeli')
+        second = api.get('/api/catalog/bundle/', HTTP_IF_NONE_MATCH=first['ETag'])
+        assert second.status_code == 200
+        assert second['ETag'] != identity['ETag']
+
+        # Queryset deletes go through post_delete too
+        District.objects.filter(name='Sergeli').delete()
+        assert api.get('/api/catalog/bundle/', HTTP_IF_NONE_MATCH=second['ETag']).status_code == 200
@@ -0,0 +1,125 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from apps.catalog.models import Category, District
+from apps.requests.models import Request
+from apps.deals.services import DealService
+from apps.chat.models import Chat, Message
+
+User = get_user_model()
+
+@pytest.fixture
+def chat_setup(db):
+    client = User.objects.create_user(email='c@t.com', phone='1', role='CLIENT')
+    specialist = User.objects.create_user(email='s@t.com', phone='2', role='SPECIALIST')
+    cat = Category.objects.create(name='Tutor')
+    dist = District.objects.create(name='Mirabad')
+    req = Request.objects.create(client=client, category=cat, district=dist, budget=300000, description='Math')
+    deal = DealService.create_deal(req.id, specialist)
+    chat = Chat.objects.create(deal=deal)
+    return chat, client, specialist
+
+@pytest.mark.django_db
+class TestMessageHistory:
+    def test_pages_backward_in_fixed_queries(self, chat_setup, django_assert_num_queries):
+        chat, client, specialist = chat_setup
+        for i in range(60):
+            Message.objects.create(chat=chat, sender=client if i % 2 else specialist, text=f'm{i}')
+
+        api = APIClient()
+        api.force_authenticate(client)
+        # participant check + page
+        with django_assert_num_queries(2):
+            first = api.get(f'/api/chats/{chat.id}/messages/')
+        assert [m['text'] for m in first.data['results'][:2]] == ['m59', 'm58']
+
+        older = api.get(first.data['next'])
+        assert len(older.data['results']) == 10
+        assert older.data['results'][-1]['text'] == 'm0'
+
+    def test_non_participant_gets_404(self, chat_setup):
+        chat, _, _ = chat_setup
+        stranger = User.objects.create_user(email='x@t.com', phone='3', role='CLIENT')
+
+        api = APIClient()
+        api.force_authenticate(stranger)
+        assert api.get(f'/api/chats/{chat.id}/messages/').status_code == 404
+        assert api.post(f'/api/chats/{chat.id}/messages/', {'text': 'hi'}).status_code == 404
+
+@pytest.mark.django_db
+class TestChatInbox:
+    def test_counters_follow_messages_and_receipts(self, chat_setup):
+        chat, client, specialist = chat_setup
+        api = APIClient()
+        api.force_authenticate(specialist)
+        api.post(f'/api/chats/{chat.id}/messages/', {'text': 'hello'})
+        api.post(f'/api/chats/{chat.id}/messages/', {'text': 'are you there?'})
+
+        chat.refresh_from_db()
+        assert chat.client_unread_count == 2
+        assert chat.specialist_unread_count == 0
+        assert chat.last_message.text == 'are you there?'
+
+        api.force_authenticate(client)
+        api.post(f'/api/chats/{chat.id}/read/')
+        chat.refresh_from_db()
+        assert chat.client_unread_count == 0
+        assert not Message.objects.filter(chat=chat, is_read=False).exists()
+
+    def test_inbox_is_one_query(self, chat_setup, django_assert_num_queries):
+        chat, client, specialist = chat_setup
+        api = APIClient()
+        api.force_authenticate(specialist)
+        api.post(f'/api/chats/{chat.id}/messages/', {'text': 'hello'})
+
+        api.force_authenticate(client)
+        with django_assert_num_queries(1):
+            resp = api.get('/api/chats/')
+        assert resp.data[0]['unread_count'] == 1
+        assert resp.data[0]['last_message']['text'] == 'hello'
+
+@pytest.mark.django_db
+def test_websocket_fanout_and_resume(chat_setup, settings):
+    from asgiref.sync import async_to_sync
+    from channels.layers import channel_layers
+    from channels.routing import URLRouter
+    from channels.testing import WebsocketCommunicator
+    from apps.chat.routing import websocket_urlpatterns
+
+    settings.CHANNEL_LAYERS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+    channel_layers.backends.clear()
+    chat, client, specialist = chat_setup
+    app = URLRouter(websocket_urlpatterns)
+
+    def communicator(user, query=''):
+        comm = WebsocketCommunicator(app, f'/ws/chats/{chat.id}/{query}')
+        comm.scope['user'] = user
+        return comm
+
+    async def scenario():
+        spec_ws, client_ws = communicator(specialist), communicator(client)
+        assert (await spec_ws.connect())[0]
+        assert (await client_ws.connect())[0]
+
+        await spec_ws.send_json_to({'type': 'message', 'text': 'on my way'})
+        received = await client_ws.receive_json_from(timeout=2)
+        echoed = await spec_ws.receive_json_from(timeout=2)
+        assert received['message']['text'] == 'on my way'
+        assert received['message']['id'] == echoed['message']['id']
+        await client_ws.disconnect()
+
+        await spec_ws.send_json_to({'type': 'message', 'text': 'arrived'})
+        await spec_ws.receive_json_from(timeout=2)
+
+        # Reconnect from the last seen id replays only what was missed
+        resumed = communicator(client, f"?after={received['message']['id']}")
+        await resumed.connect()
+        replay = await resumed.receive_json_from(timeout=2)
+        assert replay['message']['text'] == 'arrived'
+        assert await resumed.receive_nothing()
+        await resumed.disconnect()
+        await spec_ws.disconnect()
+
+    async_to_sync(scenario)()
+    chat.refresh_from_db()
+    assert chat.client_unread_count == 2
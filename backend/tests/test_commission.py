@@ -0,0 +1,121 @@
+import pytest
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from apps.users.models import SpecialistProfile
+from apps.catalog.models import Category, District
+from apps.requests.models import Request
+from apps.deals.models import Deal
+from apps.deals.payment_models import FirstPaymentConfirmation
+from apps.deals.services import DealService
+from apps.deals.commission_services import CommissionService
+from apps.deals.tasks import settle_commissions
+from apps.pricing.services import PricingEngine
+from apps.wallet.models import Wallet, Transaction
+
+User = get_user_model()
+
+@pytest.fixture
+def commission_deal(db):
+    cache.clear()
+    client = User.objects.create_user(email='c@t.com', phone='1', role='CLIENT')
+    specialist = User.objects.create_user(email='s@t.com', phone='2', role='SPECIALIST')
+    SpecialistProfile.objects.create(user=specialist)
+    cat = Category.objects.create(name='Tutor', default_tariff='COMMISSION')
+    dist = District.objects.create(name='Mirabad')
+    req = Request.objects.create(client=client, category=cat, district=dist, budget=300000, description='Math')
+    deal = DealService.create_deal(req.id, specialist)
+    return Deal.objects.get(id=deal.id), client, specialist
+
+@pytest.mark.django_db
+class TestCommissionCode:
+    def test_code_is_not_stored_in_clear(self, commission_deal):
+        deal, _, specialist = commission_deal
+        code = CommissionService.generate_code(deal, specialist)
+
+        stored = FirstPaymentConfirmation.objects.get(deal=deal).code_hash
+        assert code not in stored
+        assert stored == CommissionService._code_digest(deal.id, code)
+
+    def test_valid_code_accepts_and_defers_charge(self, commission_deal, django_capture_on_commit_callbacks):
+        deal, client, specialist = commission_deal
+        code = CommissionService.generate_code(deal, specialist)
+        deal = Deal.objects.get(id=deal.id)
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            assert CommissionService.confirm_payment(deal, client, code) is True
+        assert len(callbacks) == 1
+
+        conf = FirstPaymentConfirmation.objects.get(deal=deal)
+        assert conf.confirmed_at is not None and conf.settled_at is None
+        assert not Wallet.objects.filter(specialist=specialist).exists()
+
+    def test_attempts_are_limited(self, commission_deal, settings):
+        settings.COMMISSION_CODE_MAX_ATTEMPTS = 2
+        deal, client, specialist = commission_deal
+        code = CommissionService.generate_code(deal, specialist)
+        deal = Deal.objects.get(id=deal.id)
+        wrong = '000000' if code != '000000' else '111111'
+
+        for _ in range(2):
+            with pytest.raises(ValueError, match='Invalid code'):
+                CommissionService.confirm_payment(deal, client, wrong)
+        # Budget exhausted: even the right code is refused until a new one is generated
+        with pytest.raises(ValueError, match='Too many attempts'):
+            CommissionService.confirm_payment(deal, client, code)
+
+    def test_expired_code_rejected(self, commission_deal):
+        deal, client, specialist = commission_deal
+        code = CommissionService.generate_code(deal, specialist)
+        FirstPaymentConfirmation.objects.filter(deal=deal).update(generated_at=timezone.now() - timedelta(hours=2))
+        deal = Deal.objects.get(id=deal.id)
+
+        with pytest.raises(ValueError, match='expired'):
+            CommissionService.confirm_payment(deal, client, code)
+
+@pytest.mark.django_db
+def test_settlement_charges_once(commission_deal):
+    deal, client, specialist = commission_deal
+    code = CommissionService.generate_code(deal, specialist)
+    CommissionService.confirm_payment(Deal.objects.get(id=deal.id), client, code)
+
+    settle_commissions()
+    settle_commissions()
+
+    wallet = Wallet.objects.get(specialist=specialist)
+    # No TariffRule configured: PricingEngine falls back to 5000
+    assert wallet.balance == -5000
+    assert Transaction.objects.filter(wallet=wallet, transaction_type=Transaction.Type.CHARGE_COMMISSION).count() == 1
+    deal.refresh_from_db()
+    assert deal.status == Deal.Status.COMPLETED
+    assert FirstPaymentConfirmation.objects.get(deal=deal).settled_at is not None
+
+@pytest.mark.django_db
+def test_failing_group_does_not_block_others(commission_deal, monkeypatch):
+    deal, client, specialist = commission_deal
+    other = User.objects.create_user(email='s2@t.com', phone='3', role='SPECIALIST')
+    bad_req = Request.objects.create(
+        client=client, category=deal.request.category, district=deal.request.district, budget=1, description='Bad'
+    )
+    bad_deal = DealService.create_deal(bad_req.id, other)
+    for d, s in ((deal, specialist), (bad_deal, other)):
+        code = CommissionService.generate_code(d, s)
+        CommissionService.confirm_payment(Deal.objects.get(id=d.id), client, code)
+
+    calculate_price = PricingEngine.calculate_price
+    def flaky_price(**kwargs):
+        if kwargs['budget'] == 1:
+            raise ValueError("Broken tariff rule")
+        return calculate_price(**kwargs)
+    monkeypatch.setattr(PricingEngine, 'calculate_price', flaky_price)
+
+    assert CommissionService.settle_pending() == 1
+    assert FirstPaymentConfirmation.objects.get(deal=deal).settled_at is not None
+    failed = FirstPaymentConfirmation.objects.get(deal=bad_deal)
+    assert failed.settled_at is None
+    assert failed.settlement_attempts == 1 and failed.next_settlement_at > timezone.now()
+
+    # Backed off: the next run does not claim it again
+    assert CommissionService.settle_pending() == 0
+    assert FirstPaymentConfirmation.objects.get(deal=bad_deal).settlement_attempts == 1
@@ -0,0 +1,67 @@
+import pytest
+from django.contrib.auth import get_user_model
+from apps.catalog.models import Category, District
+from apps.requests.models import Request
+from apps.deals.models import Deal
+from apps.deals.services import DealService
+
+User = get_user_model()
+
+@pytest.fixture
+def deal_setup(db):
+    client = User.objects.create_user(email='c@t.com', phone='1', role='CLIENT')
+    specialist = User.objects.create_user(email='s@t.com', phone='2', role='SPECIALIST')
+    cat = Category.objects.create(name='Tutor')
+    dist = District.objects.create(name='Mirabad')
+    req = Request.objects.create(client=client, category=cat, district=dist, budget=300000, description='Math')
+    return client, specialist, req
+
+@pytest.mark.django_db
+class TestCreateDeal:
+    def test_closes_request(self, deal_setup):
+        _, specialist, req = deal_setup
+        deal = DealService.create_deal(req.id, specialist)
+
+        req.refresh_from_db()
+        assert deal.request_id == req.id
+        assert req.status == Request.Status.CLOSED
+
+    def test_second_selection_rejected(self, deal_setup):
+        _, specialist, req = deal_setup
+        other = User.objects.create_user(email='o@t.com', phone='3', role='SPECIALIST')
+        DealService.create_deal(req.id, specialist)
+
+        with pytest.raises(ValueError):
+            DealService.create_deal(req.id, other)
+        assert Deal.objects.filter(request=req).count() == 1
+
+    def test_query_budget(self, deal_setup, django_assert_max_num_queries):
+        _, specialist, req = deal_setup
+        # lock + insert + close + projection cleanup (savepoints aside)
+        with django_assert_max_num_queries(6):
+            DealService.create_deal(req.id, specialist)
+
+@pytest.mark.django_db
+def test_dashboard_fixed_query_count(deal_setup, django_assert_num_queries):
+    from rest_framework.test import APIClient
+    from apps.chat.models import Chat
+    client, specialist, req = deal_setup
+    deals = [DealService.create_deal(req.id, specialist)]
+    for i in range(3):
+        extra = Request.objects.create(
+            client=client, category=req.category, district=req.district, budget=1000, description=f'Extra {i}'
+        )
+        deals.append(DealService.create_deal(extra.id, specialist))
+    Chat.objects.create(deal=deals[0])
+
+    api = APIClient()
+    api.force_authenticate(client)
+    with django_assert_num_queries(1):
+        resp = api.get('/api/deals/dashboard/', {'status': 'IN_PROGRESS'})
+
+    assert resp.status_code == 200
+    results = resp.data['results']
+    assert [r['id'] for r in results] == [d.id for d in reversed(deals)]
+    assert results[-1]['chat_id'] is not None
+    assert results[0]['has_review'] is False
+    assert results[0]['payment_confirmed'] is False
@@ -0,0 +1,73 @@
+import pytest
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from apps.catalog.models import Category, District
+from apps.requests.models import Request, OpenRequest
+from apps.requests.services import OpenRequestProjection, FeedFacetService
+from apps.responses.services import ResponseService
+from apps.deals.services import DealService
+
+User = get_user_model()
+
+@pytest.fixture
+def open_request(db):
+    client = User.objects.create_user(email='c@t.com', phone='1', role='CLIENT')
+    cat = Category.objects.create(name='Plumber', default_tariff='COMMISSION')
+    dist = District.objects.create(name='Chilanzar')
+    req = Request.objects.create(client=client, category=cat, district=dist, budget=100000, description='Fix tap')
+    OpenRequestProjection.add(req)
+    return req
+
+@pytest.mark.django_db
+class TestOpenRequestProjection:
+    def test_add_copies_feed_columns(self, open_request):
+        entry = OpenRequest.objects.get(request=open_request)
+        assert entry.category_id == open_request.category_id
+        assert entry.district_id == open_request.district_id
+        assert entry.budget == Decimal('100000')
+        assert entry.response_count == 0
+
+    def test_response_increments_counter_once(self, open_request):
+        specialist = User.objects.create_user(email='s@t.com', phone='2', role='SPECIALIST')
+        ResponseService.create_response(open_request, specialist, 'Hi')
+        # Double-click returns the existing response and must not count twice
+        ResponseService.create_response(open_request, specialist, 'Hi')
+
+        assert OpenRequest.objects.get(request=open_request).response_count == 1
+
+    def test_deal_removes_entry(self, open_request):
+        specialist = User.objects.create_user(email='s@t.com', phone='2', role='SPECIALIST')
+        DealService.create_deal(open_request.id, specialist)
+
+        assert not OpenRequest.objects.filter(request=open_request).exists()
+
+    def test_rebuild_skips_closed_requests(self, open_request):
+        Request.objects.create(
+            client=open_request.client, category=open_request.category, district=open_request.district,
+            budget=5000, description='Old', status=Request.Status.CLOSED
+        )
+        OpenRequest.objects.all().delete()
+
+        assert OpenRequestProjection.rebuild() == 1
+        assert OpenRequest.objects.filter(request=open_request).exists()
+
+@pytest.mark.django_db
+def test_feed_facets_single_query(open_request, django_assert_num_queries):
+    cache.clear()
+    other_dist = District.objects.create(name='Yunusabad')
+    big = Request.objects.create(
+        client=open_request.client, category=open_request.category, district=other_dist,
+        budget=2000000, description='Renovation'
+    )
+    OpenRequestProjection.add(big)
+
+    with django_assert_num_queries(1):
+        facets = FeedFacetService.get_facets(district_id=other_dist.id)
+    # District facet ignores its own filter; the others are narrowed by it
+    assert {f['id']: f['count'] for f in facets['district']} == {open_request.district_id: 1, other_dist.id: 1}
+    assert facets['category'] == [{'id': open_request.category_id, 'count': 1}]
+    assert {f['bucket']: f['count'] for f in facets['budget']}['OVER_1M'] == 1
+
+    with django_assert_num_queries(0):
+        FeedFacetService.get_facets(district_id=other_dist.id)
@@ -91,3 +91,37 @@ class TestPricingEngine:
         )
         # Calc: 100000 * 2.0 = 200000. But Max is 50000
         assert price == Decimal('50000')
+
+    def test_subcategory_inherits_parent_rule(self, setup_pricing_data):
+        cat, _ = setup_pricing_data
+        leaf = Category.objects.create(name='Boilers', parent=Category.objects.create(name='Heating', parent=cat))
+        price = PricingEngine.calculate_price(
+            category_id=leaf.id,
+            district_id=None,
+            tariff_type='RESPONSE',
+            budget=Decimal('50000'),
+            responses_count=0,
+            specialist_level='NEW'
+        )
+        assert price == Decimal('10000')
+
+    def test_own_district_rule_beats_parent(self, setup_pricing_data):
+        cat, _ = setup_pricing_data
+        child = Category.objects.create(name='Heating', parent=cat)
+        dist = District.objects.create(name='Sergeli')
+        TariffRule.objects.create(category=child, district=dist, tariff_type='RESPONSE', base_price=Decimal('7000'))
+
+        assert PricingEngine.find_rule(child.id, dist.id, 'RESPONSE').base_price == Decimal('7000')
+        assert PricingEngine.find_rule(child.id, None, 'RESPONSE').category_id == cat.id
+
+    def test_category_specificity_outranks_district(self, setup_pricing_data):
+        # Deliberate: the nearest category with any rule wins, so a subcategory's
+        # all-districts default beats its parent's district-specific rule
+        cat, _ = setup_pricing_data
+        child = Category.objects.create(name='Heating', parent=cat)
+        dist = District.objects.create(name='Sergeli')
+        TariffRule.objects.create(category=cat, district=dist, tariff_type='RESPONSE', base_price=Decimal('20000'))
+        TariffRule.objects.create(category=child, tariff_type='RESPONSE', base_price=Decimal('8000'))
+
+        assert PricingEngine.find_rule(child.id, dist.id, 'RESPONSE').base_price == Decimal('8000')
+        assert PricingEngine.find_rule(cat.id, dist.id, 'RESPONSE').base_price == Decimal('20000')
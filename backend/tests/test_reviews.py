@@ -0,0 +1,75 @@
+import pytest
+from django.contrib.auth import get_user_model
+from apps.catalog.models import Category, District
+from apps.requests.models import Request
+from apps.deals.services import DealService
+from apps.reviews.models import Review
+from apps.reviews.signals import recompute_specialist_ratings
+from apps.users.models import SpecialistProfile
+
+User = get_user_model()
+
+@pytest.fixture
+def review_setup(db):
+    client = User.objects.create_user(email='c@t.com', phone='1', role='CLIENT')
+    specialist = User.objects.create_user(email='s@t.com', phone='2', role='SPECIALIST')
+    SpecialistProfile.objects.create(user=specialist)
+    cat = Category.objects.create(name='Tutor')
+    dist = District.objects.create(name='Mirabad')
+
+    def make_deal():
+        req = Request.objects.create(client=client, category=cat, district=dist, budget=300000, description='Math')
+        return DealService.create_deal(req.id, specialist)
+
+    return client, specialist, make_deal
+
+def profile_of(specialist):
+    return SpecialistProfile.objects.get(user=specialist)
+
+@pytest.mark.django_db
+class TestIncrementalRating:
+    def test_insert_update_delete(self, review_setup):
+        client, specialist, make_deal = review_setup
+        first = Review.objects.create(deal=make_deal(), client=client, specialist=specialist, rating=5, text='Great')
+        Review.objects.create(deal=make_deal(), client=client, specialist=specialist, rating=4, text='Good')
+        profile = profile_of(specialist)
+        assert (profile.rating_sum, profile.rating_count, profile.rating) == (9, 2, 4.5)
+
+        first.rating = 1
+        first.save()
+        assert profile_of(specialist).rating == 2.5
+
+        first.delete()
+        profile = profile_of(specialist)
+        assert (profile.rating_sum, profile.rating_count, profile.rating) == (4, 1, 4.0)
+
+    def test_cascade_and_queryset_deletes(self, review_setup):
+        client, specialist, make_deal = review_setup
+        deal = make_deal()
+        Review.objects.create(deal=deal, client=client, specialist=specialist, rating=5, text='Great')
+        Review.objects.create(deal=make_deal(), client=client, specialist=specialist, rating=2, text='Meh')
+        Review.objects.create(deal=make_deal(), client=client, specialist=specialist, rating=4, text='Good')
+
+        deal.delete()  # cascades to its review
+        Review.objects.filter(rating=2).delete()
+        profile = profile_of(specialist)
+        assert (profile.rating_sum, profile.rating_count, profile.rating) == (4, 1, 4.0)
+
+    def test_recompute_repairs_drift(self, review_setup):
+        client, specialist, make_deal = review_setup
+        Review.objects.create(deal=make_deal(), client=client, specialist=specialist, rating=3, text='Ok')
+        SpecialistProfile.objects.update(rating_sum=0, rating_count=0, rating=0)
+
+        assert recompute_specialist_ratings() == 1
+        profile = profile_of(specialist)
+        assert (profile.rating_sum, profile.rating_count, profile.rating) == (3, 1, 3.0)
+
+    def test_average_rounded_to_two_places(self, review_setup):
+        client, specialist, make_deal = review_setup
+        for rating in (5, 4, 4):
+            Review.objects.create(deal=make_deal(), client=client, specialist=specialist, rating=rating, text='Ok')
+        assert profile_of(specialist).rating == 4.33
+
+        SpecialistProfile.objects.update(rating=0)
+        recompute_specialist_ratings()
+        assert profile_of(specialist).rating == 4.33
@@ -0,0 +1,274 @@
+import io
+import os
+from datetime import timedelta
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient
+from apps.verification.models import VerificationDocument, VerificationUpload
+from apps.verification.services import (
+    DocumentProcessingService, VerificationReviewService, VerificationUploadService,
+)
+
+User = get_user_model()
+
+def png_bytes(size=(1200, 800)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, (200, 30, 30)).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+@pytest.fixture
+def specialist_api(db, settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path / 'media')
+    settings.VERIFICATION_UPLOAD_DIR = str(tmp_path / 'staging')
+    specialist = User.objects.create_user(email='s@t.com', phone='1', role='SPECIALIST')
+    api = APIClient()
+    api.force_authenticate(specialist)
+    return api, specialist
+
+def start_upload(api, content, name='passport.png'):
+    response = api.post('/api/verification/uploads/', {
+        'document_type': 'PASSPORT', 'filename': name, 'size': len(content),
+    }, format='json')
+    assert response.status_code == 201
+    return response.json()['id']
+
+def put_chunk(api, upload_id, offset, chunk):
+    return api.generic(
+        'PUT', f'/api/verification/uploads/{upload_id}/', chunk,
+        content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET=str(offset),
+    )
+
+@pytest.mark.django_db
+class TestChunkedUpload:
+    def test_resumable_upload_creates_document(self, specialist_api):
+        api, specialist = specialist_api
+        content = png_bytes()
+        upload_id = start_upload(api, content)
+        half = len(content) // 2
+
+        assert put_chunk(api, upload_id, 0, content[:half]).json()['received'] == half
+        # A resent chunk at a stale offset is refused with the position to resume from
+        conflict = put_chunk(api, upload_id, 0, content[:half])
+        assert conflict.status_code == 409
+        assert conflict.json()['received'] == half
+        assert api.get(f'/api/verification/uploads/{upload_id}/').json()['received'] == half
+
+        assert api.post(f'/api/verification/uploads/{upload_id}/complete/').status_code == 400
+        assert put_chunk(api, upload_id, half, content[half:]).json()['received'] == len(content)
+
+        response = api.post(f'/api/verification/uploads/{upload_id}/complete/')
+        assert response.status_code == 201
+        document = VerificationDocument.objects.get(pk=response.json()['id'])
+        assert document.specialist == specialist
+        assert document.status == VerificationDocument.Status.PENDING
+        assert document.processed_at is None
+        with document.file.open('rb') as fh:
+            assert fh.read() == content
+        assert not VerificationUpload.objects.exists()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_chunk_streams_outside_a_transaction(self, specialist_api):
+        _, specialist = specialist_api
+        content = png_bytes()
+        upload = VerificationUploadService.start(specialist, 'PASSPORT', 'passport.png', len(content))
+
+        class SlowClient(io.BytesIO):
+            in_transaction = []
+            def read(self, size=-1):
+                self.in_transaction.append(connection.in_atomic_block)
+                return super().read(size)
+
+        VerificationUploadService.append(upload.pk, specialist, 0, SlowClient(content), len(content))
+        assert SlowClient.in_transaction and not any(SlowClient.in_transaction)
+        assert VerificationUpload.objects.get(pk=upload.pk).received == len(content)
+
+    def test_reupload_of_same_bytes_is_deduplicated(self, specialist_api):
+        api, _ = specialist_api
+        content = png_bytes()
+        first = api.post('/api/verification/documents/', {
+            'document_type': 'PASSPORT', 'file': SimpleUploadedFile('a.png', content),
+        })
+        assert first.status_code == 201
+
+        upload_id = start_upload(api, content, name='again.png')
+        put_chunk(api, upload_id, 0, content)
+        response = api.post(f'/api/verification/uploads/{upload_id}/complete/')
+        assert response.status_code == 200
+        assert response.json()['id'] == first.json()['id']
+        assert VerificationDocument.objects.count() == 1
+
+        # The same scan filed as another document type is a separate document
+        diploma = api.post('/api/verification/documents/', {
+            'document_type': 'DIPLOMA', 'file': SimpleUploadedFile('b.png', content),
+        })
+        assert diploma.status_code == 201
+        assert VerificationDocument.objects.count() == 2
+
+    def test_losing_insert_returns_winner_and_drops_its_copy(self, specialist_api, monkeypatch):
+        _, specialist = specialist_api
+        content = png_bytes()
+        winner, created = VerificationUploadService.ingest(
+            specialist, 'PASSPORT', SimpleUploadedFile('a.png', content)
+        )
+        assert created
+        # Simulate a concurrent upload that passed the lookup before the winner was inserted
+        original = VerificationUploadService._existing
+        calls = []
+        def stale_first_lookup(*args):
+            calls.append(args)
+            return None if len(calls) == 1 else original(*args)
+        monkeypatch.setattr(VerificationUploadService, '_existing', staticmethod(stale_first_lookup))
+        document, created = VerificationUploadService.ingest(
+            specialist, 'PASSPORT', SimpleUploadedFile('b.png', content)
+        )
+        assert (document, created) == (winner, False)
+        assert len(calls) == 2
+        stored = os.listdir(os.path.dirname(winner.file.path))
+        assert stored == [os.path.basename(winner.file.name)]
+
+    def test_missing_staging_file_drops_the_upload(self, specialist_api):
+        api, _ = specialist_api
+        content = png_bytes()
+        upload_id = start_upload(api, content)
+        os.remove(VerificationUpload.objects.get(pk=upload_id).staging_path)
+
+        response = put_chunk(api, upload_id, 0, content)
+        assert response.status_code == 404
+        assert 'start a new upload' in response.json()['error']
+        assert not VerificationUpload.objects.exists()
+
+        upload_id = start_upload(api, content)
+        put_chunk(api, upload_id, 0, content)
+        os.remove(VerificationUpload.objects.get(pk=upload_id).staging_path)
+        assert api.post(f'/api/verification/uploads/{upload_id}/complete/').status_code == 404
+        assert not VerificationDocument.objects.exists()
+
+    def test_size_limits(self, specialist_api, settings):
+        api, _ = specialist_api
+        settings.VERIFICATION_UPLOAD_MAX_BYTES = 100
+        settings.VERIFICATION_UPLOAD_CHUNK_BYTES = 10
+        response = api.post('/api/verification/uploads/', {
+            'document_type': 'PASSPORT', 'filename': 'big.pdf', 'size': 101,
+        }, format='json')
+        assert response.status_code == 413
+
+        upload_id = start_upload(api, b'x' * 50)
+        assert put_chunk(api, upload_id, 0, b'x' * 11).status_code == 413
+        assert put_chunk(api, upload_id, 0, b'x' * 10).status_code == 200
+
+    def test_clients_cannot_upload(self, specialist_api):
+        api, _ = specialist_api
+        client = User.objects.create_user(email='c@t.com', phone='2', role='CLIENT')
+        api.force_authenticate(client)
+        response = api.post('/api/verification/uploads/', {
+            'document_type': 'PASSPORT', 'filename': 'p.pdf', 'size': 10,
+        }, format='json')
+        assert response.status_code == 403
+
+@pytest.mark.django_db
+class TestDocumentProcessing:
+    def _document(self, specialist, content, name):
+        document = VerificationDocument(specialist=specialist, document_type='PASSPORT')
+        document.file.save(name, SimpleUploadedFile(name, content))
+        return document
+
+    def test_image_gets_thumbnail(self, specialist_api):
+        _, specialist = specialist_api
+        document = DocumentProcessingService.process(self._document(specialist, png_bytes(), 'scan.png').id)
+        assert document.processed_at is not None
+        assert document.status == VerificationDocument.Status.PENDING
+        with document.thumbnail.open('rb') as fh, Image.open(fh) as thumbnail:
+            assert max(thumbnail.size) <= 320
+
+    def test_pdf_is_accepted_without_thumbnail(self, specialist_api):
+        _, specialist = specialist_api
+        document = DocumentProcessingService.process(self._document(specialist, b'%PDF-1.4\n...', 'd.pdf').id)
+        assert document.status == VerificationDocument.Status.PENDING
+        assert not document.thumbnail
+
+    def test_garbage_is_rejected(self, specialist_api):
+        _, specialist = specialist_api
+        document = DocumentProcessingService.process(self._document(specialist, b'not a document', 'x.png').id)
+        assert document.status == VerificationDocument.Status.REJECTED
+        assert document.rejection_reason == DocumentProcessingService.INVALID_REASON
+
+@pytest.fixture
+def review_queue(db):
+    specialist = User.objects.create_user(email='q@t.com', phone='10', role='SPECIALIST')
+    documents = [
+        VerificationDocument.objects.create(specialist=specialist, document_type='PASSPORT', file=f'verification_docs/{i}.pdf')
+        for i in range(5)
+    ]
+    moderators = [
+        User.objects.create_user(email=f'm{i}@t.com', phone=f'2{i}', role='MODERATOR') for i in range(2)
+    ]
+    return documents, moderators
+
+def moderator_api(user):
+    api = APIClient()
+    api.force_authenticate(user)
+    return api
+
+@pytest.mark.django_db
+class TestReviewQueue:
+    def test_moderators_claim_disjoint_batches(self, review_queue):
+        documents, (first, second) = review_queue
+        batch_a = moderator_api(first).post('/api/verification/review/claim/', {'limit': 2}, format='json').json()
+        batch_b = moderator_api(second).post('/api/verification/review/claim/', {'limit': 2}, format='json').json()
+
+        assert [d['id'] for d in batch_a['results']] == [documents[0].id, documents[1].id]
+        assert [d['id'] for d in batch_b['results']] == [documents[2].id, documents[3].id]
+
+    def test_expired_lease_returns_to_queue(self, review_queue):
+        documents, (first, second) = review_queue
+        VerificationReviewService.claim_batch(first, limit=1)
+        VerificationDocument.objects.filter(pk=documents[0].pk).update(
+            claim_expires_at=timezone.now() - timedelta(seconds=1)
+        )
+
+        claimed = VerificationReviewService.claim_batch(second, limit=1)
+        assert [d.id for d in claimed] == [documents[0].id]
+
+        decided, lost = VerificationReviewService.decide(first, [
+            {'id': documents[0].id, 'status': 'APPROVED', 'rejection_reason': ''},
+        ])
+        assert (decided, lost) == ([], [documents[0].id])
+
+    def test_decide_batch(self, review_queue, django_assert_max_num_queries):
+        documents, (moderator, _) = review_queue
+        api = moderator_api(moderator)
+        api.post('/api/verification/review/claim/', {'limit': 3}, format='json')
+
+        decisions = [
+            {'id': documents[0].id, 'status': 'APPROVED'},
+            {'id': documents[1].id, 'status': 'APPROVED'},
+            {'id': documents[2].id, 'status': 'REJECTED', 'rejection_reason': 'Blurry'},
+            {'id': documents[3].id, 'status': 'APPROVED'},
+        ]
+        # one SELECT FOR UPDATE + UPDATE per (status, reason) group
+        with django_assert_max_num_queries(8):
+            response = api.post('/api/verification/review/decide/', {'decisions': decisions}, format='json')
+        assert sorted(response.json()['decided']) == [d.id for d in documents[:3]]
+        assert response.json()['lost'] == [documents[3].id]
+
+        documents[2].refresh_from_db()
+        assert documents[2].status == VerificationDocument.Status.REJECTED
+        assert documents[2].rejection_reason == 'Blurry'
+        assert documents[2].reviewed_by == moderator
+        assert documents[2].claimed_by is None
+
+    def test_rejection_needs_reason(self, review_queue):
+        documents, (moderator, _) = review_queue
+        response = moderator_api(moderator).post('/api/verification/review/decide/', {
+            'decisions': [{'id': documents[0].id, 'status': 'REJECTED'}],
+        }, format='json')
+        assert response.status_code == 400
+
+    def test_queue_is_for_moderators_only(self, review_queue):
+        documents, _ = review_queue
+        response = moderator_api(documents[0].specialist).post('/api/verification/review/claim/', {}, format='json')
+        assert response.status_code == 403